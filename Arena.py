@@ -0,0 +1,372 @@
+from array import array
+from enum import IntEnum
+from TokenTable import TokenTable
+from TreeWriter import TreePrinter
+from Parser import ProgramNode
+from Decl import Decl
+from VariableDecl import VariableDecl
+from FunctionDecl import FunctionDecl
+from Variable import Variable
+from StmtBlock import StmtBlock
+from Stmt import Stmt
+from IfStmt import IfStmt
+from WhileStmt import WhileStmt
+from ForStmt import ForStmt
+from BreakStmt import BreakStmt
+from ReturnStmt import ReturnStmt
+from PrintStmt import PrintStmt
+from Expressions import Expressions
+from ExpressionSubnodes import AssignNode, BinaryExprNode, UnaryExprNode, CallNode, ConstantNode, FieldAccessNode
+
+# Flat AST: every node is a row of five typed arrays (struct of arrays, like TokenTable) instead of an object with
+# a __dict__, and the tokens are held in a TokenTable. A row has
+#   kind          NodeKind
+#   token         index of the node's token in the arena's token table: the first token of a declaration or
+#                 statement, the operator of an expression, the identifier of a call or field access
+#   first_child   row of the first child, NONE if there is none
+#   next_sibling  row of the next child of the same parent, NONE for the last one
+#   label         Label: the "(test) ", "(body) ", ... prefix the parent prints in front of the node
+# Rows are in preorder, with the program at row 0, so a subtree is a run of consecutive rows. The wrappers of the
+# class tree (Decl, Stmt, Expressions) have no rows; their child takes their place.
+#
+# Arena.from_program(program_node, tokens) converts a parsed tree; arena.root is an ArenaNode, a view that
+# reads a row like a node and prints the same tree as the classes (print_tree, write_tree). An arena pickles as
+# a handful of arrays and the lexeme pool, and arena.subtree(node) copies one subtree with only its own tokens,
+# to ship a declaration without the rest of the program
+
+NONE = -1
+
+class NodeKind(IntEnum):
+    PROGRAM = 0
+    VAR_DECL = 1      # token: the type; the identifier follows it
+    FN_DECL = 2       # token: the return type; children: the formals, then the body
+    FORMAL = 3        # token: the type; the identifier follows it
+    STMT_BLOCK = 4    # children: variable declarations, then statements
+    IF = 5            # children: test, then, else if present
+    WHILE = 6         # children: test, body
+    FOR = 7           # children: init if present, test, step if present, body
+    BREAK = 8
+    RETURN = 9        # children: the value if present
+    PRINT = 10        # children: the arguments
+    ASSIGN = 11       # token: '='; children: left, right
+    LOGICAL = 12      # token: the operator; children: left, right or the operand of a unary operator
+    RELATIONAL = 13
+    ARITHMETIC = 14
+    CALL = 15         # token: the function's identifier; children: the arguments
+    CONSTANT = 16
+    FIELD_ACCESS = 17 # token: the identifier
+
+class Label(IntEnum):
+    NONE = 0
+    TEST = 1
+    INIT = 2
+    STEP = 3
+    BODY = 4
+    ARGS = 5
+    ACTUALS = 6
+
+LABEL_TEXT = ("", "(test) ", "(init) ", "(step) ", "(body) ", "(args) ", "(actuals) ")
+
+_LABELS = {text: Label(index) for index, text in enumerate(LABEL_TEXT)}
+
+# expr_type of the expression classes <-> kind
+EXPRESSION_KINDS = {"LogicalExpr": NodeKind.LOGICAL, "RelationalExpr": NodeKind.RELATIONAL, "ArithmeticExpr": NodeKind.ARITHMETIC}
+
+EXPRESSION_TYPES = {kind: expr_type for expr_type, kind in EXPRESSION_KINDS.items()}
+
+class Arena:
+    def __init__(self, tokens = None):
+        self.kinds = array('B')
+        self.tokens_of = array('i')
+        self.first_children = array('i')
+        self.next_siblings = array('i')
+        self.labels = array('B')
+        self.tokens = tokens if tokens is not None else TokenTable()
+
+    def __len__(self):
+        return len(self.kinds)
+
+    # appends a row without links and returns its index
+    def add(self, kind, token = NONE, label = Label.NONE):
+        self.kinds.append(kind)
+        self.tokens_of.append(token)
+        self.first_children.append(NONE)
+        self.next_siblings.append(NONE)
+        self.labels.append(label)
+        return len(self.kinds) - 1
+
+    @property
+    def root(self):
+        return ArenaNode(self, 0)
+
+    def print_tree(self):
+        self.root.print_tree()
+
+    # approximate bytes held by the rows and the token table
+    def nbytes(self):
+        columns = (self.kinds, self.tokens_of, self.first_children, self.next_siblings, self.labels)
+        return sum(column.itemsize * len(column) for column in columns) + self.tokens.nbytes()
+
+    # rows of the subtree at row, which are index, index + 1, ... up to the returned end
+    def subtree_end(self, index):
+        end = index + 1
+        pending = 1 if self.first_children[index] != NONE else 0
+        while pending:
+            # every row of the subtree is visited in order; the count tracks children still to come
+            if self.first_children[end] != NONE:
+                pending += 1
+            if self.next_siblings[end] == NONE:
+                pending -= 1
+            end += 1
+        return end
+
+    # a new arena holding a copy of the subtree of node (an ArenaNode or a row) as its root, with only the
+    # tokens from the subtree's first to its last
+    def subtree(self, node):
+        index = node.index if isinstance(node, ArenaNode) else node
+        end = self.subtree_end(index)
+        used = [token for token in self.tokens_of[index:end] if token != NONE]
+        if used:
+            low = min(used)
+            # declarations and formals also read the identifier after their token
+            high = max(used) + 1 if any(self.kinds[row] in NAMED_KINDS for row in range(index, end)) else max(used)
+            high = min(high, len(self.tokens) - 1)
+        else:
+            low, high = 0, -1
+        tokens = TokenTable(self.tokens[position] for position in range(low, high + 1))
+        copy = Arena(tokens)
+        copy.kinds = self.kinds[index:end]
+        copy.labels = self.labels[index:end]
+        copy.labels[0] = Label.NONE
+        copy.tokens_of = array('i', (token - low if token != NONE else NONE for token in self.tokens_of[index:end]))
+        copy.first_children = array('i', (row - index if row != NONE else NONE for row in self.first_children[index:end]))
+        copy.next_siblings = array('i', (row - index if row != NONE else NONE for row in self.next_siblings[index:end]))
+        copy.next_siblings[0] = NONE
+        return copy
+
+    # converts a parsed ProgramNode (or one Decl, or any other node) whose nodes refer to tokens
+    @classmethod
+    def from_program(cls, program_node, tokens):
+        arena = cls(tokens if isinstance(tokens, TokenTable) else TokenTable(tokens))
+        # expression nodes hold tokens instead of positions; they are found by where they are in the source
+        positions = {(token.line, token.start_col): position for position, token in enumerate(tokens)}
+        last_child = {} # row -> its last child so far
+
+        # preorder with an explicit stack, the tree can be deeper than the recursion limit
+        stack = [(program_node, NONE, Label.NONE)]
+        while stack:
+            node, parent, label = stack.pop()
+            node_class = type(node)
+            while node_class in WRAPPERS:
+                node = WRAPPERS[node_class](node)
+                node_class = type(node)
+            kind, token, children = CONVERTERS[node_class](node, positions)
+            row = arena.add(kind, token, label)
+            if parent != NONE:
+                previous = last_child.get(parent)
+                if previous is None:
+                    arena.first_children[parent] = row
+                else:
+                    arena.next_siblings[previous] = row
+                last_child[parent] = row
+            stack.extend((child, row, _LABELS[child_label]) for child, child_label in reversed(children))
+        return arena
+
+# kinds whose identifier is the token after theirs
+NAMED_KINDS = {NodeKind.VAR_DECL, NodeKind.FN_DECL, NodeKind.FORMAL}
+
+# classes without a row of their own: they are replaced by the node they wrap
+def _statement(stmt):
+    return getattr(stmt, {"block": "stmtblock", "if": "ifStmt", "while": "wStmt", "for": "fStmt", "break": "bStmt",
+                          "return": "rStmt", "print": "pStmt", "exp": "exp"}[stmt.stmtType])
+
+WRAPPERS = {
+    Decl: lambda decl: decl.variableDecl if decl.isVariableDecl else decl.functionDecl,
+    Stmt: _statement,
+    Expressions: lambda expressions: expressions.expression_root,
+}
+
+# class -> function(node, positions) returning (kind, token, [(child, label text), ...])
+CONVERTERS = {
+    ProgramNode: lambda node, positions: (NodeKind.PROGRAM, NONE, [(decl, "") for decl in node.decls]),
+    VariableDecl: lambda node, positions: (NodeKind.VAR_DECL, node.tokenPosition, []),
+    Variable: lambda node, positions: (NodeKind.FORMAL, node.tokenPosition, []), # the formals of a function
+    FunctionDecl: lambda node, positions: (NodeKind.FN_DECL, node.tokenPosition,
+                                           [(formal, "") for formal in node.formals] + [(node.stmtBlock, "(body) ")]),
+    StmtBlock: lambda node, positions: (NodeKind.STMT_BLOCK, node.tokenPosition,
+                                        [(child, "") for child in node.variableDecls + node.stmts]),
+    IfStmt: lambda node, positions: (NodeKind.IF, node.tokenPosition,
+                                     [(node.condition, "(test) "), (node.thenStmt, "")] + ([(node.elseStmt, "")] if node.withElse else [])),
+    WhileStmt: lambda node, positions: (NodeKind.WHILE, node.tokenPosition, [(node.condition, "(test) "), (node.body, "")]),
+    ForStmt: lambda node, positions: (NodeKind.FOR, node.tokenPosition,
+                                      ([(node.firstexp, "(init) ")] if node.hasFirstExp else []) + [(node.middleexp, "(test) ")]
+                                      + ([(node.lastexp, "(step) ")] if node.hasLastExp else []) + [(node.stmt, "")]),
+    BreakStmt: lambda node, positions: (NodeKind.BREAK, node.tokenPosition, []),
+    ReturnStmt: lambda node, positions: (NodeKind.RETURN, node.tokenPosition, [(node.expression, "(args) ")] if node.withExpression else []),
+    PrintStmt: lambda node, positions: (NodeKind.PRINT, node.tokenPosition, [(expression, "(args) ") for expression in node.expressions]),
+    AssignNode: lambda node, positions: (NodeKind.ASSIGN, positions[node.operator.line, node.operator.start_col],
+                                         [(node.lhs, ""), (node.rhs, "")]),
+    BinaryExprNode: lambda node, positions: (EXPRESSION_KINDS[node.expr_type], positions[node.operator.line, node.operator.start_col],
+                                             [(node.lhs, ""), (node.rhs, "")]),
+    UnaryExprNode: lambda node, positions: (EXPRESSION_KINDS[node.expr_type], positions[node.operator.line, node.operator.start_col],
+                                            [(node.operand, "")]),
+    CallNode: lambda node, positions: (NodeKind.CALL, positions[node.identifier.line, node.identifier.start_col],
+                                       [(argument, "(actuals) ") for argument in node.arguments]),
+    ConstantNode: lambda node, positions: (NodeKind.CONSTANT, positions[node.token.line, node.token.start_col], []),
+    FieldAccessNode: lambda node, positions: (NodeKind.FIELD_ACCESS, positions[node.variable.line, node.variable.start_col], []),
+}
+
+# one row of an arena read like a node. Views are created on access and compare equal by arena and row
+class ArenaNode(TreePrinter):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, ArenaNode) and other.arena is self.arena and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.arena), self.index))
+
+    def __repr__(self):
+        return f"ArenaNode({self.kind.name}, {self.index})"
+
+    @property
+    def kind(self):
+        return NodeKind(self.arena.kinds[self.index])
+
+    @property
+    def label(self):
+        return LABEL_TEXT[self.arena.labels[self.index]]
+
+    # the node's token (a TokenView), None for the program
+    @property
+    def token(self):
+        token = self.arena.tokens_of[self.index]
+        return self.arena.tokens[token] if token != NONE else None
+
+    @property
+    def line(self):
+        return self.arena.tokens.lines[self.arena.tokens_of[self.index]]
+
+    # identifier of a declaration, formal, call or field access
+    @property
+    def identifier(self):
+        token = self.arena.tokens_of[self.index]
+        if self.arena.kinds[self.index] in NAMED_KINDS:
+            token += 1
+        return self.arena.tokens[token].value
+
+    @property
+    def children(self):
+        first_children = self.arena.first_children
+        next_siblings = self.arena.next_siblings
+        children = []
+        child = first_children[self.index]
+        while child != NONE:
+            children.append(ArenaNode(self.arena, child))
+            child = next_siblings[child]
+        return children
+
+    # prints like the class tree; iterative, so any depth prints. label overrides the row's own
+    def write_tree(self, out, indent = 0, label = None):
+        arena = self.arena
+        kinds = arena.kinds
+        tokens_of = arena.tokens_of
+        first_children = arena.first_children
+        next_siblings = arena.next_siblings
+        labels = arena.labels
+        lines = arena.tokens.lines
+        lexemes = arena.tokens.lexemes
+        pool = arena.tokens.pool
+        table = arena.tokens
+
+        def children(row):
+            child = first_children[row]
+            while child != NONE:
+                yield child
+                child = next_siblings[child]
+
+        # items are (row, indent) for a subtree still to print or (None, line, indent, text) for one tree line;
+        # pushed in reverse so that they pop in print order
+        stack = [(self.index, indent)]
+        first = True
+        while stack:
+            item = stack.pop()
+            if item[0] is None:
+                out.write(item[1], item[2], item[3])
+                continue
+            row, indent = item
+            kind = kinds[row]
+            prefix = LABEL_TEXT[labels[row]] if not first or label is None else label
+            first = False
+            token = tokens_of[row]
+            if kind == NodeKind.PROGRAM:
+                out.write_line("Program:")
+                stack.extend((child, indent) for child in reversed(list(children(row))))
+                continue
+            line = lines[token]
+            value = pool[lexemes[token]]
+            if kind == NodeKind.VAR_DECL:
+                out.write(line, indent, prefix + "VarDecl:")
+                out.write(line, indent + 1, "Type: " + value)
+                out.write(line, indent + 1, "Identifier: " + pool[lexemes[token + 1]])
+            elif kind == NodeKind.FN_DECL:
+                out.write(line, indent, "FnDecl:")
+                out.write(line, indent + 1, "(return type) Type: " + value)
+                out.write(line, indent + 1, "Identifier: " + pool[lexemes[token + 1]])
+                pending = []
+                for child in children(row):
+                    if kinds[child] == NodeKind.FORMAL:
+                        # formals print with the function's line
+                        formal = tokens_of[child]
+                        out.write(line, indent + 1, "(formals) VarDecl:")
+                        out.write(line, indent + 2, "Type: " + pool[lexemes[formal]])
+                        out.write(line, indent + 2, "Identifier: " + pool[lexemes[formal + 1]])
+                    else:
+                        pending.append((child, indent + 1))
+                stack.extend(reversed(pending))
+            elif kind == NodeKind.FORMAL:
+                # printed by its function; on its own with its own line
+                out.write(line, indent, "(formals) VarDecl:")
+                out.write(line, indent + 1, "Type: " + value)
+                out.write(line, indent + 1, "Identifier: " + pool[lexemes[token + 1]])
+            elif kind in STATEMENT_HEADERS:
+                header = STATEMENT_HEADERS[kind]
+                out.write(line, indent, (prefix if kind in LABELLED_STATEMENTS else "") + header)
+                stack.extend((child, indent + 1) for child in reversed(list(children(row))))
+            elif kind == NodeKind.CONSTANT:
+                out.write(line, indent, prefix + table[token].type[2:] + ": " + value)
+            elif kind == NodeKind.FIELD_ACCESS:
+                out.write(line, indent, prefix + "FieldAccess:")
+                out.write(line, indent + 1, "Identifier: " + value)
+            elif kind == NodeKind.CALL:
+                out.write(line, indent, prefix + "Call:")
+                out.write(line, indent + 1, "Identifier: " + value)
+                stack.extend((child, indent + 1) for child in reversed(list(children(row))))
+            else:
+                # assignment, binary and unary expressions: the operator goes between the operands, or first
+                out.write(line, indent, prefix + ("AssignExpr" if kind == NodeKind.ASSIGN else EXPRESSION_TYPES[kind]) + ":")
+                operands = list(children(row))
+                operator = (None, line, indent + 1, "Operator: " + value)
+                if len(operands) == 2:
+                    stack.extend(((operands[1], indent + 1), operator, (operands[0], indent + 1)))
+                else:
+                    stack.append((operands[0], indent + 1))
+                    out.write(line, indent + 1, operator[3])
+
+# statements printed as a header and their children one level deeper
+STATEMENT_HEADERS = {
+    NodeKind.STMT_BLOCK: "StmtBlock:",
+    NodeKind.IF: "IfStmt:",
+    NodeKind.WHILE: "WhileStmt:",
+    NodeKind.FOR: "ForStmt:",
+    NodeKind.BREAK: "BreakStmt:",
+    NodeKind.RETURN: "ReturnStmt:",
+    NodeKind.PRINT: "PrintStmt:",
+}
+
+# statements whose header takes the label its parent gives; the others ignore it, as in the classes
+LABELLED_STATEMENTS = {NodeKind.STMT_BLOCK, NodeKind.FOR}
@@ -1,7 +1,12 @@
+from TreeWriter import TreePrinter
+
 SyntaxErr = "syntax error"
 
-class Basic:
-    def __init__(self, tokens, tokenPosition):
-        self.tokens = tokens
-        self.tokenPosition = tokenPosition
-        self.tokenPositionProcessed = tokenPosition
+# print_tree (from TreePrinter) writes the subtree through a TreeWriter using the write_tree of each node.
+# A node is parsed from the tokens of a TokenCursor starting at its position; tokenPositionProcessed ends up
+# at the node's last token
+class Basic(TreePrinter):
+    def __init__(self, cursor):
+        self.tokens = cursor.tokens
+        self.tokenPosition = cursor.position
+        self.tokenPositionProcessed = cursor.position
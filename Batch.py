@@ -0,0 +1,92 @@
+import io
+import os
+import sys
+import glob
+import contextlib
+import traceback
+from itertools import repeat
+
+# Batch mode: many files are scanned and parsed by a pool of worker processes in one run. Each worker captures
+# what the single-file path would print for its file; the results are written in input order, each file under
+# a "==> path <==" header, followed by a per-file summary
+
+SUFFIX = ".decaf"
+
+def _has_magic(path):
+    return any(character in path for character in "*?[")
+
+# more than one input, a directory or a glob pattern
+def is_batch(inputs):
+    return len(inputs) > 1 or any(os.path.isdir(path) or _has_magic(path) for path in inputs)
+
+# input files in a deterministic order: inputs as given, directories (recursively) and glob matches sorted.
+# A pattern without matches is kept so that it is reported as not found
+def expand_inputs(inputs):
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            found = []
+            for root, _, names in os.walk(path):
+                found.extend(os.path.join(root, name) for name in names if name.endswith(SUFFIX))
+            files.extend(sorted(found))
+        elif _has_magic(path):
+            files.extend(sorted(glob.glob(path, recursive = True)) or [path])
+        else:
+            files.append(path)
+    return files
+
+# runs run_file(path, args) with stdout and stderr captured; an exception is reported instead of ending the batch.
+# run_file returns (status, cached) with cached None when the parse cache is not in use
+def _run_captured(run_file, path, args):
+    output = io.StringIO()
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+        try:
+            status, cached = run_file(path, args)
+        except Exception as error:
+            traceback.print_exc(file = errors)
+            status, cached = f"crashed ({type(error).__name__})", None
+    return output.getvalue(), errors.getvalue(), status, cached
+
+# prints every file's output in input order and the summary; returns (exit code, written): the exit code is 1 if
+# any file failed, written whether any file was stored in the parse cache.
+# configure(args) is run in every worker so that the parser settings also hold where workers are not forked
+def run_batch(files, run_file, args, configure, out = None):
+    out = out if out is not None else sys.stdout
+    jobs = min(args.jobs, len(files)) or 1
+    statuses = []
+    cached = []
+
+    if jobs == 1:
+        results = map(_run_captured, repeat(run_file), files, repeat(args))
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor # imported only when a pool is used, it is slow to import
+        executor = ProcessPoolExecutor(max_workers = jobs, initializer = configure, initargs = (args,))
+        # a few chunks per worker keep the pool busy without a round trip per small file
+        results = executor.map(_run_captured, repeat(run_file), files, repeat(args),
+                               chunksize = max(1, len(files) // (jobs * 4)))
+    try:
+        for path, (output, errors, status, hit) in zip(files, results):
+            out.write(f"==> {path} <==\n")
+            out.write(output)
+            if errors:
+                out.flush()
+                sys.stderr.write(errors)
+                sys.stderr.flush()
+            statuses.append(status)
+            cached.append(hit)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    failed = sum(status != "ok" for status in statuses)
+    out.write("Summary:\n")
+    for path, status, hit in zip(files, statuses, cached):
+        out.write(f"{path}: {status}{' (cached)' if hit else ''}\n")
+    out.write(f"{len(files)} files, {len(files) - failed} ok, {failed} failed\n")
+    if any(hit is not None for hit in cached):
+        hits = sum(hit is True for hit in cached)
+        out.write(f"cache: {hits} hits, {sum(hit is False for hit in cached)} misses\n")
+    out.flush()
+    return 1 if failed else 0, any(hit is False for hit in cached)
@@ -1,14 +1,17 @@
 from Basic import Basic
-from Basic import SyntaxErr
+from TokenKind import SEMICOLON
 
 class BreakStmt(Basic, object):
-    def __init__(self, tokens, tokenPosition):
+    def __init__(self, cursor):
         
-        super(BreakStmt, self).__init__(tokens, tokenPosition)
+        super(BreakStmt, self).__init__(cursor)
   
         # break statement already matched by call from Stmt, next check for, next checking for semicolon
-        if tokens[tokenPosition + 1].value != ";":
-            raise Exception(SyntaxErr, tokens[tokenPosition + 1])
+        cursor.advance()
+        cursor.expect(SEMICOLON)
         
-        self.tokenPositionProcessed = tokenPosition + 1
+        self.tokenPositionProcessed = cursor.position - 1
 
+    def write_tree(self, out, indent = 0):
+        line = self.tokens[self.tokenPosition].line
+        out.write(line, indent, "BreakStmt:")
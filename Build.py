@@ -0,0 +1,57 @@
+import os
+import sys
+import glob
+import shutil
+import zipapp
+import argparse
+import tempfile
+import py_compile
+from Cache import source_hash
+
+# Builds the parser into a single executable zipapp: python Build.py [-o dist/decaf-parser.pyz], then
+# python dist/decaf-parser.pyz [options] <input_file> ... runs like python main.py.
+#
+# The archive holds every module of the parser next to its bytecode, compiled at build time, so a cold start
+# loads .pyc files instead of compiling sources: zipimport never writes bytecode back, and without it every run
+# of an archive would compile each module again. The bytecode is hash-based and unchecked, since zipimport can
+# only match a timestamp-based .pyc against its source by the two-second resolution of the zip entry's time.
+# Bytecode only runs on the Python version that built it; with a different one the sources are compiled instead.
+# SourceHash.py records the hash of the packed sources, which keys the parse cache (Cache.py) inside the archive
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_OUTPUT = os.path.join("dist", "decaf-parser.pyz")
+
+MAIN = "import sys\nimport main\n\nsys.exit(main.main())\n"
+
+# the parser's modules: every top-level module but this one
+def modules():
+    return sorted(path for path in glob.glob(os.path.join(ROOT, "*.py")) if os.path.basename(path) != "Build.py")
+
+def build(output = DEFAULT_OUTPUT, interpreter = "/usr/bin/env python3", compress = False):
+    with tempfile.TemporaryDirectory() as staging:
+        for path in modules():
+            name = os.path.basename(path)
+            shutil.copyfile(path, os.path.join(staging, name))
+            # next to the source, where zipimport looks for it, not in __pycache__
+            py_compile.compile(path, cfile = os.path.join(staging, name + "c"), dfile = name, doraise = True,
+                               invalidation_mode = py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        with open(os.path.join(staging, "__main__.py"), "w") as file:
+            file.write(MAIN)
+        with open(os.path.join(staging, "SourceHash.py"), "w") as file:
+            file.write(f"SOURCE_HASH = {source_hash(ROOT)!r}\n")
+        os.makedirs(os.path.dirname(output) or ".", exist_ok = True)
+        zipapp.create_archive(staging, output, interpreter, compressed = compress)
+    return output
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python Build.py", description = "Builds the parser into a single zipapp.")
+    arg_parser.add_argument("-o", "--output", default = DEFAULT_OUTPUT, help = f"archive to write (default: {DEFAULT_OUTPUT})")
+    arg_parser.add_argument("--python", default = "/usr/bin/env python3", help = "interpreter of the archive's #! line")
+    arg_parser.add_argument("--compress", action = "store_true", help = "deflate the archive; smaller, slightly slower to start")
+    args = arg_parser.parse_args(argv)
+    print(build(args.output, args.python, args.compress))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import os
+import hashlib
+import marshal
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+_parser_version = None
+
+# hash of the parser's sources, every top-level module but Build.py: an entry written by any other version of the
+# parser is never served, without a version to bump by hand
+def source_hash(root = ROOT):
+    digest = hashlib.sha256()
+    names = sorted(name for name in os.listdir(root) if name.endswith(".py") and name != "Build.py")
+    for name in names:
+        with open(os.path.join(root, name), 'rb') as file:
+            digest.update(f"{name}\0".encode())
+            digest.update(hashlib.sha256(file.read()).digest())
+    return digest.hexdigest()
+
+# source_hash() of this parser, once per process. A zipapp has no directory to list, Build.py stores the hash of
+# the sources it packed in SourceHash.py instead
+def parser_version():
+    global _parser_version
+    if _parser_version is None:
+        try:
+            from SourceHash import SOURCE_HASH
+        except ImportError:
+            SOURCE_HASH = source_hash()
+        _parser_version = SOURCE_HASH
+    return _parser_version
+
+def default_directory():
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "decaf-parser")
+
+# Content-addressed cache of parse results on disk. An entry is keyed by a hash of the parser's sources, the
+# settings that affect the output and the file contents, and holds what parsing the file printed: (status, stdout
+# text, stderr text), so failing files replay their error report as well. Every entry is one file, written
+# atomically; a hit refreshes its modification time and prune() removes the least recently used entries once
+# the directory grows past max_bytes
+class ParseCache:
+    def __init__(self, directory = None, max_bytes = DEFAULT_MAX_BYTES):
+        self.directory = directory if directory is not None else default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, contents, settings):
+        digest = hashlib.sha256(f"{parser_version()}\0{settings}\0".encode())
+        digest.update(contents)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    # the entry for key, or None
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            # missing, or a damaged entry that the next put replaces
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # a read-only cache still serves its entries, they only age as if never used
+            pass
+        self.hits += 1
+        return entry
+
+    # stores entry under key; returns False when the cache directory cannot be created or written (a read-only
+    # home, a sandbox), in which case the run goes on without the cache
+    def put(self, key, entry):
+        import tempfile # only needed on a miss, and slow to import
+        try:
+            os.makedirs(self.directory, exist_ok = True)
+            # written under a temporary name and renamed, so concurrent readers never see a partial entry
+            descriptor, temporary = tempfile.mkstemp(dir = self.directory, prefix = ".tmp-")
+        except OSError:
+            return False
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                marshal.dump(entry, file)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            _remove(temporary)
+            return False
+        except BaseException:
+            _remove(temporary)
+            raise
+        return True
+
+    # evicts least recently used entries until the cache fits in max_bytes
+    def prune(self):
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.is_file() and not entry.name.startswith(".tmp-"):
+                        status = entry.stat()
+                        entries.append((status.st_mtime, status.st_size, entry.path))
+                        total += status.st_size
+        except OSError:
+            # no cache directory yet, or one that cannot be read
+            return
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            _remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -0,0 +1,503 @@
+import re
+import sys
+import contextlib
+from Symbols import resolve, FUNCTION, GLOBAL
+from Walker import WRAPPED
+from StmtBlock import StmtBlock
+from IfStmt import IfStmt
+from WhileStmt import WhileStmt
+from ForStmt import ForStmt
+from BreakStmt import BreakStmt
+from ReturnStmt import ReturnStmt
+from PrintStmt import PrintStmt
+from Expressions import Expressions
+from ExpressionSubnodes import AssignNode, BinaryExprNode, UnaryExprNode, CallNode, ConstantNode, FieldAccessNode
+from TokenKind import (INTCONSTANT, STRINGCONSTANT, CHARCONSTANT, TRUE, FALSE, OR, LOGICALAND, EQ, LT, GT, LESSEQUAL,
+                       GEQ, PLUS, MINUS, MULT, DIV, NOT)
+
+# Execution engine: compile(program_node) lowers the parse tree into nested Python closures, one per node, and
+# Program.run() calls main(). All the work that does not depend on values is done once, when compiling: names
+# are resolved (Symbols.py) to slot indices, operators to the closure for their operator, calls to the function
+# they call and constants to their value. Running a node is then a call of its closure with the frame of the
+# function it is in.
+#
+# A frame is a list: slot 0 holds the return value, the formals follow and then every local of the function,
+# each declaration with a slot of its own. Globals live in one list shared by all the closures. Statements
+# return None to go on, BREAK to leave the enclosing loop and RETURN to leave the function, after storing the
+# value in slot 0.
+#
+# Values: Decaf ints are 32-bit two's complement, so arithmetic wraps around and division truncates toward zero;
+# bools are Python bools; strings are str with their escapes decoded. Print writes its arguments one after the
+# other to stdout, without separators or a newline of its own. Types are not checked: the parser accepts
+# programs that mix them. Operands that Python cannot combine raise OperandErr on the operator, others compute
+# what Python does (true + 1 is 2). Errors are raised as Exception(error type, token) like syntax errors, to
+# report with Parser.print_error: compile() raises the ones found before the program runs, run() the others
+
+CompileErr = "compile error"
+RuntimeErr = "runtime error"
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+# an int wrapped into 32 bits
+def wrap(value):
+    return ((value - INT_MIN) & 0xFFFFFFFF) + INT_MIN
+
+# Decaf division: truncates toward zero; rhs is not zero
+def divide(lhs, rhs):
+    quotient = abs(lhs) // abs(rhs)
+    return wrap(quotient if (lhs < 0) == (rhs < 0) else -quotient)
+
+ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "v": "\v", "f": "\f", "a": "\a", "b": "\b", "\\": "\\", "'": "'", '"': '"'}
+ESCAPE = re.compile(r"\\(.)")
+
+# the value of a constant token
+def constant_value(token):
+    kind = token.kind
+    if kind == INTCONSTANT:
+        value = token.value
+        return wrap(int(value, 16) if value[:2] in ("0x", "0X") else int(value))
+    if kind == TRUE or kind == FALSE:
+        return kind == TRUE
+    if kind == STRINGCONSTANT or kind == CHARCONSTANT:
+        return ESCAPE.sub(lambda match: ESCAPES[match.group(1)], token.value[1:-1])
+    raise Exception("unsupported constant", token)
+
+# a value as Print writes it
+def format_value(value):
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return str(value)
+
+# default value of a variable of each type
+DEFAULTS = {"int": 0, "bool": False, "string": "", "double": 0.0}
+
+BREAK = object()
+RETURN = object()
+
+# slot of the return value in a frame
+RESULT = 0
+
+# Python frames allowed while a program is compiled or runs; compiling takes a few per level of the tree and a
+# Decaf call a few at run time. From Python 3.11 on, calls between Python functions do not use the C stack, so
+# there this only bounds memory; the compiler builds its tuples from lists rather than generators, since a
+# generator resumed by tuple() does. Before 3.11 every Python call also takes C stack, and a limit this high
+# would crash the interpreter instead of raising RecursionError, so the limit stays at what the stack holds
+RECURSION_LIMIT = 200000 if sys.version_info >= (3, 11) else 10000
+
+# raises the recursion limit to RECURSION_LIMIT for the duration
+@contextlib.contextmanager
+def deep_recursion():
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(limit)
+
+# a compiled function; body is set once every function has been compiled, so calls can be compiled before it
+class Function:
+    __slots__ = ("name", "arity", "frame", "body")
+
+    def __init__(self, name, arity):
+        self.name = name
+        self.arity = arity
+        self.frame = [None] # a new frame: the initial value of every slot
+        self.body = None
+
+class Program:
+    def __init__(self, functions, global_values, global_defaults):
+        self.functions = functions # name -> Function
+        self.global_values = global_values
+        self.global_defaults = global_defaults
+
+    # runs main() with fresh globals; its output goes to sys.stdout
+    def run(self):
+        self.global_values[:] = self.global_defaults
+        main = self.functions["main"]
+        frame = main.frame[:]
+        with deep_recursion():
+            main.body(frame)
+        return frame[RESULT]
+
+class Compiler:
+    def __init__(self, table):
+        self.table = table
+        self.global_values = []
+        self.global_defaults = []
+        self.global_slots = {} # Declaration -> index in global_values
+        self.functions = {} # Declaration of a function -> Function
+        self.slots = None # Declaration -> frame slot, in the function being compiled
+        self.frame = None # initial frame of the function being compiled
+        self.loops = 0 # loops around the statement being compiled
+
+    def compile_program(self, program_node):
+        for declaration in self.table.globals.values():
+            if declaration.kind == GLOBAL:
+                self.global_slots[declaration] = len(self.global_defaults)
+                self.global_defaults.append(DEFAULTS.get(declaration.type))
+            else:
+                self.functions[declaration] = Function(declaration.name, len(declaration.node.formals))
+        for declaration, function in self.functions.items():
+            function_decl = declaration.node
+            self.slots = {}
+            self.frame = function.frame
+            for formal in function_decl.formals:
+                self.declare(self.table.declaration_at(*self.identifier(formal)))
+            function.body = self.statement(function_decl.stmtBlock)
+        if "main" not in self.table.globals or self.table.globals["main"].kind != FUNCTION:
+            raise Exception("program has no main function", None)
+        main = self.table.globals["main"]
+        if self.functions[main].arity != 0:
+            raise Exception("main takes no arguments", main.token)
+        return Program({function.name: function for function in self.functions.values()}, self.global_values,
+                       self.global_defaults)
+
+    # (line, column) of the identifier of a variable
+    @staticmethod
+    def identifier(variable):
+        token = variable.tokens[variable.tokenPosition + 1]
+        return token.line, token.start_col
+
+    def declare(self, declaration):
+        self.slots[declaration] = len(self.frame)
+        self.frame.append(DEFAULTS.get(declaration.type))
+
+    # statements
+
+    def statement(self, node):
+        while type(node) in WRAPPED and type(node) is not Expressions:
+            node = WRAPPED[type(node)](node)
+        if type(node) is Expressions:
+            return self.expression_statement(node)
+        return self.STATEMENTS[type(node)](self, node)
+
+    def expression_statement(self, node):
+        expression = self.expression(node)
+
+        def run(frame):
+            expression(frame)
+        return run
+
+    def block(self, node):
+        for variable_decl in node.variableDecls:
+            self.declare(self.table.declaration_at(*self.identifier(variable_decl.variable)))
+        statements = tuple([self.statement(stmt) for stmt in node.stmts])
+        if len(statements) == 1:
+            return statements[0]
+
+        def run(frame):
+            for statement in statements:
+                signal = statement(frame)
+                if signal is not None:
+                    return signal
+        return run
+
+    def if_statement(self, node):
+        condition = self.expression(node.condition)
+        then = self.statement(node.thenStmt)
+        if not node.withElse:
+            def run(frame):
+                if condition(frame):
+                    return then(frame)
+            return run
+        otherwise = self.statement(node.elseStmt)
+
+        def run(frame):
+            if condition(frame):
+                return then(frame)
+            return otherwise(frame)
+        return run
+
+    def loop_body(self, node):
+        self.loops += 1
+        try:
+            return self.statement(node)
+        finally:
+            self.loops -= 1
+
+    def while_statement(self, node):
+        condition = self.expression(node.condition)
+        body = self.loop_body(node.body)
+
+        def run(frame):
+            while condition(frame):
+                signal = body(frame)
+                if signal is not None:
+                    if signal is BREAK:
+                        break
+                    return signal
+        return run
+
+    def for_statement(self, node):
+        initialize = self.expression(node.firstexp) if node.hasFirstExp else None
+        condition = self.expression(node.middleexp)
+        step = self.expression(node.lastexp) if node.hasLastExp else None
+        body = self.loop_body(node.stmt)
+
+        def run(frame):
+            if initialize is not None:
+                initialize(frame)
+            while condition(frame):
+                signal = body(frame)
+                if signal is not None:
+                    if signal is BREAK:
+                        break
+                    return signal
+                if step is not None:
+                    step(frame)
+        return run
+
+    def break_statement(self, node):
+        if self.loops == 0:
+            raise Exception("break outside a loop", node.tokens[node.tokenPosition])
+        return lambda frame: BREAK
+
+    def return_statement(self, node):
+        if not node.withExpression:
+            return lambda frame: RETURN
+        expression = self.expression(node.expression)
+
+        def run(frame):
+            frame[RESULT] = expression(frame)
+            return RETURN
+        return run
+
+    def print_statement(self, node):
+        expressions = tuple([self.expression(expression) for expression in node.expressions])
+
+        def run(frame):
+            sys.stdout.write("".join([format_value(expression(frame)) for expression in expressions]))
+        return run
+
+    STATEMENTS = {
+        StmtBlock: block,
+        IfStmt: if_statement,
+        WhileStmt: while_statement,
+        ForStmt: for_statement,
+        BreakStmt: break_statement,
+        ReturnStmt: return_statement,
+        PrintStmt: print_statement,
+    }
+
+    # expressions
+
+    def expression(self, node):
+        if type(node) is Expressions:
+            node = node.expression_root
+        return self.EXPRESSIONS[type(node)](self, node)
+
+    def constant(self, node):
+        value = constant_value(node.token)
+        return lambda frame: value
+
+    # the declaration of a variable use; functions are not values
+    def variable(self, token):
+        declaration = self.table.declaration_at(token.line, token.start_col)
+        if declaration.kind == FUNCTION:
+            raise Exception(f"'{token.value}' is a function", token)
+        return declaration
+
+    def field_access(self, node):
+        declaration = self.variable(node.variable)
+        if declaration in self.global_slots:
+            values = self.global_values
+            index = self.global_slots[declaration]
+            return lambda frame: values[index]
+        index = self.slots[declaration]
+        return lambda frame: frame[index]
+
+    def assign(self, node):
+        if type(node.lhs) is not FieldAccessNode:
+            raise Exception("cannot assign to this expression", node.operator)
+        declaration = self.variable(node.lhs.variable)
+        rhs = self.expression(node.rhs)
+        if declaration in self.global_slots:
+            values = self.global_values
+            index = self.global_slots[declaration]
+
+            def run(frame):
+                values[index] = value = rhs(frame)
+                return value
+            return run
+        index = self.slots[declaration]
+
+        def run(frame):
+            frame[index] = value = rhs(frame)
+            return value
+        return run
+
+    def binary(self, node):
+        return self.BINARY[node.operator.kind](self.expression(node.lhs), self.expression(node.rhs), node.operator)
+
+    def unary(self, node):
+        operand = self.expression(node.operand)
+        if node.operator.kind != NOT:
+            raise Exception("unsupported operator", node.operator)
+        return lambda frame: not operand(frame)
+
+    def call(self, node):
+        token = node.identifier
+        declaration = self.table.declaration_at(token.line, token.start_col)
+        if declaration.kind != FUNCTION:
+            raise Exception(f"'{token.value}' is not a function", token)
+        function = self.functions[declaration]
+        if len(node.arguments) != function.arity:
+            raise Exception(f"'{token.value}' takes {function.arity} argument{'' if function.arity == 1 else 's'}", token)
+        arguments = tuple([self.expression(argument) for argument in node.arguments])
+        # the common arities without a loop
+        if not arguments:
+            def run(frame):
+                callee = function.frame[:]
+                function.body(callee)
+                return callee[RESULT]
+        elif len(arguments) == 1:
+            first, = arguments
+
+            def run(frame):
+                callee = function.frame[:]
+                callee[1] = first(frame)
+                function.body(callee)
+                return callee[RESULT]
+        elif len(arguments) == 2:
+            first, second = arguments
+
+            def run(frame):
+                callee = function.frame[:]
+                callee[1] = first(frame)
+                callee[2] = second(frame)
+                function.body(callee)
+                return callee[RESULT]
+        else:
+            def run(frame):
+                callee = function.frame[:]
+                callee[1:len(arguments) + 1] = [argument(frame) for argument in arguments]
+                function.body(callee)
+                return callee[RESULT]
+        return run
+
+    EXPRESSIONS = {
+        ConstantNode: constant,
+        FieldAccessNode: field_access,
+        AssignNode: assign,
+        BinaryExprNode: binary,
+        UnaryExprNode: unary,
+        CallNode: call,
+    }
+
+# operator kind -> closure of (lhs, rhs, operator token) for a binary expression; arithmetic only leaves the
+# fast path to wrap results that overflow. Operands Python cannot combine raise OperandErr on the operator
+OperandErr = "operands of the wrong type"
+
+def _plus(lhs, rhs, operator):
+    def run(frame):
+        left = lhs(frame)
+        right = rhs(frame)
+        try:
+            value = left + right
+            return value if INT_MIN <= value <= INT_MAX else wrap(value)
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+def _minus(lhs, rhs, operator):
+    def run(frame):
+        left = lhs(frame)
+        right = rhs(frame)
+        try:
+            value = left - right
+            return value if INT_MIN <= value <= INT_MAX else wrap(value)
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+def _mult(lhs, rhs, operator):
+    def run(frame):
+        left = lhs(frame)
+        right = rhs(frame)
+        try:
+            value = left * right
+            return value if INT_MIN <= value <= INT_MAX else wrap(value)
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+def _div(lhs, rhs, operator):
+    def run(frame):
+        dividend = lhs(frame)
+        divisor = rhs(frame)
+        if divisor == 0:
+            raise Exception("division by zero", operator)
+        try:
+            return divide(dividend, divisor)
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+def _lt(lhs, rhs, operator):
+    def run(frame):
+        left = lhs(frame)
+        right = rhs(frame)
+        try:
+            return left < right
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+def _gt(lhs, rhs, operator):
+    def run(frame):
+        left = lhs(frame)
+        right = rhs(frame)
+        try:
+            return left > right
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+def _le(lhs, rhs, operator):
+    def run(frame):
+        left = lhs(frame)
+        right = rhs(frame)
+        try:
+            return left <= right
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+def _ge(lhs, rhs, operator):
+    def run(frame):
+        left = lhs(frame)
+        right = rhs(frame)
+        try:
+            return left >= right
+        except TypeError:
+            raise Exception(OperandErr, operator) from None
+    return run
+
+Compiler.BINARY = {
+    PLUS: _plus,
+    MINUS: _minus,
+    MULT: _mult,
+    DIV: _div,
+    LT: _lt,
+    GT: _gt,
+    LESSEQUAL: _le,
+    GEQ: _ge,
+    EQ: lambda lhs, rhs, operator: lambda frame: lhs(frame) == rhs(frame),
+    LOGICALAND: lambda lhs, rhs, operator: lambda frame: lhs(frame) and rhs(frame),
+    OR: lambda lhs, rhs, operator: lambda frame: lhs(frame) or rhs(frame),
+}
+
+# compiles a parsed program; raises Exception(error type, token) on name errors and on what cannot run. The
+# token is None when the error has no place in the source
+def compile(program_node, table = None):
+    table = table if table is not None else resolve(program_node)
+    if table.errors:
+        raise Exception(*table.errors[0])
+    try:
+        with deep_recursion():
+            return Compiler(table).compile_program(program_node)
+    except RecursionError:
+        raise Exception("program nested too deeply to compile", None) from None
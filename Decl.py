@@ -2,36 +2,38 @@ from VariableDecl import VariableDecl
 from FunctionDecl import FunctionDecl
 from Basic import Basic
 from Basic import SyntaxErr
+from TokenKind import LPAREN, EOF, IDENTIFIER_KINDS, TYPE_NAME_KINDS
 
 # variable or function
 class Decl(Basic, object):
-    def __init__(self, tokens, tokenPosition):
-        super(Decl, self).__init__(tokens, tokenPosition)
+    def __init__(self, cursor):
+        super(Decl, self).__init__(cursor)
         self.variableDecl = None
         self.functionDecl = None
         self.isVariableDecl = False
-        self.process()
+        self.process(cursor)
 
-    def process(self):
-        nTok = self.tokens[self.tokenPosition]
-        nnTok = self.tokens[self.tokenPosition + 1]
-        nnnTok = self.tokens[self.tokenPosition + 2]
-        if (nTok.value in ["int", "double", "string", "bool", "void"]):
-            if (nnTok.type == "T_Identifier"):
-                if (nnnTok.value == '('):
-                    self.functionDecl = FunctionDecl(self.tokens, self.tokenPosition)
+    def process(self, cursor):
+        nTok = cursor.peek()
+        nnTok = cursor.peek(1)
+        nnnTok = cursor.peek(2)
+        if (nTok.kind in TYPE_NAME_KINDS):
+            if (nnTok.kind in IDENTIFIER_KINDS):
+                # with the input ending after the name a function is assumed, so 'void f' fails on the end of input too
+                if (nnnTok.kind == LPAREN or nnnTok.kind == EOF):
+                    self.functionDecl = FunctionDecl(cursor)
                     self.tokenPositionProcessed = self.functionDecl.tokenPositionProcessed
                 else:
                     self.isVariableDecl = True
-                    self.variableDecl = VariableDecl(self.tokens, self.tokenPosition)
+                    self.variableDecl = VariableDecl(cursor)
                     self.tokenPositionProcessed = self.variableDecl.tokenPositionProcessed
             else:
                 raise Exception(SyntaxErr, nnTok)
         else:
             raise Exception(SyntaxErr, nTok)
 
-    def print_tree(self, indent = 0): 
+    def write_tree(self, out, indent = 0): 
         if self.isVariableDecl:
-            self.variableDecl.print_tree(indent)
+            self.variableDecl.write_tree(out, indent)
         else:
-            self.functionDecl.print_tree(indent)
\ No newline at end of file
+            self.functionDecl.write_tree(out, indent)
\ No newline at end of file
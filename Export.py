@@ -0,0 +1,376 @@
+import sys
+import gc
+import json
+import marshal
+import struct
+from array import array
+from Scanner import Token
+from TokenTable import TokenTable, TokenView
+from Basic import Basic
+from Parser import ProgramNode
+from Decl import Decl
+from VariableDecl import VariableDecl
+from FunctionDecl import FunctionDecl
+from Variable import Variable
+from Type import Type
+from StmtBlock import StmtBlock
+from Stmt import Stmt
+from IfStmt import IfStmt
+from WhileStmt import WhileStmt
+from ForStmt import ForStmt
+from BreakStmt import BreakStmt
+from ReturnStmt import ReturnStmt
+from PrintStmt import PrintStmt
+from Expressions import Expressions
+from ExpressionSubnodes import AssignNode, BinaryExprNode, UnaryExprNode, CallNode, ConstantNode, FieldAccessNode
+
+# Machine-readable export of the AST, one record per top-level declaration. Both formats hold the declaration's
+# tokens and its Decl tree with the parser's attribute names; token references point into the record's tokens
+# and tokenPosition/tokenPositionProcessed count from the declaration's first token.
+#
+# jsonl, one JSON object per line, each record independent:
+#   "tokens": [value, line, start_col, end_col, kind] per token
+#   "nodes":  the nodes of the Decl tree, the Decl first and then breadth first, each {"node": class name,
+#             attribute: value, ...}; a token reference is {"token": index} and a node reference {"ref": index}
+#             into "nodes", so the JSON stays flat however deep the tree is
+# binary: MAGIC, then per record a 4-byte little-endian length and the marshal of
+#   (string pool, new shapes, lexeme, line, start_col, end_col and kind columns, tree typecode, tree)
+#   where columns and tree are little-endian arrays. A shape is (class name, ((attribute, field code), ...));
+#   shapes are numbered in order of appearance across the file, and a record only carries the ones it adds.
+#   The tree is the Decl in preorder: a shape number, then per field its integers (a string is a pool index,
+#   a list is its length followed by the items; True, False and None take none)
+#
+# Encoding and decoding use explicit stacks and queues, so trees nested deeper than the recursion limit, which
+# the parser accepts, export and load like any other
+#
+# Loading rebuilds the node objects over a TokenTable, so a loaded tree prints exactly like the parsed one
+
+MAGIC = b"DECAFAST1\n"
+LENGTH = struct.Struct("<I")
+
+NODE_CLASSES = {cls.__name__: cls for cls in (
+    Decl, VariableDecl, FunctionDecl, Variable, Type, StmtBlock, Stmt, IfStmt, WhileStmt, ForStmt, BreakStmt,
+    ReturnStmt, PrintStmt, Expressions, AssignNode, BinaryExprNode, UnaryExprNode, CallNode, ConstantNode,
+    FieldAccessNode)}
+
+# attributes holding positions in the token list; rebased to the declaration's first token
+POSITIONS = ("tokenPosition", "tokenPositionProcessed")
+
+# field codes of a binary shape
+INT = 0
+STRING = 1
+TOKEN = 2
+NODE = 3
+NODES = 4
+TRUE = 5
+FALSE = 6
+NONE = 7
+
+def _decl_tokens(decl):
+    return [decl.tokens[position] for position in range(decl.tokenPosition, decl.tokenPositionProcessed + 1)]
+
+def _token_index(token, indexes, base):
+    if type(token) is TokenView:
+        # a TokenTable hands out a new view on every access
+        return token.index - base
+    return indexes[id(token)]
+
+# jsonl record for one parsed declaration; decl.tokens may be a list, TokenTable or TokenStream
+def dump_decl(decl):
+    base = decl.tokenPosition
+    tokens = _decl_tokens(decl)
+    indexes = {id(token): index for index, token in enumerate(tokens)}
+    # nodes are numbered as they are reached, and encoded in that order
+    nodes = [decl]
+    records = []
+    for node in nodes:
+        record = {"node": type(node).__name__}
+        for name, field in node.__dict__.items():
+            if name == "tokens":
+                continue
+            if name in POSITIONS:
+                record[name] = field - base
+            elif type(field) is list:
+                record[name] = [_encode(item, indexes, base, nodes) for item in field]
+            else:
+                record[name] = _encode(field, indexes, base, nodes)
+        records.append(record)
+    return {
+        "tokens": [[token.value, token.line, token.start_col, token.end_col, int(token.kind)] for token in tokens],
+        "nodes": records,
+    }
+
+# a field that is not a list; a node is added to nodes and referenced by its number
+def _encode(value, indexes, base, nodes):
+    if type(value) is Token or type(value) is TokenView:
+        return {"token": _token_index(value, indexes, base)}
+    if hasattr(value, "__dict__"):
+        nodes.append(value)
+        return {"ref": len(nodes) - 1}
+    return value
+
+# Decl rebuilt from a jsonl record
+def load_decl(record):
+    tokens = TokenTable()
+    for value, line, start_col, end_col, kind in record["tokens"]:
+        tokens.add(value, line, start_col, end_col, kind)
+    records = record["nodes"]
+    # every node is made first, so that references can be resolved in any order
+    nodes = []
+    for fields in records:
+        cls = NODE_CLASSES[fields["node"]]
+        nodes.append(cls.__new__(cls))
+    for node, fields in zip(nodes, records):
+        attributes = node.__dict__
+        for key, field in fields.items():
+            if type(field) is list:
+                attributes[key] = [_decode(item, tokens, nodes) for item in field]
+            else:
+                attributes[key] = _decode(field, tokens, nodes)
+        del attributes["node"]
+        if isinstance(node, Basic):
+            attributes["tokens"] = tokens
+    return nodes[0]
+
+def _decode(value, tokens, nodes):
+    if type(value) is dict:
+        reference = value.get("ref")
+        if reference is not None:
+            return nodes[reference]
+        return tokens[value["token"]]
+    return value
+
+def _column(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+def _from_column(column, data):
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+# binary record (bytes) for one parsed declaration. shapes maps every shape written so far in the file to its
+# number and gains the ones this record adds
+def pack_decl(decl, shapes):
+    base = decl.tokenPosition
+    tokens = _decl_tokens(decl)
+    indexes = {id(token): index for index, token in enumerate(tokens)}
+    pool = {}
+    lexemes = [pool.setdefault(token.value, len(pool)) for token in tokens]
+    first_new_shape = len(shapes)
+    tree = []
+    _pack(decl, indexes, base, shapes, pool, tree)
+    tree_typecode = 'H' if max(tree) < 1 << 16 else 'I'
+    new_shapes = tuple(shapes)[first_new_shape:]
+    # marshal version 2 writes no back-references, which depend on object identity, so equal trees give equal bytes
+    return marshal.dumps((
+        tuple(pool), new_shapes, _column('I', lexemes), _column('I', [token.line for token in tokens]),
+        _column('I', [token.start_col for token in tokens]), _column('I', [token.end_col for token in tokens]),
+        bytes(int(token.kind) for token in tokens), tree_typecode, _column(tree_typecode, tree)), 2)
+
+# writes node and everything below it to tree in preorder. The stack holds what is still to be written, last
+# item first: nodes, and runs of integers that follow a node field
+def _pack(node, indexes, base, shapes, pool, tree):
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if type(item) is list:
+            tree.extend(item)
+            continue
+        fields = []
+        # the integers and nodes of the fields, in order
+        out = []
+        values = [0] # shape number, known once the fields are
+        for name, field in item.__dict__.items():
+            if name == "tokens":
+                continue
+            if field is True:
+                code = TRUE
+            elif field is False:
+                code = FALSE
+            elif field is None:
+                code = NONE
+            elif name in POSITIONS:
+                code = INT
+                values.append(field - base)
+            elif type(field) is int:
+                code = INT
+                values.append(field)
+            elif type(field) is str:
+                code = STRING
+                values.append(pool.setdefault(field, len(pool)))
+            elif type(field) is list:
+                code = NODES
+                values.append(len(field))
+                out.append(values)
+                out.extend(field)
+                values = []
+            elif type(field) is Token or type(field) is TokenView:
+                code = TOKEN
+                values.append(_token_index(field, indexes, base))
+            else:
+                code = NODE
+                out.append(values)
+                out.append(field)
+                values = []
+            fields.append((name, code))
+        out.append(values)
+        out[0][0] = shapes.setdefault((type(item).__name__, tuple(fields)), len(shapes))
+        tree.extend(out[0])
+        out.reverse()
+        out.pop()
+        stack.extend(out)
+
+# Decl rebuilt from a binary record. shapes is the list of shapes read so far in the file, in the form _shape
+# returns, and gains the ones this record adds
+def unpack_decl(data, shapes):
+    pool, new_shapes, lexemes, lines, start_cols, end_cols, kinds, tree_typecode, tree = marshal.loads(data)
+    tokens = TokenTable()
+    tokens.pool = list(pool)
+    tokens._pool_index = {value: index for index, value in enumerate(pool)}
+    _from_column(tokens.lexemes, lexemes)
+    _from_column(tokens.lines, lines)
+    _from_column(tokens.start_cols, start_cols)
+    _from_column(tokens.end_cols, end_cols)
+    tokens.kinds.frombytes(kinds)
+    shapes.extend(_shape(name, fields) for name, fields in new_shapes)
+    return _unpack(iter(_from_column(array(tree_typecode), tree)), tokens, pool, shapes)
+
+def _shape(name, fields):
+    cls = NODE_CLASSES[name]
+    return cls, fields, issubclass(cls, Basic)
+
+# a node of the given shape number, without its fields, and the frame that reads them:
+# [attributes, fields, index of the next field, list of nodes being read or None, nodes left in it]
+def _start(shape, tokens, shapes):
+    cls, fields, is_basic = shapes[shape]
+    node = cls.__new__(cls)
+    attributes = node.__dict__
+    if is_basic:
+        attributes["tokens"] = tokens
+    return node, [attributes, fields, 0, None, 0]
+
+# reads the preorder tree with a stack of frames, one per node whose fields are not all read yet
+def _unpack(values, tokens, pool, shapes):
+    root, frame = _start(next(values), tokens, shapes)
+    stack = [frame]
+    while stack:
+        frame = stack[-1]
+        items = frame[3]
+        if items is not None:
+            if frame[4] == 0:
+                frame[3] = None
+                continue
+            frame[4] -= 1
+            node, child = _start(next(values), tokens, shapes)
+            items.append(node)
+            stack.append(child)
+            continue
+        attributes, fields, index = frame[0], frame[1], frame[2]
+        if index == len(fields):
+            stack.pop()
+            continue
+        frame[2] = index + 1
+        name, code = fields[index]
+        if code == INT:
+            attributes[name] = next(values)
+        elif code == NODE:
+            attributes[name], child = _start(next(values), tokens, shapes)
+            stack.append(child)
+        elif code == TOKEN:
+            attributes[name] = TokenView(tokens, next(values))
+        elif code == STRING:
+            attributes[name] = pool[next(values)]
+        elif code == NODES:
+            attributes[name] = frame[3] = []
+            frame[4] = next(values)
+        else:
+            attributes[name] = True if code == TRUE else False if code == FALSE else None
+    return root
+
+# writers take one parsed declaration at a time, so they can follow the streaming parser
+class JsonlWriter:
+    def __init__(self, sink, buffer_records = 256):
+        self.sink = sink
+        self.buffer_records = buffer_records
+        self.records = []
+
+    def write_decl(self, decl):
+        self.records.append(json.dumps(dump_decl(decl), separators = (",", ":")))
+        if len(self.records) >= self.buffer_records:
+            self.flush()
+
+    def flush(self):
+        if self.records:
+            self.records.append("")
+            self.sink.write("\n".join(self.records))
+            self.records = []
+
+class BinaryWriter:
+    def __init__(self, sink, buffer_records = 256):
+        self.sink = sink
+        self.buffer_records = buffer_records
+        self.records = [MAGIC]
+        self.shapes = {}
+
+    def write_decl(self, decl):
+        data = pack_decl(decl, self.shapes)
+        self.records.append(LENGTH.pack(len(data)))
+        self.records.append(data)
+        if len(self.records) >= 2 * self.buffer_records:
+            self.flush()
+
+    def flush(self):
+        if self.records:
+            self.sink.write(b"".join(self.records))
+            self.records = []
+
+WRITERS = {"jsonl": JsonlWriter, "binary": BinaryWriter}
+
+# writes every declaration of a parsed program; sink is a text file for jsonl and a binary file for binary
+def export(program_node, sink, format):
+    writer = WRITERS[format](sink)
+    for decl in program_node.decls:
+        writer.write_decl(decl)
+    writer.flush()
+
+# yields the declarations of a jsonl export (any iterable of lines)
+def iter_jsonl(lines):
+    for line in lines:
+        if line.strip():
+            yield load_decl(json.loads(line))
+
+# yields the declarations of a binary export held in data (bytes)
+def iter_binary(data):
+    if not data.startswith(MAGIC):
+        raise ValueError("not a binary AST export")
+    position = len(MAGIC)
+    view = memoryview(data)
+    shapes = []
+    while position < len(data):
+        (length,) = LENGTH.unpack_from(data, position)
+        position += LENGTH.size
+        yield unpack_decl(view[position:position + length], shapes)
+        position += length
+
+# ProgramNode from an export file in either format
+# The collector is paused while the nodes are built: loading only allocates, the nodes hold no reference cycles,
+# and the repeated full collections over the growing tree otherwise cost more than the loading itself
+def load(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    program_node = ProgramNode()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if data.startswith(MAGIC):
+            program_node.decls.extend(iter_binary(data))
+        else:
+            program_node.decls.extend(iter_jsonl(data.decode().splitlines()))
+    finally:
+        if enabled:
+            gc.enable()
+    return program_node
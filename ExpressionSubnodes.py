@@ -1,7 +1,9 @@
 # This file contains all the subnodes for the expressions as outlined in the expected output for the 3rd deliverable
 
-class Node():
-    def print_tree(self, indent=0):
+from TreeWriter import TreePrinter
+
+class Node(TreePrinter):
+    def write_tree(self, out, indent=0):
         pass
 
 class AssignNode(Node):
@@ -10,20 +12,20 @@ class AssignNode(Node):
         self.operator = operator
         self.rhs = rhs
     
-    def print_tree(self, indent=0, label = ""):
+    def write_tree(self, out, indent=0, label = ""):
         line = self.operator.line
 
         # header
-        print(f"{line} \t" + "\t" * indent + label + "AssignExpr:")
+        out.write(line, indent, label + "AssignExpr:")
         
         # left print
-        self.lhs.print_tree(indent + 1)
+        self.lhs.write_tree(out, indent + 1)
         
         # operator print
-        print(f"{line} \t" + "\t" * (indent + 1) + "Operator: " + self.operator.value)
+        out.write(line, indent + 1, "Operator: " + self.operator.value)
         
         # right print
-        self.rhs.print_tree(indent + 1)
+        self.rhs.write_tree(out, indent + 1)
 
 # ArithmeticExpr, RelationalExpr, and LogicalExpr all share similar node structures in the expected output
 class BinaryExprNode(Node):
@@ -33,19 +35,19 @@ class BinaryExprNode(Node):
         self.rhs = rhs
         self.expr_type = expr_type
     
-    def print_tree(self, indent = 0, label = ""):
+    def write_tree(self, out, indent = 0, label = ""):
         line = self.operator.line
         # header
-        print(f"{line} \t" + "\t" * indent + label + self.expr_type + ":")
+        out.write(line, indent, label + self.expr_type + ":")
         
         # left print
-        self.lhs.print_tree(indent + 1) 
+        self.lhs.write_tree(out, indent + 1) 
         
         # operator print
-        print(f"{line} \t" + "\t" * (indent + 1) + "Operator: " + self.operator.value)
+        out.write(line, indent + 1, "Operator: " + self.operator.value)
         
         # right print
-        self.rhs.print_tree(indent + 1)
+        self.rhs.write_tree(out, indent + 1)
 
 # UnaryExprNode is used for negation and logical not
 class UnaryExprNode(Node):
@@ -54,17 +56,17 @@ class UnaryExprNode(Node):
         self.operand = operand
         self.expr_type = expr_type
 
-    def print_tree(self, indent=0, label = ""):
+    def write_tree(self, out, indent=0, label = ""):
         line = self.operator.line
 
         # header print
-        print(f"{line} \t" + "\t" * indent + label + self.expr_type + ":")
+        out.write(line, indent, label + self.expr_type + ":")
         
         # operator
-        print(f"{line} \t" + "\t" * (indent + 1) + "Operator: " + self.operator.value)
+        out.write(line, indent + 1, "Operator: " + self.operator.value)
         
         # operand
-        self.operand.print_tree(indent + 1)
+        self.operand.write_tree(out, indent + 1)
 
 # function calls
 class CallNode(Node):
@@ -72,34 +74,34 @@ class CallNode(Node):
         self.identifier = identifier
         self.arguments = arguments
 
-    def print_tree(self, indent = 0, label = ""):
+    def write_tree(self, out, indent = 0, label = ""):
         line = self.identifier.line
         
         # header 
-        print(f"{line} \t" + "\t" * indent + label + "Call:")
+        out.write(line, indent, label + "Call:")
         
         # identifer
-        print(f"{line} \t" + "\t" * (indent + 1) + "Identifier: " + self.identifier.value)
+        out.write(line, indent + 1, "Identifier: " + self.identifier.value)
         
         # arguments print
         for argument in self.arguments:
-            argument.print_tree(indent + 1, label="(actuals) ")
+            argument.write_tree(out, indent + 1, label="(actuals) ")
 
 # int, boolean, and string constants
 class ConstantNode(Node):
     def __init__(self, token):
         self.token = token
 
-    def print_tree(self, indent = 0, label = ""):
+    def write_tree(self, out, indent = 0, label = ""):
         line = self.token.line
         type_name = self.token.type[2:] # remove the 'T_' prefix to match expected output
-        print(f"{line} \t" + "\t" * indent + label + type_name + ": " + self.token.value)
+        out.write(line, indent, label + type_name + ": " + self.token.value)
 
 class FieldAccessNode(Node):
     def __init__(self, variable):
         self.variable = variable
     
-    def print_tree(self, indent=0, label=""):
+    def write_tree(self, out, indent=0, label=""):
         line = self.variable.line
-        print(f"{line} \t" + "\t" * indent + label + "FieldAccess:")
-        print(f"{line} \t" + "\t" * (indent + 1) + "Identifier: " + self.variable.value)
+        out.write(line, indent, label + "FieldAccess:")
+        out.write(line, indent + 1, "Identifier: " + self.variable.value)
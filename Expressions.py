@@ -1,143 +1,257 @@
 from Basic import Basic
 from Basic import SyntaxErr
+from TokenKind import ASSIGN, OR, LOGICALAND, EQ, LT, GT, LESSEQUAL, GEQ, PLUS, MINUS, MULT, DIV, NOT, LPAREN, RPAREN, COMMA, CONSTANT_KINDS, IDENTIFIER_KINDS, RELATIONAL_KINDS
 from ExpressionSubnodes import AssignNode, BinaryExprNode, UnaryExprNode, CallNode, ConstantNode, FieldAccessNode
 
+# binding power and node label of every binary operator, higher binds tighter. The recursive descent methods
+# below make every level right associative, and so does the precedence engine unless left_associative is set
+BINARY_OPERATORS = {
+    ASSIGN: (1, None), # AssignNode
+    OR: (2, "LogicalExpr"),
+    LOGICALAND: (3, "LogicalExpr"),
+    EQ: (4, "RelationalExpr"),
+    LT: (5, "RelationalExpr"),
+    GT: (5, "RelationalExpr"),
+    LESSEQUAL: (5, "RelationalExpr"),
+    GEQ: (5, "RelationalExpr"),
+    PLUS: (6, "ArithmeticExpr"),
+    MINUS: (6, "ArithmeticExpr"),
+    MULT: (7, "ArithmeticExpr"),
+    DIV: (7, "ArithmeticExpr"),
+}
+UNARY_POWER = 8 # logical not binds tighter than any binary operator
+
+# open parentheses and calls sit on the operator stack with power 0, so no reduction crosses them
+PAREN = 0
+CALL = 1
+
 class Expressions(Basic):
+    # "precedence" is the table-driven engine, "recursive" the original recursive descent methods
+    engine = "precedence"
+    # spec-correct left associativity for binary operators (assignment stays right associative); precedence engine only
+    left_associative = False
 
-    def __init__(self, tokens, tokenPosition):
-        super(Expressions, self).__init__(tokens, tokenPosition)
-        # top down recursive descent parsing
-        self.expression_root = self._parse_assignment()
+    def __init__(self, cursor):
+        super(Expressions, self).__init__(cursor)
+        if self.engine == "recursive":
+            # top down recursive descent parsing
+            self.expression_root = self._parse_assignment(cursor)
+        else:
+            self.expression_root = self._parse_precedence(cursor)
+        self.tokenPosition = cursor.position
         self.tokenPositionProcessed = self.tokenPosition - 1 #Stmt throws error expecting to be after the seminicolon that an expression ends on, subtracting 1 here to account for this
 
-    def _parse_assignment(self):
+    # operator precedence parsing with explicit operand and operator stacks, so neither long operator chains nor
+    # deep parentheses use Python recursion. Builds the same nodes and raises on the same tokens as _parse_assignment.
+    # The hot path of the parser: it reads the cursor's tokens itself, without peek and advance calls. Input that
+    # ends inside an expression leaves the statement unfinished whatever comes next, so the end of the tokens is
+    # a syntax error on the EOF sentinel right away; any other IndexError propagates
+    def _parse_precedence(self, cursor):
+        tokens = cursor.tokens
+        position = cursor.position
+        operands = []
+        operators = [] # (power, operator token, node label, operand count at a call)
+        left_associative = self.left_associative
+
+        try:
+            while True:
+                # an operand is expected: prefix operators, then a constant, identifier, call or '('
+                token = tokens[position]
+                while token.kind == NOT:
+                    operators.append((UNARY_POWER, token, "LogicalExpr", None))
+                    position += 1
+                    token = tokens[position]
+                kind = token.kind
+
+                if kind in CONSTANT_KINDS:
+                    operands.append(ConstantNode(token))
+                    position += 1
+                elif kind == LPAREN:
+                    operators.append((0, token, PAREN, None))
+                    position += 1
+                    continue
+                elif kind in IDENTIFIER_KINDS:
+                    position += 1
+                    if tokens[position].kind == LPAREN:
+                        position += 1
+                        if tokens[position].kind != RPAREN:
+                            operators.append((0, token, CALL, len(operands)))
+                            continue
+                        operands.append(CallNode(token, []))
+                        position += 1
+                    else:
+                        operands.append(FieldAccessNode(token))
+                else:
+                    raise Exception(SyntaxErr, token)
+
+                # an operand was parsed: continue with a binary operator, or close parentheses and calls
+                while True:
+                    token = tokens[position]
+                    entry = BINARY_OPERATORS.get(token.kind)
+                    if entry is not None:
+                        power = entry[0]
+                        while operators and (operators[-1][0] > power or (left_associative and power != 1 and operators[-1][0] == power)):
+                            self._reduce(operators, operands)
+                        operators.append((power, token, entry[1], None))
+                        position += 1
+                        break
+
+                    while operators and operators[-1][0] != 0:
+                        self._reduce(operators, operands)
+                    if not operators:
+                        # not an operator and nothing left open: the expression ends before this token
+                        cursor.position = position
+                        return operands[-1]
+
+                    _, opener, opened, count = operators[-1]
+                    if opened == CALL and token.kind == COMMA:
+                        position += 1
+                        break
+                    if token.kind != RPAREN:
+                        raise Exception(SyntaxErr, token)
+                    operators.pop()
+                    position += 1
+                    if opened == CALL:
+                        arguments = operands[count:]
+                        del operands[count:]
+                        operands.append(CallNode(opener, arguments))
+        except IndexError:
+            # every read is tokens[position]; an IndexError before the end is not the end of the input
+            if position < len(tokens):
+                raise
+            cursor.position = position
+            raise Exception(SyntaxErr, cursor.eof())
+
+    @staticmethod
+    def _reduce(operators, operands):
+        power, operator, label, _ = operators.pop()
+        if power == UNARY_POWER:
+            operands.append(UnaryExprNode(operator, operands.pop(), label))
+            return
+        rhs = operands.pop()
+        lhs = operands.pop()
+        if label is None:
+            operands.append(AssignNode(lhs, operator, rhs))
+        else:
+            operands.append(BinaryExprNode(lhs, operator, rhs, label))
+
+    def _parse_assignment(self, cursor):
         # parse the left hand side of the assignment expression
-        lhs = self._parse_logical_or()
+        lhs = self._parse_logical_or(cursor)
         # check for assignment operator
-        if self.tokenPosition < len(self.tokens) and self.tokens[self.tokenPosition].value == "=":
-            operator = self.tokens[self.tokenPosition]
-            self.tokenPosition += 1
-            rhs = self._parse_assignment()
+        if cursor.peek().kind == ASSIGN:
+            operator = cursor.advance()
+            rhs = self._parse_assignment(cursor)
             return AssignNode(lhs, operator, rhs)
         return lhs
     
-    def _parse_logical_or(self):
-        lhs = self._parse_logical_and()
-        if self.tokenPosition < len(self.tokens) and self.tokens[self.tokenPosition].value == "||":
-            operator = self.tokens[self.tokenPosition]
-            self.tokenPosition += 1
-            rhs = self._parse_logical_or()
+    def _parse_logical_or(self, cursor):
+        lhs = self._parse_logical_and(cursor)
+        if cursor.peek().kind == OR:
+            operator = cursor.advance()
+            rhs = self._parse_logical_or(cursor)
             return BinaryExprNode(lhs, operator, rhs, "LogicalExpr")
         return lhs
 
-    def _parse_logical_and(self):
-        lhs = self._parse_equality()
-        if self.tokenPosition < len(self.tokens) and self.tokens[self.tokenPosition].value == "&&":
-            operator = self.tokens[self.tokenPosition]
-            self.tokenPosition += 1
-            rhs = self._parse_logical_and()
+    def _parse_logical_and(self, cursor):
+        lhs = self._parse_equality(cursor)
+        if cursor.peek().kind == LOGICALAND:
+            operator = cursor.advance()
+            rhs = self._parse_logical_and(cursor)
             return BinaryExprNode(lhs, operator, rhs, "LogicalExpr")
         return lhs
     
-    def _parse_equality(self):
-        lhs = self._parse_relational()
-        if self.tokenPosition < len(self.tokens) and self.tokens[self.tokenPosition].value == "==":
-            operator = self.tokens[self.tokenPosition]
-            self.tokenPosition += 1
-            rhs = self._parse_equality()
+    def _parse_equality(self, cursor):
+        lhs = self._parse_relational(cursor)
+        if cursor.peek().kind == EQ:
+            operator = cursor.advance()
+            rhs = self._parse_equality(cursor)
             return BinaryExprNode(lhs, operator, rhs, "RelationalExpr")
         return lhs
     
-    def _parse_relational(self):
-        lhs = self._parse_arithmetic()
-        if self.tokenPosition < len(self.tokens) and self.tokens[self.tokenPosition].value in ["<", ">", "<=", ">="]:
-            operator = self.tokens[self.tokenPosition] 
-            self.tokenPosition += 1
-            rhs = self._parse_relational()
+    def _parse_relational(self, cursor):
+        lhs = self._parse_arithmetic(cursor)
+        if cursor.peek().kind in RELATIONAL_KINDS:
+            operator = cursor.advance()
+            rhs = self._parse_relational(cursor)
             return BinaryExprNode(lhs, operator, rhs, "RelationalExpr")
         return lhs
     
     # addition or subtraction
-    def _parse_arithmetic(self):
-        lhs = self._parse_multiplicative()
-        if self.tokenPosition < len(self.tokens) and (self.tokens[self.tokenPosition].value == "+" or self.tokens[self.tokenPosition].value == "-"):
-            operator = self.tokens[self.tokenPosition]
-            self.tokenPosition += 1
-            rhs = self._parse_arithmetic()
+    def _parse_arithmetic(self, cursor):
+        lhs = self._parse_multiplicative(cursor)
+        if cursor.peek().kind == PLUS or cursor.peek().kind == MINUS:
+            operator = cursor.advance()
+            rhs = self._parse_arithmetic(cursor)
             return BinaryExprNode(lhs, operator, rhs, "ArithmeticExpr")
         return lhs
     
     # multiplication or division
-    def _parse_multiplicative(self):
-        lhs = self._parse_unary()
-        if self.tokenPosition < len(self.tokens) and (self.tokens[self.tokenPosition].value == "*" or self.tokens[self.tokenPosition].value == "/"):
-            operator = self.tokens[self.tokenPosition]
-            self.tokenPosition += 1
-            rhs = self._parse_multiplicative()
+    def _parse_multiplicative(self, cursor):
+        lhs = self._parse_unary(cursor)
+        if cursor.peek().kind == MULT or cursor.peek().kind == DIV:
+            operator = cursor.advance()
+            rhs = self._parse_multiplicative(cursor)
             return BinaryExprNode(lhs, operator, rhs, "ArithmeticExpr")
         return lhs
     
     # logical not
-    def _parse_unary(self):
-        if self.tokenPosition < len(self.tokens) and self.tokens[self.tokenPosition].value == "!":
-            operator = self.tokens[self.tokenPosition]
-            self.tokenPosition += 1
-            operand = self._parse_unary()
+    def _parse_unary(self, cursor):
+        if cursor.peek().kind == NOT:
+            operator = cursor.advance()
+            operand = self._parse_unary(cursor)
             return UnaryExprNode(operator, operand, "LogicalExpr")
-        return self._parse_base()
+        return self._parse_base(cursor)
     
     # at the base of the expression tree: could be a constant, an identifier, or a parentheses with an expression inside
-    def _parse_base(self):
-        current_token = self.tokens[self.tokenPosition]
+    def _parse_base(self, cursor):
+        current_token = cursor.peek()
         
         # literal value
-        if current_token.is_constant:
-            self.tokenPosition += 1
+        if current_token.kind in CONSTANT_KINDS:
+            cursor.advance()
             variable = ConstantNode(current_token)
             return variable 
 
         # expression in parentheses
-        elif current_token.value == "(":
-            self.tokenPosition += 1 # skip '('
-            expression = self._parse_assignment() 
-            if self.tokens[self.tokenPosition].value != ")":
-                raise Exception(SyntaxErr, self.tokens[self.tokenPosition])
-            self.tokenPosition += 1 # skip ')'
+        elif current_token.kind == LPAREN:
+            cursor.advance() # skip '('
+            expression = self._parse_assignment(cursor) 
+            cursor.expect(RPAREN) # skip ')'
             return expression 
 
         # identifier (variable name or function name)
-        elif current_token.type == "T_Identifier":
-            if self.tokenPosition < len(self.tokens) and self.tokens[self.tokenPosition + 1].value == "(":
-                return self._parse_function_calls()
+        elif current_token.kind in IDENTIFIER_KINDS:
+            if cursor.peek(1).kind == LPAREN:
+                return self._parse_function_calls(cursor)
             else:
-                self.tokenPosition += 1
+                cursor.advance()
                 return FieldAccessNode(current_token)
             
         else:
             raise Exception(SyntaxErr, current_token)
 
     # function calls
-    def _parse_function_calls(self):
-        identifier = self.tokens[self.tokenPosition]
-        self.tokenPosition += 2 # skip identifier and '('
+    def _parse_function_calls(self, cursor):
+        identifier = cursor.advance()
+        cursor.advance() # skip '('
         
         # no arguments
-        if self.tokens[self.tokenPosition].value == ")":
+        if cursor.peek().kind == RPAREN:
+            cursor.advance() # skip ')'
             return CallNode(identifier, []) 
         
-        arguments = [self._parse_assignment()]
+        arguments = [self._parse_assignment(cursor)]
         
         # parse additional arguments
-        while self.tokens[self.tokenPosition].value == ",":
-            self.tokenPosition += 1 # skip comma
-            arguments.append(self._parse_assignment())
+        while cursor.peek().kind == COMMA:
+            cursor.advance() # skip comma
+            arguments.append(self._parse_assignment(cursor))
 
         # check for closing parenthesis
-        if self.tokens[self.tokenPosition].value != ")":
-            raise Exception(SyntaxErr, self.tokens[self.tokenPosition])
-        self.tokenPosition += 1 # skip ')'
+        cursor.expect(RPAREN) # skip ')'
 
         return CallNode(identifier, arguments)
     
-    def print_tree(self, indent = 0, label = ""):
-        self.expression_root.print_tree(indent, label)
\ No newline at end of file
+    def write_tree(self, out, indent = 0, label = ""):
+        self.expression_root.write_tree(out, indent, label)
\ No newline at end of file
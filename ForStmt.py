@@ -1,73 +1,75 @@
 from Basic import Basic
 from Basic import SyntaxErr
+from TokenKind import LPAREN, SEMICOLON, RPAREN
 from Expressions import Expressions
 import Stmt as st
 
 # currently unmodified aside from correcting the typo "tokenPostion" in entry code
 class ForStmt(Basic, object):
-    def __init__(self, tokens, tokenPosition):
-        super(ForStmt, self).__init__(tokens, tokenPosition)
+    def __init__(self, cursor):
+        super(ForStmt, self).__init__(cursor)
         self.hasFirstExp = False
         self.hasLastExp = False
-        self.check_left_par()
-        self.check_first_exp()
-        self.check_middle_exp()
-        self.check_last_exp()
-        self.set_stmt()
+        self.parse_header(cursor)
+        self.set_stmt(cursor)
 
-    def check_left_par(self):
-        ntok = self.tokens[self.tokenPosition + 1]
-        if ntok.value != "(":
-            raise Exception(SyntaxErr, ntok)
-        self.tokenPositionProcessed = self.tokenPosition + 1
+    # "(" init ";" test ";" step ")"; leaves the cursor at the body
+    def parse_header(self, cursor):
+        self.check_left_par(cursor)
+        self.check_first_exp(cursor)
+        self.check_middle_exp(cursor)
+        self.check_last_exp(cursor)
+        self.tokenPositionProcessed = cursor.position - 1
+
+    def check_left_par(self, cursor):
+        cursor.advance()
+        cursor.expect(LPAREN)
 
-    def check_first_exp(self):
-        ntok = self.tokens[self.tokenPositionProcessed + 1]
-        if ntok.value != ";":
-            firstexp = Expressions(self.tokens, self.tokenPositionProcessed + 1)
+    # the token ending the init and the test expression is skipped without a check, as it always was
+    def check_first_exp(self, cursor):
+        ntok = cursor.peek()
+        if ntok.kind != SEMICOLON:
+            firstexp = Expressions(cursor)
             self.firstexp = firstexp
             self.hasFirstExp = True
-            self.tokenPositionProcessed = firstexp.tokenPositionProcessed
 
-        self.tokenPositionProcessed += 1
+        cursor.advance()
 
-    def check_middle_exp(self):
-        ntok = self.tokens[self.tokenPositionProcessed + 1]
-        if ntok.value != ";":
-            middleexp = Expressions(self.tokens, self.tokenPositionProcessed + 1)
+    def check_middle_exp(self, cursor):
+        ntok = cursor.peek()
+        if ntok.kind != SEMICOLON:
+            middleexp = Expressions(cursor)
             self.middleexp = middleexp
-            self.tokenPositionProcessed = middleexp.tokenPositionProcessed
         else:
             raise Exception(SyntaxErr, ntok)
-        self.tokenPositionProcessed += 1
+        cursor.advance()
 
-    def check_last_exp(self):
-        ntok = self.tokens[self.tokenPositionProcessed + 1]
-        if ntok.value != ")":
-            lastexp = Expressions(self.tokens, self.tokenPositionProcessed + 1)
+    def check_last_exp(self, cursor):
+        ntok = cursor.peek()
+        if ntok.kind != RPAREN:
+            lastexp = Expressions(cursor)
             self.lastexp = lastexp
             self.hasLastExp = True
-            self.tokenPositionProcessed = lastexp.tokenPositionProcessed
-        self.tokenPositionProcessed += 1
+        cursor.advance()
 
-    def set_stmt(self):
-        stmt = st.Stmt(self.tokens, self.tokenPositionProcessed + 1)
+    def set_stmt(self, cursor):
+        stmt = st.Stmt(cursor)
         self.tokenPositionProcessed = stmt.tokenPositionProcessed
         self.stmt = stmt
 
-    def print_tree(self, indent = 0, label = ""):
+    def write_tree(self, out, indent = 0, label = ""):
         line = self.tokens[self.tokenPosition].line
-        print(f"{line} \t" + "\t" * indent + label + "ForStmt:")
+        out.write(line, indent, label + "ForStmt:")
 
         # first expression
         if self.hasFirstExp:
-            self.firstexp.print_tree(indent + 1, label = "(init) ")
+            self.firstexp.write_tree(out, indent + 1, label = "(init) ")
 
         # condition expression
-        self.middleexp.print_tree(indent + 1, label = "(test) ")
+        self.middleexp.write_tree(out, indent + 1, label = "(test) ")
         
         # fori increment
         if self.hasLastExp:
-            self.lastexp.print_tree(indent + 1, label = "(step) ")
+            self.lastexp.write_tree(out, indent + 1, label = "(step) ")
         
-        self.stmt.print_tree(indent + 1)
\ No newline at end of file
+        self.stmt.write_tree(out, indent + 1)
\ No newline at end of file
@@ -1,60 +1,59 @@
 from Variable import Variable
 from StmtBlock import StmtBlock
-from Basic import SyntaxErr
+from TokenKind import LPAREN, RPAREN, COMMA
 
 class FunctionDecl(Variable, object):
-    def __init__(self, tokens, tokenPosition):
-        super(FunctionDecl, self).__init__(tokens, tokenPosition, True)
+    def __init__(self, cursor):
+        super(FunctionDecl, self).__init__(cursor, True)
         self.formals = [] #variable objects
         self.hasFormals = False
-        self.processFormals(self.tokenPosition + 3)
-        self.stmtBlock = StmtBlock(tokens, self.tokenPositionProcessed + 1)
+        cursor.expect(LPAREN)
+        self.processFormals(cursor)
+        self.stmtBlock = StmtBlock(cursor)
         self.tokenPositionProcessed = self.stmtBlock.tokenPositionProcessed
-        self.type = tokens[tokenPosition].value
-        self.identifier = tokens[tokenPosition + 1].value
+        self.type = self.type.value
 
-    def processFormals(self, tokPosToProcess):
+    def processFormals(self, cursor):
         variableList = []
         
         #there are no formals, closes immediately
-        if self.tokens[tokPosToProcess].value == ")":
-            self.tokenPositionProcessed = tokPosToProcess
+        if cursor.peek().kind == RPAREN:
+            cursor.advance()
             return variableList
 
         #process first formal
-        variableList.append(Variable(self.tokens, tokPosToProcess))
+        variableList.append(Variable(cursor))
         
         # process additional formals if present 
-        while self.tokens[tokPosToProcess + 2].value == ",":
-            tokPosToProcess += 3
-            variableList.append(Variable(self.tokens, tokPosToProcess))
+        while cursor.peek().kind == COMMA:
+            cursor.advance()
+            variableList.append(Variable(cursor))
 
         # check if closing parentheses are after the formals
-        if self.tokens[tokPosToProcess + 2].value != ")":
-            raise Exception(SyntaxErr, self.tokens[tokPosToProcess + 2])
+        cursor.expect(RPAREN)
 
         self.formals = variableList
         self.hasFormals = len(variableList) != 0
-        self.tokenPositionProcessed = tokPosToProcess + 2 # originally was "+= (tokPosToProcess + 2)"" but this was throwing errors because the tokenPositionProcessed was effectively doubling instead of incrementing
+        return variableList
     
     # print tree can have return type, identifier, formals, and body
-    def print_tree(self, indent = 0):
+    def write_tree(self, out, indent = 0):
         line = self.tokens[self.tokenPosition].line
         
         # header
-        print(f"{line} \t" + "\t" * indent  + "FnDecl:")
+        out.write(line, indent, "FnDecl:")
 
         # return type
-        print(f"{line} \t" + "\t" * (indent + 1) + "(return type) Type: " + self.type)
+        out.write(line, indent + 1, "(return type) Type: " + self.type)
 
         # identifier
-        print(f"{line} \t" + "\t" * (indent + 1) + "Identifier: " + self.identifier)
+        out.write(line, indent + 1, "Identifier: " + self.identifier)
 
         # formals are variables, so they need to be hard coded to print VarDecl to follow implementation and expected output
         for formal in self.formals:
-            print(f"{line} \t" + "\t" * (indent + 1) + "(formals) VarDecl:")
-            print(f"{line} \t" + "\t" * (indent + 2) + "Type: " + formal.type.value)
-            print(f"{line} \t" + "\t" * (indent + 2) + "Identifier: " + formal.identifier)
+            out.write(line, indent + 1, "(formals) VarDecl:")
+            out.write(line, indent + 2, "Type: " + formal.type.value)
+            out.write(line, indent + 2, "Identifier: " + formal.identifier)
 
         # body
-        self.stmtBlock.print_tree(indent + 1, label = "(body) ")
+        self.stmtBlock.write_tree(out, indent + 1, label = "(body) ")
@@ -1,5 +1,5 @@
 from Basic import Basic
-from Basic import SyntaxErr
+from TokenKind import LPAREN, RPAREN, ELSE
 from Expressions import Expressions
 import Stmt as st
 
@@ -7,44 +7,49 @@ import Stmt as st
 # deliverable 3 stores the condition of the if statement, the then statement, and 
 # the else statement. They are printed sequentially (in present) in t4.out
 class IfStmt(Basic, object):
-    def __init__(self, tokens, tokenPosition):
-        super(IfStmt, self).__init__(tokens, tokenPosition)
+    def __init__(self, cursor):
+        super(IfStmt, self).__init__(cursor)
         self.withElse = False
         
-        # if statement matched by a call from Stmt, next check for "("
-        if tokens[tokenPosition + 1].value != "(":
-            raise Exception(SyntaxErr, tokens[tokenPosition + 1])
-        
-        # condition expr
-        self.condition = Expressions(tokens, tokenPosition + 2)
-        
-        #  )
-        next_token_position = self.condition.tokenPositionProcessed + 1
-        if tokens[next_token_position].value != ")":
-            raise Exception(SyntaxErr, tokens[next_token_position])
-        
         # 'then' statement
-        self.thenStmt = st.Stmt(tokens, next_token_position + 1)
+        self.parse_condition(cursor)
+        self.thenStmt = st.Stmt(cursor)
         
         self.tokenPositionProcessed = self.thenStmt.tokenPositionProcessed
         
         #  else clause could optionally appear
-        if (self.tokenPositionProcessed + 1 < len(tokens) and 
-            tokens[self.tokenPositionProcessed + 1].type.lower() == "T_Else".lower()):
+        if self.has_else(cursor):
             self.withElse = True
-            self.elseStmt = st.Stmt(tokens, self.tokenPositionProcessed + 2)
+            cursor.advance()
+            self.elseStmt = st.Stmt(cursor)
             self.tokenPositionProcessed = self.elseStmt.tokenPositionProcessed
 
-    def print_tree(self, indent = 0):
+    # "(" condition ")" after the if keyword; leaves the cursor at the 'then' statement
+    def parse_condition(self, cursor):
+        # if statement matched by a call from Stmt, next check for "("
+        cursor.advance()
+        cursor.expect(LPAREN)
+        
+        # condition expr
+        self.condition = Expressions(cursor)
+        
+        #  )
+        cursor.expect(RPAREN)
+
+    # whether an else follows the 'then' statement parsed so far
+    def has_else(self, cursor):
+        return cursor.peek().kind == ELSE
+
+    def write_tree(self, out, indent = 0):
         line = self.tokens[self.tokenPosition].line
-        print(f"{line} \t" + "\t" * indent + "IfStmt:")
+        out.write(line, indent, "IfStmt:")
         
         # condition print
-        self.condition.print_tree(indent + 1, label = "(test) ")
+        self.condition.write_tree(out, indent + 1, label = "(test) ")
 
         # then statement
-        self.thenStmt.print_tree(indent + 1)
+        self.thenStmt.write_tree(out, indent + 1)
 
         # else statement
         if self.withElse:
-            self.elseStmt.print_tree(indent + 1)
\ No newline at end of file
+            self.elseStmt.write_tree(out, indent + 1)
\ No newline at end of file
@@ -0,0 +1,176 @@
+import io
+import contextlib
+from bisect import bisect_left
+from Scanner import Scanner
+from Parser import ProgramNode, iterDecls
+from Basic import Basic
+from TokenKind import CHARCONSTANT, EOF
+from SourceFile import SourceFile
+
+# Incremental parsing for editors. The program is kept as a sequence of regions, one per top-level declaration:
+# the declaration's tokens in a list of their own (so every node's token positions count from the start of its
+# declaration and never need shifting) and the text offset just past its last token. A region covers the text
+# from the end of the previous region up to its own end; text after the last declaration belongs to the last one.
+#
+# An edit relexes and reparses only the regions it touches, starting at the beginning of the line of the first
+# one (tokens never cross a line, so the tokens before the region on that line are rebuilt identically and
+# dropped). Declarations are parsed from the start of a region onwards only, so a reparse that completes inside
+# the touched regions is exactly what a full parse would produce there; one that runs out of tokens takes in
+# the next region and tries again. Later regions are reused as they are, only the line of their tokens moves
+# when the edit adds or removes lines. Anything unusual -- a syntax or scan error, or a char literal closed by
+# a newline, after which scanner lines no longer follow the text -- falls back to a full parse
+class IncrementalParser:
+    def __init__(self, text):
+        self.full_parses = 0
+        self.partial_parses = 0
+        self._parse_all(text)
+
+    # ProgramNode of the current text, or None when it has an error
+    @property
+    def program(self):
+        if self.error is not None:
+            return None
+        program_node = ProgramNode()
+        program_node.decls = list(self.decls)
+        return program_node
+
+    # replaces text[start:end] with replacement and updates the parse
+    def edit(self, start, end, replacement):
+        text = self.text[:start] + replacement + self.text[end:]
+        if self.error is not None or not self.decls or not self._reparse(text, start, end, replacement):
+            self._parse_all(text)
+
+    def _parse_all(self, text):
+        self.full_parses += 1
+        self.text = text
+        self.decls = []
+        self.region_tokens = []
+        self.ends = []
+        self.error = None # (error type, token) of a syntax error, or the scanner messages of a scan error
+
+        scanner, messages = _scan(text)
+        if scanner.errors:
+            self.error = ("scan error", messages)
+            return
+        tokens = scanner.tokens
+        if not tokens:
+            self.error = ("empty program", None)
+            return
+        try:
+            decls = list(iterDecls(tokens))
+        except Exception as error:
+            self.error = tuple(error.args) if len(error.args) == 2 else (type(error).__name__, None)
+            return
+
+        source = SourceFile(text)
+        for decl in decls:
+            last = tokens[decl.tokenPositionProcessed]
+            self.ends.append(source.offset(last.line, last.end_col) + 1)
+            self.region_tokens.append(_rebase(decl, tokens))
+            self.decls.append(decl)
+        if any(token.kind == CHARCONSTANT and "\n" in token.value for token in tokens):
+            # scanner lines stop matching text lines here; keep parsing the whole text on every edit
+            self.error = None
+            self.ends = None
+
+    # incremental path; False when the edit needs a full parse
+    def _reparse(self, text, start, end, replacement):
+        ends = self.ends
+        if ends is None:
+            return False
+        delta = len(replacement) - (end - start)
+        first = bisect_left(ends, start)
+        last = bisect_left(ends, end)
+        if first == len(ends):
+            first = len(ends) - 1
+        if last >= len(ends) - 1:
+            last = len(ends) - 1
+
+        # the touched text starts right after the last token of the region before the first touched one
+        span_start = ends[first - 1] if first > 0 else 0
+        line_begin = text.rfind("\n", 0, span_start) + 1
+        base_line = self.region_tokens[first - 1][-1].line if first > 0 else 1
+
+        while True:
+            span_end = ends[last] + delta if last < len(ends) - 1 else len(text)
+            tokens = self._scan_span(text, line_begin, span_start, span_end, base_line)
+            if tokens is None:
+                return False
+            try:
+                decls = list(iterDecls(tokens)) if tokens else []
+                break
+            except Exception as error:
+                if len(error.args) != 2 or error.args[1].kind != EOF:
+                    return False
+                # the span ends inside its last declaration, which goes on into the next region
+                if last == len(ends) - 1:
+                    return False
+                last += 1
+
+        span = SourceFile(text[line_begin:span_end])
+        new_ends = []
+        new_region_tokens = []
+        for decl in decls:
+            last_token = tokens[decl.tokenPositionProcessed]
+            new_ends.append(line_begin + span.offset(last_token.line - base_line + 1, last_token.end_col) + 1)
+            new_region_tokens.append(_rebase(decl, tokens))
+
+        line_delta = replacement.count("\n") - self.text.count("\n", start, end)
+        if line_delta:
+            for region in self.region_tokens[last + 1:]:
+                for token in region:
+                    token.line += line_delta
+        later_ends = [offset + delta for offset in ends[last + 1:]]
+
+        self.text = text
+        self.ends[first:] = new_ends + later_ends
+        self.region_tokens[first:last + 1] = new_region_tokens
+        self.decls[first:last + 1] = decls
+        self.partial_parses += 1
+        if not self.decls:
+            self.error = ("empty program", None)
+        return True
+
+    # tokens of text[span_start:span_end] with their lines in the whole text, or None on anything that needs a
+    # full parse
+    def _scan_span(self, text, line_begin, span_start, span_end, base_line):
+        scanner, _ = _scan(text[line_begin:span_end])
+        if scanner.errors:
+            return None
+        first_col = span_start - line_begin + 1
+        tokens = []
+        for token in scanner.tokens:
+            if token.line == 1 and token.start_col < first_col:
+                continue
+            if token.kind == CHARCONSTANT and "\n" in token.value:
+                return None
+            token.line += base_line - 1
+            tokens.append(token)
+        return tokens
+
+def _scan(text):
+    messages = io.StringIO()
+    scanner = Scanner(text)
+    with contextlib.redirect_stdout(messages):
+        scanner.tokenize()
+    return scanner, messages.getvalue()
+
+# moves a declaration parsed over a shared token list onto a list of just its own tokens; returns that list
+def _rebase(decl, tokens):
+    base = decl.tokenPosition
+    own = tokens[base:decl.tokenPositionProcessed + 1]
+    stack = [decl]
+    while stack:
+        node = stack.pop()
+        fields = node.__dict__
+        if isinstance(node, Basic):
+            fields["tokens"] = own
+            fields["tokenPosition"] -= base
+            fields["tokenPositionProcessed"] -= base
+        for field in fields.values():
+            if type(field) is list:
+                if field is not own:
+                    stack.extend(item for item in field if hasattr(item, "__dict__"))
+            elif hasattr(field, "__dict__"):
+                stack.append(field)
+    return own
@@ -0,0 +1,180 @@
+import io
+import os
+import time
+import hashlib
+import sqlite3
+import argparse
+import contextlib
+from Batch import expand_inputs
+
+# Cross-file identifier index: python main.py index build [PATH ...] records, for every Decaf file under the
+# paths, each declaration (functions, global and local variables, formals) and each reference (the identifier of
+# a CallNode or FieldAccessNode) with its line and column, in an sqlite database. index defs NAME and
+# index refs NAME then answer from the database without parsing anything.
+#
+# A build only parses the files that are new or whose modification time or size changed since they were
+# indexed, and of those only the ones whose contents hash differs; files that no longer exist are dropped. The
+# files are parsed with error recovery (Parser.recoverDecls), so a file with syntax errors still has the
+# declarations that parsed, and its status records the error. References are resolved with Symbols.py: a use
+# carries the position of the declaration it resolves to, or none if the name is undeclared in its file
+
+DEFAULT_DATABASE = ".decaf-index.sqlite"
+
+# bump whenever the tables or what goes in them change; an index of another version is rebuilt from scratch
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, mtime_ns INTEGER, size INTEGER,
+                    hash TEXT, status TEXT);
+CREATE TABLE declarations (file INTEGER NOT NULL, name TEXT NOT NULL, kind TEXT, type TEXT, line INTEGER,
+                           column INTEGER);
+CREATE TABLE uses (file INTEGER NOT NULL, name TEXT NOT NULL, kind TEXT, line INTEGER, column INTEGER,
+                   declaration_line INTEGER, declaration_column INTEGER);
+CREATE INDEX declarations_name ON declarations (name);
+CREATE INDEX declarations_file ON declarations (file);
+CREATE INDEX uses_name ON uses (name);
+CREATE INDEX uses_file ON uses (file);
+"""
+
+def connect(database = DEFAULT_DATABASE):
+    connection = sqlite3.connect(database)
+    if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with connection:
+            for (table,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                connection.execute(f"DROP TABLE {table}")
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return connection
+
+# (status, declaration rows, use rows) of one file's source text
+def extract(text):
+    from Scanner import Scanner
+    from Parser import recoverDecls
+    from Symbols import resolve
+    scanner = Scanner(text, recover = True)
+    # the scanner reports unexpected characters on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner.tokenize()
+    program_node, errors = recoverDecls(scanner.tokens)
+    table = resolve(program_node)
+    declarations = [(declaration.name, declaration.kind, declaration.type, declaration.token.line,
+                     declaration.token.start_col) for declaration in table.declarations]
+    uses = [(token.value, kind, token.line, token.start_col,
+             declaration.token.line if declaration is not None else None,
+             declaration.token.start_col if declaration is not None else None)
+            for token, kind, declaration in table.references]
+    status = "scan error" if scanner.errors else "syntax error" if errors else "ok"
+    return status, declarations, uses
+
+# (path, mtime_ns, size, hash, extracted) of one file, where extracted is None if its contents still hash to
+# indexed_hash, or if it cannot be read
+def _index_file(path, indexed_hash):
+    try:
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            contents = file.read()
+    except OSError:
+        return path, None, None, None, None
+    digest = hashlib.sha256(contents).hexdigest()
+    if digest == indexed_hash:
+        return path, stat.st_mtime_ns, stat.st_size, digest, None
+    return path, stat.st_mtime_ns, stat.st_size, digest, extract(contents.decode(errors = "replace"))
+
+# indexes the Decaf files under paths into the database; returns the counts of files (indexed, unchanged, removed)
+def build(connection, paths, jobs = 1):
+    indexed = {path: (file_id, mtime_ns, size, digest) for file_id, path, mtime_ns, size, digest
+               in connection.execute("SELECT id, path, mtime_ns, size, hash FROM files")}
+    files = sorted({os.path.abspath(path) for path in expand_inputs(paths) if os.path.isfile(path)})
+    stale = []
+    for path in files:
+        entry = indexed.get(path)
+        stat = os.stat(path)
+        if entry is None or (entry[1], entry[2]) != (stat.st_mtime_ns, stat.st_size):
+            stale.append(path)
+    removed = [entry[0] for path, entry in indexed.items() if not os.path.exists(path)]
+
+    hashes = [indexed[path][3] if path in indexed else None for path in stale]
+    jobs = min(jobs, len(stale)) or 1
+    if jobs == 1:
+        results = map(_index_file, stale, hashes)
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers = jobs)
+        results = executor.map(_index_file, stale, hashes, chunksize = max(1, len(stale) // (jobs * 4)))
+    counts = [0, len(files) - len(stale), len(removed)]
+    try:
+        with connection:
+            connection.executemany("DELETE FROM declarations WHERE file = ?", zip(removed))
+            connection.executemany("DELETE FROM uses WHERE file = ?", zip(removed))
+            connection.executemany("DELETE FROM files WHERE id = ?", zip(removed))
+            for path, mtime_ns, size, digest, extracted in results:
+                if mtime_ns is None:
+                    continue # gone or unreadable since it was listed
+                entry = indexed.get(path)
+                if extracted is None:
+                    connection.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?", (mtime_ns, size, entry[0]))
+                    counts[1] += 1
+                    continue
+                status, declarations, uses = extracted
+                if entry is None:
+                    file_id = connection.execute("INSERT INTO files (path, mtime_ns, size, hash, status) VALUES (?, ?, ?, ?, ?)",
+                                                 (path, mtime_ns, size, digest, status)).lastrowid
+                else:
+                    file_id = entry[0]
+                    connection.execute("UPDATE files SET mtime_ns = ?, size = ?, hash = ?, status = ? WHERE id = ?",
+                                       (mtime_ns, size, digest, status, file_id))
+                    connection.execute("DELETE FROM declarations WHERE file = ?", (file_id,))
+                    connection.execute("DELETE FROM uses WHERE file = ?", (file_id,))
+                connection.executemany("INSERT INTO declarations VALUES (?, ?, ?, ?, ?, ?)",
+                                       [(file_id, *row) for row in declarations])
+                connection.executemany("INSERT INTO uses VALUES (?, ?, ?, ?, ?, ?, ?)", [(file_id, *row) for row in uses])
+                counts[0] += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return tuple(counts)
+
+# (path, line, column, kind, type) of every declaration of name
+def definitions(connection, name):
+    return connection.execute("SELECT files.path, line, column, kind, type FROM declarations JOIN files ON files.id = file"
+                              " WHERE name = ? ORDER BY files.path, line, column", (name,)).fetchall()
+
+# (path, line, column, kind) of every use of name, or only of its calls
+def references(connection, name, calls_only = False):
+    kinds = ("call",) if calls_only else ("call", "access")
+    return connection.execute("SELECT files.path, line, column, kind FROM uses JOIN files ON files.id = file"
+                              f" WHERE name = ? AND kind IN ({', '.join('?' * len(kinds))}) ORDER BY files.path, line, column",
+                              (name, *kinds)).fetchall()
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python main.py index", description = "Cross-file identifier index.")
+    arg_parser.add_argument("--db", default = DEFAULT_DATABASE, help = f"index database (default: {DEFAULT_DATABASE})")
+    commands = arg_parser.add_subparsers(dest = "command", required = True)
+    build_parser = commands.add_parser("build", help = "index the Decaf files under the paths, reparsing only changed files")
+    build_parser.add_argument("paths", nargs = "*", default = ["."], help = "files, directories or glob patterns (default: .)")
+    build_parser.add_argument("--jobs", type = int, default = os.cpu_count() or 1, help = "worker processes (default: one per CPU)")
+    defs_parser = commands.add_parser("defs", help = "where NAME is declared")
+    defs_parser.add_argument("name")
+    refs_parser = commands.add_parser("refs", help = "where NAME is used")
+    refs_parser.add_argument("name")
+    refs_parser.add_argument("--calls", action = "store_true", help = "only calls of NAME")
+    args = arg_parser.parse_args(argv)
+
+    connection = connect(args.db)
+    try:
+        if args.command == "build":
+            if args.jobs < 1:
+                arg_parser.error("--jobs must be at least 1")
+            start = time.perf_counter()
+            indexed, unchanged, removed = build(connection, args.paths, args.jobs)
+            print(f"{indexed} indexed, {unchanged} unchanged, {removed} removed in {time.perf_counter() - start:.2f} s")
+        elif args.command == "defs":
+            for path, line, column, kind, type in definitions(connection, args.name):
+                print(f"{os.path.relpath(path)}:{line}:{column}: {kind} {type} {args.name}")
+        else:
+            for path, line, column, kind in references(connection, args.name, args.calls):
+                print(f"{os.path.relpath(path)}:{line}:{column}: {kind}")
+    finally:
+        connection.close()
+    return 0
@@ -0,0 +1,190 @@
+from Scanner import Token
+from Walker import Walker, iter_nodes
+from Stmt import Stmt
+from StmtBlock import StmtBlock
+from IfStmt import IfStmt
+from WhileStmt import WhileStmt
+from ForStmt import ForStmt
+from Expressions import Expressions
+from ExpressionSubnodes import AssignNode, BinaryExprNode, UnaryExprNode, CallNode, ConstantNode
+from Compiler import wrap, divide, constant_value
+from TokenKind import (INTCONSTANT, TRUE, FALSE, OR, LOGICALAND, EQ, LT, GT, LESSEQUAL, GEQ, PLUS, MINUS, MULT, DIV,
+                       NOT)
+
+# Constant folding and dead-branch elimination: optimize(program_node) rewrites the tree in place and returns
+# (nodes before, nodes after).
+#
+# Expressions whose operands are int or bool constants are replaced by a ConstantNode of their value, with the
+# integer semantics of the execution engine (Compiler.py): 32-bit wrap around, division truncating toward zero.
+# A negative value has no literal and becomes 0 - n, so the printed tree stays one Decaf can scan.
+# The values are those of the tree as parsed, so the tree must be parsed with Expressions.left_associative set;
+# in the default right associative tree 10 - 5 - 2 would fold to 7.
+# A division by zero is left for the run to report. && and || with a constant left operand fold as well, since
+# the right one is only evaluated for its value: false && x is false, true && x is x. The new constants get
+# tokens of their own, on the line of the operator they replace.
+#
+# An if statement with a constant condition is replaced by the branch taken, a while loop whose condition is
+# false is removed. A statement is only removed from a block's list of statements: a dead if without else or a
+# dead loop that is the body of another statement stays, with its condition folded.
+#
+# The tree is walked bottom up with Walker's leave callbacks, so long chains and deep nesting are no problem.
+# A node that is replaced records its replacement, which the parent puts in place when it is left in turn.
+# Folded tokens are not in the file's token list, so an optimized tree cannot be exported (Export.py)
+
+# replacement of a statement that is removed
+REMOVED = object()
+
+ARITHMETIC = {
+    PLUS: lambda lhs, rhs: wrap(lhs + rhs),
+    MINUS: lambda lhs, rhs: wrap(lhs - rhs),
+    MULT: lambda lhs, rhs: wrap(lhs * rhs),
+    DIV: lambda lhs, rhs: divide(lhs, rhs) if rhs != 0 else None,
+}
+
+RELATIONAL = {
+    LT: lambda lhs, rhs: lhs < rhs,
+    GT: lambda lhs, rhs: lhs > rhs,
+    LESSEQUAL: lambda lhs, rhs: lhs <= rhs,
+    GEQ: lambda lhs, rhs: lhs >= rhs,
+}
+
+# the value of a ConstantNode if it is an int or a bool, or of a negative int written 0 - n, else None
+def folded_value(node):
+    if type(node) is BinaryExprNode:
+        lhs, rhs = node.lhs, node.rhs
+        if (node.operator.kind != MINUS or type(lhs) is not ConstantNode or lhs.token.kind != INTCONSTANT
+                or type(rhs) is not ConstantNode or rhs.token.kind != INTCONSTANT or constant_value(lhs.token) != 0):
+            return None
+        return wrap(-constant_value(rhs.token))
+    if type(node) is not ConstantNode or node.token.kind not in (INTCONSTANT, TRUE, FALSE):
+        return None
+    return constant_value(node.token)
+
+# a ConstantNode for an int or bool value, placed at token. Decaf has no negative literals, so a negative int is
+# the subtraction 0 - n, which folds again like a constant
+def constant_node(value, token):
+    if value is True or value is False:
+        text = "true" if value else "false"
+        return ConstantNode(Token(text, token.line, token.start_col, token.start_col + len(text) - 1, "T_BoolConstant",
+                                  is_constant = True, kind = TRUE if value else FALSE))
+    if value < 0:
+        minus = Token("-", token.line, token.start_col, token.start_col, "T_MINUS", is_operator = True, kind = MINUS)
+        return BinaryExprNode(constant_node(0, token), minus, constant_node(-value, token), "ArithmeticExpr")
+    text = str(value)
+    return ConstantNode(Token(text, token.line, token.start_col, token.start_col + len(text) - 1, "T_IntConstant",
+                              is_constant = True, kind = INTCONSTANT))
+
+# the value of lhs operator rhs for constant operands, or None if it does not fold
+def fold_binary(kind, lhs, rhs):
+    if type(lhs) is int and type(rhs) is int:
+        if kind in ARITHMETIC:
+            return ARITHMETIC[kind](lhs, rhs)
+        if kind in RELATIONAL:
+            return RELATIONAL[kind](lhs, rhs)
+    if kind == EQ and type(lhs) is type(rhs):
+        return lhs == rhs
+    if type(lhs) is bool and type(rhs) is bool:
+        if kind == LOGICALAND:
+            return lhs and rhs
+        if kind == OR:
+            return lhs or rhs
+    return None
+
+def _callbacks(replacements):
+    def replaced(node):
+        return replacements.pop(id(node), node)
+
+    # nodes below a statement that is not in a block keep their place when they are removed
+    def kept(node):
+        replacement = replaced(node)
+        return node if replacement is REMOVED else replacement
+
+    def binary(node, state):
+        node.lhs = replaced(node.lhs)
+        node.rhs = replaced(node.rhs)
+        lhs = folded_value(node.lhs)
+        kind = node.operator.kind
+        if type(lhs) is bool and (kind == LOGICALAND or kind == OR):
+            if lhs == (kind == OR):
+                # true || x, false && x
+                replacements[id(node)] = node.lhs
+            else:
+                replacements[id(node)] = node.rhs
+            return
+        rhs = folded_value(node.rhs)
+        if lhs is not None and rhs is not None:
+            value = fold_binary(kind, lhs, rhs)
+            if value is not None:
+                replacements[id(node)] = constant_node(value, node.operator)
+
+    def unary(node, state):
+        node.operand = replaced(node.operand)
+        operand = folded_value(node.operand)
+        if node.operator.kind == NOT and type(operand) is bool:
+            replacements[id(node)] = constant_node(not operand, node.operator)
+
+    def assign(node, state):
+        node.rhs = replaced(node.rhs)
+
+    def call(node, state):
+        node.arguments = [replaced(argument) for argument in node.arguments]
+
+    def expressions(node, state):
+        node.expression_root = replaced(node.expression_root)
+
+    def if_statement(node, state):
+        node.thenStmt = kept(node.thenStmt)
+        if node.withElse:
+            node.elseStmt = kept(node.elseStmt)
+        condition = folded_value(node.condition.expression_root)
+        if condition is True:
+            replacements[id(node)] = node.thenStmt
+        elif condition is False:
+            replacements[id(node)] = node.elseStmt if node.withElse else REMOVED
+
+    def while_statement(node, state):
+        node.body = kept(node.body)
+        if folded_value(node.condition.expression_root) is False:
+            replacements[id(node)] = REMOVED
+
+    def for_statement(node, state):
+        node.stmt = kept(node.stmt)
+
+    # a Stmt holding a statement that was replaced stands for the replacement
+    def statement(node, state):
+        if node.stmtType in ("if", "while"):
+            inner = node.ifStmt if node.stmtType == "if" else node.wStmt
+            replacement = replacements.pop(id(inner), None)
+            if replacement is not None:
+                replacements[id(node)] = replacement
+
+    def block(node, state):
+        stmts = []
+        for stmt in node.stmts:
+            stmt = replaced(stmt)
+            if stmt is not REMOVED:
+                stmts.append(stmt)
+        node.stmts = stmts
+
+    return {
+        BinaryExprNode: binary,
+        UnaryExprNode: unary,
+        AssignNode: assign,
+        CallNode: call,
+        Expressions: expressions,
+        IfStmt: if_statement,
+        WhileStmt: while_statement,
+        ForStmt: for_statement,
+        Stmt: statement,
+        StmtBlock: block,
+    }
+
+def count_nodes(program_node):
+    return sum(1 for _ in iter_nodes(program_node))
+
+# folds and prunes program_node in place; returns (nodes before, nodes after)
+def optimize(program_node):
+    before = count_nodes(program_node)
+    replacements = {}
+    Walker({}, _callbacks(replacements)).walk(program_node)
+    return before, count_nodes(program_node)
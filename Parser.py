@@ -1,18 +1,19 @@
 from Decl import Decl
-from Basic import SyntaxErr
+from TreeWriter import TreeWriter, TreePrinter, write_node
+from SourceFile import SourceFile
+from StmtBlock import StmtBlock
+from TokenCursor import TokenCursor
+from TokenKind import EOF
+from Recovery import ErrorLog, TooManyErrors, error_position, sync_declaration
 
-class ProgramNode:
+class ProgramNode(TreePrinter):
     def __init__(self):
         self.decls = []
-    def print_tree(self):
-        print("Program:\n")
-        for declaration in self.decls:
-            declaration.print_tree()
     
-    def print_tree(self): #head of the print tree
-        print("Program:")
+    def write_tree(self, out): #head of the print tree
+        out.write_line("Program:")
         for declaration in self.decls:
-            declaration.print_tree() # indent starts at 0; line number printing has an indent baked in,
+            declaration.write_tree(out) # indent starts at 0; line number printing has an indent baked in,
 
 
 
@@ -22,25 +23,107 @@ def print_error(token, lines, error_type = "syntax error"):
         print(f'{" " * (token.start_col - 1)}{"^" * (token.end_col - token.start_col + 1)}')
         print(f"*** {error_type}")
 
+# yields the top-level declarations one at a time as they are parsed
+def iterDecls(tokens):
+    cursor = TokenCursor(tokens)
+    while not cursor.at_end():
+        yield Decl(cursor)
+
 # entry point of parser
 def parseTokens(tokens, contents):
-    lines = contents.splitlines()
+    lines = SourceFile(contents) # only indexed if there is an error to show
     tokenLength = len(tokens)
     if tokenLength== 0:
         print("Empty program is syntactically incorrect because it is empty.")
-        return
+        return None, True
     try:
         progrmNode = ProgramNode()
-        tokenposition = 0
-        while True:
-            if tokenLength <= tokenposition:
-                break
-            decl = Decl(tokens,tokenposition)
-            tokenposition = decl.tokenPositionProcessed +1
+        for decl in iterDecls(tokens):
             progrmNode.decls.append(decl)
         return progrmNode, False
     except Exception as error:
-
+        if len(error.args) != 2:
+            raise
         print_error(error.args[1],lines, error.args[0])
         return None, True # entry code returned " '','', True ", not needed for this implemenation
 
+# error recovery: parses every declaration it can, skipping past each syntax error (see Recovery.py), and stops
+# after max_errors errors (None for no limit). Returns the ProgramNode of the declarations parsed without error
+# and the list of (error type, token) errors. Running out of tokens is the last error, on the EOF sentinel
+def recoverDecls(tokens, max_errors = None):
+    log = ErrorLog(max_errors)
+    return recoverInto(tokens, log), log.errors
+
+# recoverDecls logging to log, whose stopped flag tells if the parse ended at the error limit; returns the ProgramNode
+def recoverInto(tokens, log):
+    progrmNode = ProgramNode()
+    enclosing_log = StmtBlock.error_log
+    StmtBlock.error_log = log
+    cursor = TokenCursor(tokens)
+    try:
+        while not cursor.at_end():
+            tokenposition = cursor.position
+            try:
+                decl = Decl(cursor)
+            except TooManyErrors:
+                raise
+            except Exception as error:
+                if len(error.args) != 2:
+                    raise
+                error_type, token = error.args
+                log.add(error_type, token)
+                if token.kind == EOF:
+                    break
+                position = error_position(tokens, token, tokenposition)
+                cursor.position = sync_declaration(tokens, position, tokenposition)
+                continue
+            progrmNode.decls.append(decl)
+    except TooManyErrors:
+        pass
+    finally:
+        StmtBlock.error_log = enclosing_log
+    return progrmNode
+
+# parseTokens with error recovery: prints every error found, in source order, the way parseTokens prints its one
+def parseTokensRecovering(tokens, contents, max_errors = None):
+    lines = SourceFile(contents)
+    if len(tokens) == 0:
+        print("Empty program is syntactically incorrect because it is empty.")
+        return None, True
+    log = ErrorLog(max_errors)
+    progrmNode = recoverInto(tokens, log)
+    for error_type, token in log.errors:
+        print_error(token, lines, error_type)
+    if log.stopped:
+        print(f"*** stopped after {len(log.errors)} errors")
+    if log.errors:
+        return None, True
+    return progrmNode, False
+
+# streaming counterpart of parseTokens followed by print_tree: tokens is a TokenStream, each declaration is printed
+# as soon as it is parsed and then released. read_lines is only called to show the offending line of a syntax error
+# and returns the lines of the file, as a list or a SourceFile.
+# With an exporter (see Export.py) each declaration goes to exporter.write_decl instead of the text tree
+def printDeclStream(tokens, read_lines, exporter = None):
+    if len(tokens) == 0:
+        print("Empty program is syntactically incorrect because it is empty.")
+        return True
+    if exporter is None:
+        out = TreeWriter()
+        out.write_line("Program:")
+        write_decl = lambda decl: write_node(decl, out)
+    else:
+        out = exporter
+        write_decl = exporter.write_decl
+    try:
+        for decl in iterDecls(tokens):
+            write_decl(decl)
+            tokens.release(decl.tokenPositionProcessed)
+        out.flush()
+        return False
+    except Exception as error:
+        out.flush()
+        if len(error.args) != 2:
+            raise
+        print_error(error.args[1], read_lines(), error.args[0])
+        return True
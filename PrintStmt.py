@@ -1,42 +1,35 @@
 # handles "Print" statements
 from Basic import Basic
-from Basic import SyntaxErr
+from TokenKind import LPAREN, COMMA, RPAREN, SEMICOLON
 from Expressions import Expressions
 
 class PrintStmt(Basic, object):
-    def __init__(self, tokens, tokenPosition):
-        super(PrintStmt, self).__init__(tokens, tokenPosition)
+    def __init__(self, cursor):
+        super(PrintStmt, self).__init__(cursor)
         self.expressions = []
         
         # print statement matched by call from Stmt, next check forchecking for a '('
-        if tokens[tokenPosition + 1].value != "(":
-            raise Exception(SyntaxErr, tokens[tokenPosition + 1])
+        cursor.advance()
+        cursor.expect(LPAREN)
         
         # parsing the first expression
-        current_position = tokenPosition + 2 # first token in the parentheses
-        self.expressions.append(Expressions(tokens, current_position))
-        current_position = self.expressions[-1].tokenPositionProcessed + 1
+        self.expressions.append(Expressions(cursor))
         
         # parse any potential additional expressions separated by commas
-        while tokens[current_position].value == ",":
-            current_position += 1  # skip comma
-            self.expressions.append(Expressions(tokens, current_position))
-
-            #then update the current token position to the point after the positions advanced through the last expression
-            current_position = self.expressions[-1].tokenPositionProcessed + 1
+        while cursor.peek().kind == COMMA:
+            cursor.advance()  # skip comma
+            self.expressions.append(Expressions(cursor))
         
         # checking for a ')'
-        if tokens[current_position].value != ")":
-            raise Exception(SyntaxErr, tokens[current_position])
+        cursor.expect(RPAREN)
         
         # checking for a semicolon
-        if tokens[current_position + 1].value != ";":
-            raise Exception(SyntaxErr, tokens[current_position + 1])
+        cursor.expect(SEMICOLON)
         
-        self.tokenPositionProcessed = current_position + 1
+        self.tokenPositionProcessed = cursor.position - 1
 
-    def print_tree(self, indent = 0):
+    def write_tree(self, out, indent = 0):
         line = self.tokens[self.tokenPosition].line
-        print(f"{line} \t" + "\t" * indent + "PrintStmt:")
+        out.write(line, indent, "PrintStmt:")
         for expression in self.expressions:
-            expression.print_tree(indent + 1, label = "(args) ")
\ No newline at end of file
+            expression.write_tree(out, indent + 1, label = "(args) ")
\ No newline at end of file
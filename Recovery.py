@@ -0,0 +1,78 @@
+from TokenKind import LCB, RCB, SEMICOLON, IDENTIFIER_KINDS, TYPE_NAME_KINDS
+
+# Error recovery: instead of stopping at the first syntax error, the parser records it, skips ahead to a point
+# where parsing can safely go on (panic mode) and continues. Inside a block (Stmt.parse_block) the statement
+# in error is dropped up to the ';' that ends it or the '}' that closes the block; at the top level the
+# declaration in error is dropped up to its ';' or '}' or the start of the next declaration
+
+# raised on an error past the first max_errors, ends the parse
+class TooManyErrors(Exception):
+    pass
+
+class ErrorLog:
+    def __init__(self, max_errors = None):
+        self.errors = [] # (error type, token) in the order found
+        self.max_errors = max_errors
+        self.stopped = False # an error was dropped and the parse ended early
+
+    def add(self, error_type, token):
+        # a full log only stops the parse on one more error, so a file with exactly max_errors errors is parsed
+        # to the end and not reported as cut short
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            self.stopped = True
+            raise TooManyErrors()
+        self.errors.append((error_type, token))
+
+# position of the token an error was raised on, searching from start; tokens handed out by a TokenTable are
+# new views on every access, so they are matched by where they are in the source
+def error_position(tokens, token, start):
+    for position in range(start, len(tokens)):
+        candidate = tokens[position]
+        if candidate is token or (candidate.line == token.line and candidate.start_col == token.start_col):
+            return position
+    return start
+
+# where a block goes on after an error at position: past the ';' ending the statement or past a nested block
+# the statement started, or at the '}' closing the block
+def sync_statement(tokens, position):
+    depth = 0
+    while position < len(tokens):
+        kind = tokens[position].kind
+        if kind == LCB:
+            depth += 1
+        elif kind == RCB:
+            if depth == 0:
+                return position
+            depth -= 1
+            if depth == 0:
+                return position + 1
+        elif kind == SEMICOLON and depth == 0:
+            return position + 1
+        position += 1
+    return position
+
+# where the top level goes on after an error at position in the declaration starting at start: past the ';' or
+# the '}' ending it, or at a later 'type identifier' at brace depth 0
+def sync_declaration(tokens, position, start):
+    depth = 0
+    for index in range(start, position):
+        kind = tokens[index].kind
+        if kind == LCB:
+            depth += 1
+        elif kind == RCB and depth > 0:
+            depth -= 1
+    while position < len(tokens):
+        kind = tokens[position].kind
+        if (depth == 0 and position > start and kind in TYPE_NAME_KINDS
+                and position + 1 < len(tokens) and tokens[position + 1].kind in IDENTIFIER_KINDS):
+            return position
+        if kind == LCB:
+            depth += 1
+        elif kind == RCB:
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                return position + 1
+        elif kind == SEMICOLON and depth == 0:
+            return position + 1
+        position += 1
+    return position
@@ -1,32 +1,30 @@
 # return statement can inlcude an expression optionally 
 from Basic import Basic
-from Basic import SyntaxErr
+from TokenKind import SEMICOLON
 from Expressions import Expressions
 
 class ReturnStmt(Basic, object):
-    def __init__(self, tokens, tokenPosition):
-        super(ReturnStmt, self).__init__(tokens, tokenPosition)
+    def __init__(self, cursor):
+        super(ReturnStmt, self).__init__(cursor)
         self.withExpression = False
         
         # first token determined to be a return by the call from Stmt
         #  next, checking for an expression before semicolon
-        if tokens[tokenPosition + 1].value != ";":
-            self.expression = Expressions(tokens, tokenPosition + 1)
+        cursor.advance()
+        if cursor.peek().kind != SEMICOLON:
+            self.expression = Expressions(cursor)
             self.withExpression = True
-            self.tokenPositionProcessed = self.expression.tokenPositionProcessed
             
             # semicolon after expression
-            if tokens[self.tokenPositionProcessed + 1].value != ";":
-                raise Exception(SyntaxErr, tokens[self.tokenPositionProcessed + 1])
-            
-            self.tokenPositionProcessed += 1
+            cursor.expect(SEMICOLON)
         else:
             # just a return statement with a semicolon
-            self.tokenPositionProcessed = tokenPosition + 1
+            cursor.advance()
+        self.tokenPositionProcessed = cursor.position - 1
         
-    def print_tree(self, indent = 0):
+    def write_tree(self, out, indent = 0):
         line = self.tokens[self.tokenPosition].line
-        print(f"{line} \t" + "\t" * indent + "ReturnStmt:")
+        out.write(line, indent, "ReturnStmt:")
         
         if self.withExpression:
-            self.expression.print_tree(indent + 1, label = "(args) ")
+            self.expression.write_tree(out, indent + 1, label = "(args) ")
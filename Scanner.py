@@ -0,0 +1,462 @@
+import io
+import re
+import contextlib
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from string import hexdigits
+from TokenKind import OPERATORS, KEYWORDS, LEXEME_KINDS, IDENTIFIER, INTCONSTANT, STRINGCONSTANT, CHARCONSTANT, kind_of
+
+class Token:
+    # no per-instance __dict__; a token is created for every lexeme
+    __slots__ = ("value", "line", "start_col", "end_col", "type", "is_operator", "is_constant", "const_value", "kind")
+
+    # kind is the TokenKind; derived from the lexeme and type when the caller does not supply it
+    def __init__(self, identifier, line, start_col, end_col, type, is_operator = False, is_constant = False, const_value = None, kind = None):
+        self.value = identifier
+        self.line = line
+        self.start_col = start_col
+        self.end_col = end_col
+        self.type = type
+        self.is_operator = is_operator
+        self.is_constant = is_constant
+        if self.is_constant:
+            self.is_constant = type == 'T_CharConstant' or type == 'T_IntConstant' or type == 'T_StringConstant' or type == 'T_BoolConstant'
+        self.const_value = const_value
+        self.kind = kind if kind is not None else kind_of(identifier, type)
+    
+    def print_token(self):
+        if self.is_operator:
+            # 2-character operators like <=, &&, show the token type instead of the indentifier after 'is' in the expected output
+            if len(self.value) > 1:
+                print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is {self.type}")
+            else:
+                print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is '{self.value}'")
+        elif self.is_constant: 
+            # the expected output shows that constant types repeat the value after the type (e.g. T_IntConstant (value= 1))
+            print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is {self.type} (value= {self.value})")
+        else: 
+            print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is {self.type}")
+
+class Scanner:
+    # compiled lazily from the operator table by _master_regex()
+    _master = None
+
+    # engine is "regex" (single-pass master pattern) or "legacy" (the original per-character scanner).
+    # tokens is the container tokenize() appends to, a list unless e.g. a TokenTable is passed.
+    # With recover an unexpected character is reported and skipped instead of ending the scan; an unterminated
+    # literal is skipped up to the end of its line
+    def __init__(self, input, engine = "regex", tokens = None, recover = False):
+        self.input = input
+        self.engine = engine
+        self.recover = recover
+        self.tokens = [] if tokens is None else tokens
+        self.col = 1
+        self.line = 1
+        self.index = 0
+        self.operators = OPERATORS
+        self.keywords = KEYWORDS
+        self.errors = 0 # unexpected characters reported so far
+        
+    
+    # letter => "A" ... "Z" | "a" ... "z" | "_"
+    def _is_letter(self):
+        return self.input[self.index].isalpha() or self.input[self.index] == "_"
+
+    # hex_lit     => "0" ( "x" | "X" ) { hex_digit }
+    def _is_start_of_hex(self):
+        return (self.index + 1 < len(self.input)
+                    and (self.input[self.index] == '0' and 
+                    (self.input[self.index + 1] == 'x' or self.input[self.index + 1] == "X"))) # is 0x or 0X
+
+    # escaped_char => "\" ( "n" | "r" | "t" | "v" | "f" | "a" | "b" | `\` | "'" | `"` )
+    def _is_escaped_char(self):
+        return (self.index + 1 < len(self.input) and 
+                self.input[self.index] == '\\' and 
+                self.input[self.index + 1] in ['n', 'r', 't', 'v', 'f', 'a', 'b', '\\', "'", '"'])
+    
+    # char => all ASCII characters from 7 ... 13 and 32 ... 126 except char 10 "\n", char 92 "\" and char 34: "
+    def _is_char(self):
+        char_ordinal = ord(self.input[self.index])
+        return ((7 <= char_ordinal <= 13) or (32 <= char_ordinal <= 126)) and char_ordinal not in [10, 92, 34]
+    
+    # char_lit_chars => all ASCII characters from 7 ... 13 and 32 ... 126 except char 39 "'" and char 92 "\"
+    def _is_char_lit_chars(self):
+        char_ordinal = ord(self.input[self.index])
+        return ((7 <= char_ordinal <= 13) or (32 <= char_ordinal <= 126)) and char_ordinal not in [39, 92]
+    
+    #consume char and advance pointers
+    def _advance(self):
+        temp_char = self.input[self.index]
+        self.index += 1
+        self.col += 1
+        return temp_char
+       
+    # primary method intented for public use to convert input file to a set of tokens, dispatches to helper functions
+    def tokenize(self):
+        if self.engine == "legacy":
+            self._tokenize_legacy()
+        else:
+            self.tokens.extend(self._iter_regex(self._chunks(), self.index))
+
+    # generator form of tokenize(): tokens are produced as the input is scanned and are not kept in self.tokens.
+    # self.input may also be an open text file, which is then read in blocks of lines instead of all at once
+    def iter_tokens(self):
+        if self.engine == "legacy":
+            if not isinstance(self.input, str):
+                self.input = self.input.read()
+            self._tokenize_legacy()
+            tokens, self.tokens = self.tokens, []
+            return iter(tokens)
+        return self._iter_regex(self._chunks(), self.index)
+
+    def _chunks(self):
+        if isinstance(self.input, str):
+            return [self.input]
+        readlines = self.input.readlines
+        return iter(lambda: "".join(readlines(1 << 16)), "")
+
+    def _tokenize_legacy(self):
+        while self.index < len(self.input):
+            if not self._legacy_step():
+                return
+
+    # scans one lexeme (or one whitespace character) at self.index; returns False when scanning has to stop
+    def _legacy_step(self):
+        if (self.input[self.index] == "'" 
+                or self.input[self.index] == '"'
+                or self.input[self.index].isdigit()):
+            self._scan_literal()
+        elif self._is_letter():
+            self._scan_alphanum()
+        elif self.input[self.index] in self.operators or self.input[self.index] == '&' or self.input[self.index] == '|':
+            self._scan_operator()
+        elif self.input[self.index].isspace():
+            if self.input[self.index] == '\n':
+                self.line += 1
+                self.col = 1
+            else:
+                self.col += 1
+            self.index += 1
+        else:
+            print(f"Error: Unexpected character: '{self.input[self.index]}' at line {self.line}, column {self.col}")
+            self.errors += 1
+            if self.recover:
+                self._advance()
+                return True
+            return False
+        return True
+
+    # one alternation over every lexeme class; each alternative mirrors the grammar comments of the legacy scanner below.
+    # blanks and tabs in front of a lexeme are folded into its match to halve the number of matches.
+    # identifiers and decimal ints refuse to end next to a non-ASCII character so that unicode letters and digits
+    # (accepted by str.isalpha/isdigit in the legacy scanner) fall through to "other" and get the legacy treatment
+    @classmethod
+    def _master_regex(cls, operators):
+        if cls._master is None:
+            char = r"[\x07-\x09\x0b-\x0d\x20\x21\x23-\x5b\x5d-\x7e]"
+            char_lit_chars = r"[\x07-\x0d\x20-\x26\x28-\x5b\x5d-\x7e]"
+            escaped_char = r"\\[nrtvfab\\'\"]"
+            # longest operators first so that "<=" wins over "<"
+            ops = "|".join(re.escape(op) for op in sorted(operators, key = len, reverse = True))
+            cls._master = re.compile(r"[ \t]*(?:" + "|".join([
+                r"(?P<id>[A-Za-z_][A-Za-z0-9_]*)(?![A-Za-z0-9_\x80-\U0010ffff])",
+                rf"(?P<op>{ops})",
+                r"(?P<ws>[\t\n\x0b\x0c\r\x1c-\x1f ]+)",
+                r"(?P<hex>0[xX][0-9a-fA-F]*)",
+                r"(?P<int>[0-9]+)(?![0-9\x80-\U0010ffff])",
+                rf'(?P<str>"{char}*(?:{escaped_char}{char}*)*")',
+                # the legacy scanner consumes whatever follows the body as the closing quote; the lookahead/backreference
+                # pair keeps the body from backtracking so "'a" at end of input is not accepted as a complete literal
+                rf"(?P<char>'(?=(?P<body>{escaped_char}|{char_lit_chars}|))(?P=body)[\s\S])",
+                r"(?P<other>[\s\S])",
+            ]) + ")")
+        return cls._master
+
+    # columns are derived from the offset of the current line start instead of being counted per character;
+    # like the legacy scanner, only newlines in whitespace start a new line.
+    # chunks are scanned one at a time; a lexeme that touches the end of a chunk (only char literals can
+    # continue past a newline) is carried over and rescanned together with the next chunk
+    def _iter_regex(self, chunks, index = 0):
+        finditer = self._master_regex(self.operators).finditer
+        operators = self.operators
+        keywords = self.keywords
+        lexeme_kinds = LEXEME_KINDS
+        chunks = iter(chunks)
+        text = next(chunks, "")
+        pending = next(chunks, None)
+        line = self.line
+        line_start = index - self.col + 1
+
+        while True:
+            end = len(text)
+            stopped = False
+            for m in finditer(text, index):
+                kind = m.lastgroup
+                start, index = m.span(kind)
+                if pending is not None and (index == end or (kind == "other" and start >= end - 3)):
+                    index = start
+                    break
+                lexeme = text[start:index]
+                start_col = start - line_start + 1
+                end_col = index - line_start
+                if kind == "id":
+                    if lexeme in keywords:
+                        yield Token(lexeme, line, start_col, end_col, keywords[lexeme], is_constant = lexeme == 'true' or lexeme == 'false', kind = lexeme_kinds[lexeme])
+                    else:
+                        yield Token(lexeme, line, start_col, end_col, 'T_Identifier', kind = lexeme_kinds.get(lexeme, IDENTIFIER))
+                elif kind == "op":
+                    yield Token(lexeme, line, start_col, end_col, operators[lexeme], is_operator = True, kind = lexeme_kinds[lexeme])
+                elif kind == "ws":
+                    newlines = lexeme.count("\n")
+                    if newlines:
+                        line += newlines
+                        line_start = start + lexeme.rfind("\n") + 1
+                elif kind == "hex" or kind == "int":
+                    yield Token(lexeme, line, start_col, end_col, 'T_IntConstant', is_constant = True, kind = INTCONSTANT)
+                elif kind == "str":
+                    yield Token(lexeme, line, start_col, end_col, "T_StringConstant", is_constant = True, kind = STRINGCONSTANT)
+                elif kind == "char":
+                    yield Token(lexeme, line, start_col, end_col, "T_CharConstant", is_constant = True, kind = CHARCONSTANT)
+                else:
+                    index = start
+                    stopped = True
+                    break
+            else:
+                index = end
+
+            if not stopped:
+                if pending is None:
+                    break
+                text = text[index:] + pending
+                line_start -= index
+                index = 0
+                pending = next(chunks, None)
+                continue
+
+            # literals the pattern rejects are unterminated or contain illegal characters; the legacy scanner
+            # loops forever or crashes on those, so report them instead of falling back
+            if text[index] == '"' or text[index] == "'":
+                print(f"Error: Unexpected character: '{text[index]}' at line {line}, column {index - line_start + 1}")
+                self.errors += 1
+                if not self.recover:
+                    break
+                index = text.find("\n", index)
+                if index == -1:
+                    index = len(text)
+                continue
+            # non-ASCII input and lone '&' / '|' are rare, let the legacy scanner handle one step of them
+            source, tokens = self.input, self.tokens
+            self.input, self.tokens = text, []
+            self.index, self.line, self.col = index, line, index - line_start + 1
+            carry_on = self._legacy_step()
+            produced = self.tokens
+            self.input, self.tokens = source, tokens
+            yield from produced
+            if not carry_on:
+                return
+            index, line = self.index, self.line
+            line_start = index - self.col + 1
+
+        self.index, self.line, self.col = index, line, index - line_start + 1
+
+    # Integer Literals:
+    # _______________________________________________________
+    # int_lit     => decimal_lit | hex_lit .
+    # decimal_lit => { decimal_digit }+ .
+    # hex_lit     => "0" ( "x" | "X" ) { hex_digit }
+    #
+    # Character Literals:
+    # _______________________________________________________
+    # char_lit     => "'" ( char_lit_chars | escaped_char ) "'" .
+    # escaped_char => "\" ( "n" | "r" | "t" | "v" | "f" | "a" | "b" | `\` | "'" | `"` )
+    # 
+    # String Literals:
+    # _______________________________________________________
+    # string_lit   => `"` { char | escaped_char } `"` .
+    #
+    def _scan_literal(self):
+        initial_col = self.col
+        identifier = ''
+
+        #hexadecimal literals
+        if self._is_start_of_hex(): 
+            identifier += self._advance() + self._advance()  # consume ('0' and ('x' or 'X'))
+            while self.index < len(self.input) and self.input[self.index] in hexdigits:
+                identifier += self._advance()
+            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, 'T_IntConstant', is_constant = True))
+
+        #decimal literals
+        elif self.input[self.index].isdigit():
+            while self.index < len(self.input) and self.input[self.index].isdigit():
+                identifier += self._advance()
+            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, 'T_IntConstant', is_constant = True))
+        
+        #string literals
+        elif self.input[self.index] == '"':
+            identifier += self._advance()
+            while self.index < len(self.input) and self.input[self.index] != '"':
+                if self._is_escaped_char():
+                    identifier += self._advance() + self._advance() #consume / and the subsequent escaped_char
+                elif self._is_char(): 
+                    identifier += self._advance() # consume normal char
+            identifier += self._advance() # consume the end double quote
+            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, "T_StringConstant", is_constant = True))
+        
+        #character literals
+        else: # starts with a "'"
+            identifier +=  self._advance()
+            if self._is_escaped_char():
+                identifier += self._advance() + self._advance()
+            elif self._is_char_lit_chars():
+                identifier += self._advance()
+            identifier += self._advance() # consume ending single quote
+            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, "T_CharConstant", is_constant = True))
+
+
+    # this function generates tokens for identifiers and keywords
+    # identifier => letter { letter | digit }
+    def _scan_alphanum(self):
+        initial_col = self.col
+        identifier = ''
+        while self.index < len(self.input) and (self._is_letter() or self.input[self.index].isdigit()):
+            identifier += self._advance()
+
+        # keywords    
+        if identifier in self.keywords: 
+            if identifier == 'true' or identifier == 'false': #booleans are the only constant type that can be encountered in a keyword match
+                self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, self.keywords[identifier], is_constant = True))
+            else:
+                self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, self.keywords[identifier]))
+        
+        # identifiers
+        else:
+            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, 'T_Identifier')) #DECAF20 spec specifies this type label as 'T_ID' but changing it to 'T_Identifier' to match expected output
+
+    def _scan_operator(self):
+        initial_col = self.col
+        identifier = ''
+
+        # 2-character operators
+        if self.index + 1 < len(self.input) and ((self.input[self.index] + self.input[self.index + 1]) in self.operators):
+            identifier += self._advance() + self._advance()
+
+        # single character operators
+        else:
+            identifier += self._advance()
+        
+        if identifier in self.operators:
+            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, self.operators[identifier], is_operator = True))
+        # catch the case where a | or an & appear alone, since the dispaching tokenize() method calls this method if a single one is encountered
+        else:
+            print(f"Error: Unexpected character: '{identifier}' at line {self.line}, column {initial_col}")
+            self.errors += 1
+            return
+    
+    def print_tokens(self):
+        for token in self.tokens:
+            token.print_token()
+
+# list-like view over a token generator for the streaming pipeline. The parser keeps indexing it with absolute
+# positions, but only the tokens from the last release() onwards are buffered
+class TokenStream:
+    def __init__(self, tokens):
+        self._source = iter(tokens)
+        self._buffer = []
+        self._base = 0
+        self._next = next(self._source, None)
+
+    def __getitem__(self, position):
+        index = position - self._base
+        buffer = self._buffer
+        if 0 <= index < len(buffer):
+            return buffer[index]
+        if index < 0:
+            raise IndexError(f"token {position} has already been released")
+        while index >= len(buffer):
+            if self._next is None:
+                raise IndexError("token stream exhausted")
+            buffer.append(self._next)
+            self._next = next(self._source, None)
+        return buffer[index]
+
+    # the parser only compares positions at most one past the furthest token it has read against len(tokens),
+    # so a single token of lookahead answers those checks without scanning the rest of the input
+    def __len__(self):
+        return self._base + len(self._buffer) + (self._next is not None)
+
+    # drop every buffered token up to and including position
+    def release(self, position):
+        del self._buffer[:position + 1 - self._base]
+        self._base = position + 1
+
+# Scanner that keeps the tokens of a text up to date across edits. No token crosses a line, so an edit only
+# needs the lines it touches rescanned: their tokens are replaced in place and every later token keeps its
+# object, only its line moves by the number of lines the edit added or removed. The token list is always what
+# a full tokenize() of the current text gives. A text with scan errors, or with a char literal closed by a
+# newline (the one lexeme that can cross a line), is rescanned in full on every edit
+class IncrementalScanner:
+    def __init__(self, text, engine = "regex"):
+        self.engine = engine
+        self.full_scans = 0
+        self._scan_all(text)
+
+    def _scan_all(self, text):
+        scanner = Scanner(text, self.engine)
+        scanner.tokenize()
+        self.full_scans += 1
+        self.text = text
+        self.tokens = scanner.tokens
+        self.errors = scanner.errors
+        self.regular = not any(token.kind == CHARCONSTANT and "\n" in token.value for token in self.tokens)
+
+    # replaces text[start:end] with replacement; returns (position, removed, added): the tokens
+    # tokens[position:position + removed] of the old text are now tokens[position:position + added]
+    def edit(self, start, end, replacement):
+        text = self.text
+        new_text = text[:start] + replacement + text[end:]
+        spliced = None
+        if not self.errors and self.regular:
+            spliced = self._rescan(new_text, start, end, replacement)
+        if spliced is None:
+            old_count = len(self.tokens)
+            self._scan_all(new_text)
+            return 0, old_count, len(self.tokens)
+        return spliced
+
+    # line-local path; None when the edit needs a full scan. The legacy engine has no lazy scan and reads on to
+    # the end of the text, only the regex engine stops after the touched lines
+    def _rescan(self, new_text, start, end, replacement):
+        text = self.text
+        tokens = self.tokens
+        line_begin = text.rfind("\n", 0, start) + 1
+        first_line = text.count("\n", 0, line_begin) + 1
+        last_line = first_line + text.count("\n", line_begin, end)
+        line_delta = replacement.count("\n") - text.count("\n", start, end)
+        new_last_line = last_line + line_delta
+
+        # scan from the start of the first touched line up to the first token past the last one
+        scanner = Scanner(new_text, self.engine)
+        scanner.index = line_begin
+        scanner.line = first_line
+        new_tokens = []
+        # errors are reported by the full scan that follows them
+        with contextlib.redirect_stdout(io.StringIO()):
+            for token in scanner.iter_tokens():
+                if token.line > new_last_line:
+                    break
+                if token.kind == CHARCONSTANT and "\n" in token.value:
+                    return None
+                new_tokens.append(token)
+        if scanner.errors:
+            return None
+
+        position = bisect_left(tokens, first_line, key = _line)
+        later = bisect_right(tokens, last_line, lo = position, key = _line)
+        if line_delta:
+            for token in tokens[later:]:
+                token.line += line_delta
+        tokens[position:later] = new_tokens
+        self.text = new_text
+        return position, later - position, len(new_tokens)
+
+_line = attrgetter("line")
@@ -0,0 +1,258 @@
+import io
+import os
+import sys
+import json
+import socket
+import asyncio
+import argparse
+import contextlib
+import subprocess
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Parse server: python main.py --serve keeps the scanner and the parser loaded and answers requests, so editors
+# and CI pay for interpreter startup and imports once. Requests and responses are JSON objects, one per line, read
+# from stdin and written to stdout or, with --socket PATH, exchanged over a Unix socket with any number of clients.
+#
+# A request names a file or carries the source text, and may change the options that only affect one run:
+#   {"id": 1, "path": "t41.decaf"}
+#   {"id": 2, "text": "void main() { }", "tokens": false, "recover": true, "max_errors": 10, "format": "jsonl"}
+#   {"id": 3, "path": "t11.decaf", "check": true}
+#   {"id": 4, "op": "ping"}    {"op": "shutdown"}
+# The response repeats the id, with the status of the run ("ok", "scan error", "syntax error", "name error",
+# "not found") and what the command line would have printed on stdout and stderr:
+#   {"id": 1, "status": "ok", "output": "...", "errors": ""}
+# A request that cannot be run gets {"id": ..., "status": "bad request", "error": "..."}.
+#
+# Every connection is read by the event loop and its requests are run by a pool of --jobs worker processes, so
+# requests of one client can overlap and responses come back as they finish, matched to requests by id. With one
+# job the requests run one at a time in a thread of the server process. The scanner, engine and cache settings of
+# the server's command line hold for every request; paths go through the parse cache like on the command line
+
+# options a request may set, with their types
+REQUEST_OPTIONS = {"tokens": bool, "recover": bool, "max_errors": int, "check": bool, "format": str}
+
+# request formats; the binary export is not text and cannot travel in JSON
+REQUEST_FORMATS = ("tree", "jsonl")
+
+# longest request line the server reads, a whole program can be sent as "text"
+LINE_LIMIT = 1 << 26
+
+class BadRequest(Exception):
+    pass
+
+# the arguments of one request: the server's with the request's options applied
+def request_args(args, request):
+    args = argparse.Namespace(**vars(args))
+    for name, kind in REQUEST_OPTIONS.items():
+        if name in request:
+            value = request[name]
+            if type(value) is not kind:
+                raise BadRequest(f"'{name}' must be of type {kind.__name__}")
+            setattr(args, name, value)
+    if args.format not in REQUEST_FORMATS:
+        raise BadRequest(f"'format' must be one of {', '.join(REQUEST_FORMATS)}")
+    if args.max_errors < 1:
+        raise BadRequest("'max_errors' must be at least 1")
+    return args
+
+# runs one parse request in a worker with stdout and stderr captured. run_file(path, args) returns
+# (status, cached) and run_text(text, args) a status, as in main.py
+def _run_request(request, args, run_file, run_text):
+    output = io.StringIO()
+    errors = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+        try:
+            if "text" in request:
+                status = run_text(request["text"], args)
+            else:
+                status, _ = run_file(request["path"], args)
+        except Exception as error:
+            traceback.print_exc(file = errors)
+            status = f"crashed ({type(error).__name__})"
+    return {"status": status, "output": output.getvalue(), "errors": errors.getvalue()}
+
+class Server:
+    def __init__(self, args, run_file, run_text, configure):
+        self.args = args
+        self.run_file = run_file
+        self.run_text = run_text
+        if args.jobs == 1:
+            self.executor = ThreadPoolExecutor(max_workers = 1)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers = args.jobs, initializer = configure, initargs = (args,))
+        self.stopped = None # set by a shutdown request
+
+    # (response, stop) for one request line; stop is True after a shutdown request, once it has been answered
+    async def respond(self, line):
+        try:
+            request = json.loads(line)
+            if type(request) is not dict:
+                raise BadRequest("a request is a JSON object")
+        except (ValueError, BadRequest) as error:
+            return {"id": None, "status": "bad request", "error": str(error)}, False
+        response = {"id": request.get("id")}
+        op = request.get("op", "parse")
+        try:
+            if op in ("ping", "shutdown"):
+                response["status"] = "ok"
+            elif op != "parse":
+                raise BadRequest(f"unknown op '{op}'")
+            elif ("path" in request) == ("text" in request):
+                raise BadRequest("a parse request has either 'path' or 'text'")
+            elif type(request.get("path", request.get("text"))) is not str:
+                raise BadRequest("'path' and 'text' are strings")
+            else:
+                args = request_args(self.args, request)
+                loop = asyncio.get_running_loop()
+                response.update(await loop.run_in_executor(self.executor, _run_request, request, args,
+                                                           self.run_file, self.run_text))
+        except BadRequest as error:
+            response.update(status = "bad request", error = str(error))
+        return response, op == "shutdown"
+
+    # answers every request line from reader on write(bytes), as each one finishes; returns at end of input
+    async def serve_lines(self, reader, write):
+        pending = set()
+
+        async def answer(line):
+            response, stop = await self.respond(line)
+            if stop:
+                # the requests read before the shutdown are answered first
+                earlier = pending - {asyncio.current_task()}
+                if earlier:
+                    await asyncio.wait(earlier)
+            await write((json.dumps(response) + "\n").encode())
+            if stop:
+                self.stopped.set()
+
+        while not self.stopped.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(answer(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending)
+
+    async def serve_connection(self, reader, writer):
+        async def write(data):
+            writer.write(data)
+            await writer.drain()
+        try:
+            await self.serve_lines(reader, write)
+        except (ConnectionError, ValueError):
+            pass # the client went away or sent a line over LINE_LIMIT
+        finally:
+            writer.close()
+
+    async def serve_socket(self, path):
+        if os.path.exists(path):
+            os.unlink(path) # left behind by a server that did not shut down cleanly
+        server = await asyncio.start_unix_server(self.serve_connection, path, limit = LINE_LIMIT)
+        try:
+            async with server:
+                await self.stopped.wait()
+        finally:
+            os.unlink(path)
+
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit = LINE_LIMIT)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        # workers in threads redirect sys.stdout, responses go to the real one
+        out = sys.stdout.buffer
+
+        async def write(data):
+            out.write(data)
+            out.flush()
+        reading = asyncio.create_task(self.serve_lines(reader, write))
+        stopping = asyncio.create_task(self.stopped.wait())
+        await asyncio.wait((reading, stopping), return_when = asyncio.FIRST_COMPLETED)
+        for task in (reading, stopping):
+            task.cancel()
+
+    async def run(self, socket_path):
+        self.stopped = asyncio.Event()
+        try:
+            if socket_path is not None:
+                await self.serve_socket(socket_path)
+            else:
+                await self.serve_stdio()
+        finally:
+            self.executor.shutdown()
+
+# entry point of main.py --serve; returns the exit code
+def serve(args, run_file, run_text, configure):
+    try:
+        asyncio.run(Server(args, run_file, run_text, configure).run(args.socket))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+# Blocking client: Client.connect(path) talks to a server on a Unix socket, Client.spawn(options) starts a
+# server of its own on stdin/stdout. Requests are sent one at a time; parse_path and parse_text return the
+# response as a dict
+class Client:
+    def __init__(self, reader, writer, process = None, connection = None):
+        self.reader = reader
+        self.writer = writer
+        self.process = process
+        self.connection = connection
+        self.next_id = 0
+
+    @classmethod
+    def connect(cls, path):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(path)
+        return cls(connection.makefile("rb"), connection.makefile("wb"), connection = connection)
+
+    # options are command line options of the server, e.g. ["--jobs", "2"]
+    @classmethod
+    def spawn(cls, options = (), main = None):
+        main = main if main is not None else os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        process = subprocess.Popen([sys.executable, main, "--serve", *options], stdin = subprocess.PIPE,
+                                   stdout = subprocess.PIPE)
+        return cls(process.stdout, process.stdin, process = process)
+
+    def request(self, request):
+        self.next_id += 1
+        request = {"id": self.next_id, **request}
+        self.writer.write((json.dumps(request) + "\n").encode())
+        self.writer.flush()
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("the parse server closed the connection")
+        return json.loads(line)
+
+    def parse_path(self, path, **options):
+        return self.request({"path": path, **options})
+
+    def parse_text(self, text, **options):
+        return self.request({"text": text, **options})
+
+    def ping(self):
+        return self.request({"op": "ping"})
+
+    # stops the server itself, not just this connection
+    def shutdown(self):
+        response = self.request({"op": "shutdown"})
+        self.close()
+        return response
+
+    def close(self):
+        for stream in (self.writer, self.reader):
+            with contextlib.suppress(OSError):
+                stream.close()
+        if self.connection is not None:
+            self.connection.close()
+        if self.process is not None:
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
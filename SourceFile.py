@@ -0,0 +1,55 @@
+import re
+from itertools import accumulate
+
+NEWLINE = re.compile("\n")
+
+# line breaks str.splitlines() splits on besides "\n"
+OTHER_BREAKS = "\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# Source text with a lazy line index, for the error reports. Its job is print_error's source[token.line - 1]:
+# indexing a SourceFile gives the text of one line the way contents.splitlines() used to, without splitting the
+# whole file on runs that report nothing. Tokens still carry their line and columns, which the scanner derives
+# from the offset of the line start and every tree line prints, so positions are not computed from offsets here.
+# The one conversion is offset(line, col), for Incremental.py.
+#
+# Nothing is indexed up front: the line starts are found on first use. Lines end at "\n" only, the way the
+# scanner numbers them; only a text that also uses the other line breaks splitlines() knows ("\r", form feeds,
+# ...) is split, once, to find where its displayed lines start
+class SourceFile:
+    def __init__(self, text):
+        self.text = text
+        self._line_starts = None
+        self._display_starts = None
+
+    # offset of the first character of every line
+    @property
+    def line_starts(self):
+        if self._line_starts is None:
+            self._line_starts = [0] + [match.end() for match in NEWLINE.finditer(self.text)]
+        return self._line_starts
+
+    # offset of a (line, column) position
+    def offset(self, line, col):
+        return self.line_starts[line - 1] + col - 1
+
+    # offset of the first character of every line as splitlines() cuts them
+    def _display_lines(self):
+        if self._display_starts is None:
+            text = self.text
+            if any(line_break in text for line_break in OTHER_BREAKS):
+                self._display_starts = [0, *accumulate(map(len, text.splitlines(True)))][:-1]
+            elif text.endswith("\n") or not text:
+                # a final line break starts no further line
+                self._display_starts = self.line_starts[:-1]
+            else:
+                self._display_starts = self.line_starts
+        return self._display_starts
+
+    def __len__(self):
+        return len(self._display_lines())
+
+    def __getitem__(self, index):
+        starts = self._display_lines()
+        index = range(len(starts))[index]
+        end = starts[index + 1] if index + 1 < len(starts) else len(self.text)
+        return self.text[starts[index]:end].splitlines()[0]
@@ -0,0 +1,116 @@
+import time
+import tracemalloc
+import contextlib
+from collections import Counter
+from Scanner import Scanner
+from Parser import parseTokens
+from TreeWriter import TreeWriter, NullSink, write_node
+
+# Instrumentation for --stats: wall time of every phase (scan, parse, print), optionally the peak traced memory of
+# each, token counts by type, node counts by class and the depth of the tree. Nothing is hooked into the scanner
+# or the parser: phases are timed from the outside and the counts come from walking the token list and the tree
+# afterwards, so a run without --stats pays nothing. The tree depth is the deepest nesting of nodes, which is the
+# recursion depth the recursive printer and the recursive engines would have needed for it.
+# Tracing memory slows Python down several times over, so it is only done when asked for, and the times recorded
+# along with it include that overhead
+
+class Stats:
+    def __init__(self, memory = False):
+        self.memory = memory
+        self.phases = {} # phase -> {"seconds": wall time, "peak_bytes": peak traced memory, with memory only}
+        self.tokens_by_type = Counter()
+        self.nodes_by_class = Counter()
+        self.max_depth = 0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self.memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            result = {"seconds": time.perf_counter() - start}
+            if self.memory:
+                result["peak_bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phases[name] = result
+
+    def count_tokens(self, tokens):
+        self.tokens_by_type.update(token.type for token in tokens)
+
+    def count_nodes(self, program_node):
+        nodes_by_class, depth = node_counts(program_node)
+        self.nodes_by_class.update(nodes_by_class)
+        self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self):
+        return {
+            "phases": self.phases,
+            "tokens": sum(self.tokens_by_type.values()),
+            "tokens_by_type": dict(self.tokens_by_type.most_common()),
+            "nodes": sum(self.nodes_by_class.values()),
+            "nodes_by_class": dict(self.nodes_by_class.most_common()),
+            "max_depth": self.max_depth,
+        }
+
+    def report(self, out):
+        stats = self.as_dict()
+        out.write("Stats:\n")
+        for name, phase in stats["phases"].items():
+            memory = f", peak {phase['peak_bytes'] / (1 << 20):.1f} MiB" if "peak_bytes" in phase else ""
+            out.write(f"  {name}: {phase['seconds'] * 1000:.1f} ms{memory}\n")
+        if self.memory:
+            out.write("  (times include the overhead of tracing memory)\n")
+        out.write(f"  tokens: {stats['tokens']}\n")
+        for type, count in stats["tokens_by_type"].items():
+            out.write(f"    {type}: {count}\n")
+        out.write(f"  nodes: {stats['nodes']}, max depth {stats['max_depth']}\n")
+        for name, count in stats["nodes_by_class"].items():
+            out.write(f"    {name}: {count}\n")
+
+# (Counter of node class names, depth of the deepest node) of a parsed program; the declarations are at depth 1.
+# Every object reachable from the declarations that has attributes is a node, tokens have none
+def node_counts(program_node):
+    counts = Counter()
+    max_depth = 0
+    stack = [(decl, 1) for decl in program_node.decls]
+    while stack:
+        node, depth = stack.pop()
+        counts[type(node).__name__] += 1
+        if depth > max_depth:
+            max_depth = depth
+        for name, field in node.__dict__.items():
+            if name == "tokens":
+                continue
+            if type(field) is list:
+                stack.extend((item, depth + 1) for item in field if hasattr(item, "__dict__"))
+            elif hasattr(field, "__dict__"):
+                stack.append((field, depth + 1))
+    return counts, max_depth
+
+# Python API: scans, parses and prints text (to sink, by default nowhere) and returns the stats as a dict, with
+# "scan_errors" and "syntax_error" added. Syntax errors are printed the way parseTokens prints them
+def collect(text, memory = False, sink = None):
+    stats = Stats(memory)
+    scanner = Scanner(text)
+    with stats.phase("scan"):
+        scanner.tokenize()
+    stats.count_tokens(scanner.tokens)
+    with stats.phase("parse"):
+        program_node, has_error = parseTokens(scanner.tokens, text)
+    if not has_error and program_node:
+        with stats.phase("print"):
+            out = TreeWriter(sink if sink is not None else NullSink())
+            write_node(program_node, out)
+            out.flush()
+        stats.count_nodes(program_node)
+    result = stats.as_dict()
+    result["scan_errors"] = scanner.errors
+    result["syntax_error"] = has_error
+    return result
@@ -7,74 +7,206 @@ from PrintStmt import PrintStmt
 from Expressions import Expressions
 from Basic import Basic
 from Basic import SyntaxErr
+from TokenKind import TokenKind, ELSE, SEMICOLON, LCB, RCB, IF, WHILE, FOR, EOF, IDENTIFIER_KINDS, VARIABLE_TYPE_KINDS
+from VariableDecl import VariableDecl
+from Recovery import error_position, sync_statement
 import StmtBlock as stb
 
+# statement keyword -> (statement class, stmtType, attribute holding the parsed statement)
+# the block entry goes through the module because Stmt and StmtBlock import each other
+STATEMENTS = {
+    TokenKind.LCB: (lambda cursor: stb.StmtBlock(cursor), "block", "stmtblock"),
+    TokenKind.IF: (IfStmt, "if", "ifStmt"),
+    TokenKind.WHILE: (WhileStmt, "while", "wStmt"),
+    TokenKind.FOR: (ForStmt, "for", "fStmt"),
+    TokenKind.BREAK: (BreakStmt, "break", "bStmt"),
+    TokenKind.RETURN: (ReturnStmt, "return", "rStmt"),
+    TokenKind.PRINT: (PrintStmt, "print", "pStmt"),
+}
+
+# statements that contain other statements; parse_block handles these with its own work stack
+COMPOUND_KINDS = {LCB, IF, WHILE, FOR}
+
+# kinds that make a type name in a block the start of a variable declaration; a type name just before the end of
+# input is taken for one too, so that the error is on the end of input rather than on the type name
+DECLARED_KINDS = IDENTIFIER_KINDS | {EOF}
+
 class Stmt(Basic, object):
-    def __init__(self, tokens, tokenPosition):
+    def __init__(self, cursor):
 
-        super(Stmt, self).__init__(tokens, tokenPosition)
+        super(Stmt, self).__init__(cursor)
         
-        if tokens[tokenPosition].value == "{":
-            self.stmtblock = stb.StmtBlock(tokens, tokenPosition)
-            self.stmtType = "block"
-            self.tokenPositionProcessed = self.stmtblock.tokenPositionProcessed
-
-        elif tokens[tokenPosition].type.lower() == "T_If".lower():
-            self.ifStmt = IfStmt(tokens, tokenPosition)
-            self.stmtType = "if"
-            self.tokenPositionProcessed = self.ifStmt.tokenPositionProcessed
-
-        elif tokens[tokenPosition].type.lower() == "T_While".lower():
-            self.wStmt = WhileStmt(tokens, tokenPosition)
-            self.stmtType = "while"
-            self.tokenPositionProcessed = self.wStmt.tokenPositionProcessed
-
-        elif tokens[tokenPosition].type.lower() == "T_For".lower():
-            self.fStmt = ForStmt(tokens, tokenPosition)
-            self.stmtType = "for"
-            self.tokenPositionProcessed = self.fStmt.tokenPositionProcessed
-
-        elif tokens[tokenPosition].type.lower() == "T_Break".lower():
-            self.bStmt = BreakStmt(tokens, tokenPosition)
-            self.stmtType = "break"
-            self.tokenPositionProcessed = self.bStmt.tokenPositionProcessed
-
-        elif tokens[tokenPosition].type.lower() == "T_Return".lower():
-            self.rStmt = ReturnStmt(tokens, tokenPosition)
-            self.stmtType = "return"
-            self.tokenPositionProcessed = self.rStmt.tokenPositionProcessed
-
-        elif tokens[tokenPosition].type.lower() == "T_Print".lower():
-            self.pStmt = PrintStmt(tokens, tokenPosition)
-            self.stmtType = "print"
-            self.tokenPositionProcessed = self.pStmt.tokenPositionProcessed
-
-        elif tokens[tokenPosition].type.lower() == "T_Else".lower():
-            raise Exception(SyntaxErr, tokens[tokenPosition])
+        token = cursor.peek()
+        statement = STATEMENTS.get(token.kind)
+
+        if statement is not None:
+            parse, self.stmtType, attribute = statement
+            parsed = parse(cursor)
+            setattr(self, attribute, parsed)
+            self.tokenPositionProcessed = parsed.tokenPositionProcessed
+
+        elif token.kind == ELSE:
+            raise Exception(SyntaxErr, token)
 
         else:
-            # any other expression is treated as an expression statement
-            self.exp = Expressions(tokens, tokenPosition)
-            self.stmtType = "exp"
-            self.tokenPositionProcessed = self.exp.tokenPositionProcessed
-            if tokens[self.tokenPositionProcessed + 1].value != ";":
-                raise Exception(SyntaxErr, tokens[self.tokenPositionProcessed + 1])
-            self.tokenPositionProcessed += 1
-
-    def print_tree(self, indent = 0, label = ""):
+            self.parse_expression(cursor)
+
+    # any other expression is treated as an expression statement
+    def parse_expression(self, cursor):
+        self.exp = Expressions(cursor)
+        self.stmtType = "exp"
+        cursor.expect(SEMICOLON)
+        self.tokenPositionProcessed = cursor.position - 1
+
+    def write_tree(self, out, indent = 0, label = ""):
         if self.stmtType == "block":
-            self.stmtblock.print_tree(indent)
+            self.stmtblock.write_tree(out, indent)
         elif self.stmtType == "if":
-            self.ifStmt.print_tree(indent)
+            self.ifStmt.write_tree(out, indent)
         elif self.stmtType == "while":
-            self.wStmt.print_tree(indent)
+            self.wStmt.write_tree(out, indent)
         elif self.stmtType == "for":
-            self.fStmt.print_tree(indent, label) # label need to pass through (step) from ForStmt
+            self.fStmt.write_tree(out, indent, label) # label need to pass through (step) from ForStmt
         elif self.stmtType == "break":
-            self.bStmt.print_tree(indent)
+            self.bStmt.write_tree(out, indent)
         elif self.stmtType == "return":
-            self.rStmt.print_tree(indent)
+            self.rStmt.write_tree(out, indent)
         elif self.stmtType == "print":
-            self.pStmt.print_tree(indent)
+            self.pStmt.write_tree(out, indent)
         elif self.stmtType == "exp":
-            self.exp.print_tree(indent)
\ No newline at end of file
+            self.exp.write_tree(out, indent)
+
+# iterative statement parsing: fills in a StmtBlock whose '{' is at block.tokenPosition, building the same
+# StmtBlock/Stmt/IfStmt/WhileStmt/ForStmt objects as the constructors but keeping the nodes still waiting for a
+# nested statement on an explicit stack, so nesting depth is limited by memory instead of the recursion limit.
+# Tokens are checked in the same order as the recursive path, so errors are raised on the same token.
+# With StmtBlock.error_log set (error recovery, see Recovery.py) a syntax error is logged instead, the partly
+# parsed statements above the innermost block are dropped and that block goes on after the statement in error.
+# An error at the end of input is left to the top level, there is nothing to go on with
+def parse_block(block, cursor):
+    cursor.expect(LCB)
+
+    # every frame is [enclosing Stmt (None for the outermost block), node, attribute of the Stmt, stage]
+    # where stage is "block", "then", "else", "body" or "stmt", the attribute a finished child goes into
+    stack = [[None, block, None, "block"]]
+    log = stb.StmtBlock.error_log
+    while True:
+        try:
+            _parse_frames(cursor, stack)
+            return
+        except Exception as error:
+            if log is None or len(error.args) != 2 or error.args[1].kind == EOF:
+                raise
+            error_type, token = error.args
+            innermost = max(index for index, frame in enumerate(stack) if frame[3] == "block")
+            del stack[innermost + 1:]
+            node = stack[-1][1]
+            log.add(error_type, token)
+            position = error_position(cursor.tokens, token, node.tokenPositionProcessed + 1)
+            cursor.position = sync_statement(cursor.tokens, position)
+            node.tokenPositionProcessed = cursor.position - 1
+
+# the work loop of parse_block; returns once the outermost block on the stack is complete
+def _parse_frames(cursor, stack):
+    peek = cursor.peek
+    start = None # the first token of a statement to parse next, at the cursor
+    done = None # a finished Stmt to hand to the frame on top of the stack
+
+    while True:
+        if start is not None:
+            stmt = Stmt.__new__(Stmt)
+            Basic.__init__(stmt, cursor)
+            token = start
+            kind = token.kind
+            start = None
+
+            if kind in COMPOUND_KINDS:
+                stmt.stmtType = STATEMENTS[kind][1]
+                if kind == LCB:
+                    node = stb.StmtBlock.__new__(stb.StmtBlock)
+                    Basic.__init__(node, cursor)
+                    node.variableDecls = []
+                    node.stmts = []
+                    cursor.advance()
+                    stack.append([stmt, node, "stmtblock", "block"])
+                elif kind == IF:
+                    node = IfStmt.__new__(IfStmt)
+                    Basic.__init__(node, cursor)
+                    node.withElse = False
+                    node.parse_condition(cursor)
+                    start = peek()
+                    stack.append([stmt, node, "ifStmt", "then"])
+                elif kind == WHILE:
+                    node = WhileStmt.__new__(WhileStmt)
+                    Basic.__init__(node, cursor)
+                    node.parse_condition(cursor)
+                    start = peek()
+                    stack.append([stmt, node, "wStmt", "body"])
+                else:
+                    node = ForStmt.__new__(ForStmt)
+                    Basic.__init__(node, cursor)
+                    node.hasFirstExp = False
+                    node.hasLastExp = False
+                    node.parse_header(cursor)
+                    start = peek()
+                    stack.append([stmt, node, "fStmt", "stmt"])
+                continue
+
+            statement = STATEMENTS.get(kind)
+            if statement is not None:
+                parse, stmt.stmtType, attribute = statement
+                parsed = parse(cursor)
+                setattr(stmt, attribute, parsed)
+                stmt.tokenPositionProcessed = parsed.tokenPositionProcessed
+            elif kind == ELSE:
+                raise Exception(SyntaxErr, token)
+            else:
+                stmt.parse_expression(cursor)
+            done = stmt
+
+        frame = stack[-1]
+        node = frame[1]
+        stage = frame[3]
+
+        if done is not None:
+            node.tokenPositionProcessed = done.tokenPositionProcessed
+            if stage == "block":
+                node.stmts.append(done)
+                done = None
+                continue
+            if stage == "then":
+                node.thenStmt = done
+                done = None
+                if node.has_else(cursor):
+                    node.withElse = True
+                    frame[3] = "else"
+                    cursor.advance()
+                    start = peek()
+                    continue
+            elif stage == "else":
+                node.elseStmt = done
+            else:
+                setattr(node, stage, done)
+            done = None
+
+        else:
+            # a block waiting for its next declaration, statement or closing '}'
+            current_token = peek()
+            if current_token.kind != RCB:
+                if (current_token.kind in VARIABLE_TYPE_KINDS) and (peek(1).kind in DECLARED_KINDS):
+                    variableDecl = VariableDecl(cursor)
+                    node.tokenPositionProcessed = variableDecl.tokenPositionProcessed
+                    node.variableDecls.append(variableDecl)
+                else:
+                    start = current_token
+                continue
+            node.tokenPositionProcessed = cursor.position
+            cursor.advance()
+
+        # the node on top of the stack is complete
+        stmt, node, attribute, _ = stack.pop()
+        if stmt is None:
+            return
+        setattr(stmt, attribute, node)
+        stmt.tokenPositionProcessed = node.tokenPositionProcessed
+        done = stmt
@@ -2,52 +2,58 @@
 
 from VariableDecl import VariableDecl
 from Basic import Basic
-from Basic import SyntaxErr
+from TokenKind import LCB, RCB, VARIABLE_TYPE_KINDS
 import Stmt as st
 
 class StmtBlock(Basic, object):
-    def __init__(self, tokens, tokenPosition):
-        super(StmtBlock, self).__init__(tokens, tokenPosition)
+    # "iterative" parses nested statements with an explicit work stack (Stmt.parse_block), "recursive" is the
+    # original mutual recursion through Stmt, kept for comparison
+    engine = "iterative"
+    # an ErrorLog while parsing with error recovery (Parser.recoverDecls); the iterative engine then recovers
+    # inside blocks, the recursive one only at the top level
+    error_log = None
+
+    def __init__(self, cursor):
+        super(StmtBlock, self).__init__(cursor)
         self.variableDecls = []
         self.stmts = []
 
-        varTokenPostion = self.tokenPosition + 1
+        if self.engine == "iterative":
+            st.parse_block(self, cursor)
+            return
 
-        if self.tokens[self.tokenPosition].value == "{":
+        cursor.expect(LCB)
             
-            while True:
-                if self.tokens[varTokenPostion].value == "}":
-
-                    self.tokenPositionProcessed = varTokenPostion
-                    break
-                
-                current_token = self.tokens[varTokenPostion]
-                next_token = self.tokens[varTokenPostion + 1]
-                
-                if (current_token.value in ["int", "double", "string", "bool"]) and (next_token.type == "T_Identifier"):
-                    variableDecl = VariableDecl(self.tokens, varTokenPostion)
-                    self.tokenPositionProcessed = variableDecl.tokenPositionProcessed
-                    varTokenPostion = self.tokenPositionProcessed + 1
-                    self.variableDecls.append(variableDecl)
-                
-                else:
-                    stmt = st.Stmt(self.tokens, varTokenPostion)
-                    self.tokenPositionProcessed = stmt.tokenPositionProcessed
-                    varTokenPostion = self.tokenPositionProcessed + 1
-                    self.stmts.append(stmt)
-        else:
-            raise Exception(SyntaxErr, self.tokens[self.tokenPosition])
-
-    def print_tree(self, indent = 0, label = ""):
+        while True:
+            if cursor.peek().kind == RCB:
+
+                self.tokenPositionProcessed = cursor.position
+                cursor.advance()
+                break
+            
+            current_token = cursor.peek()
+            next_token = cursor.peek(1)
+            
+            if (current_token.kind in VARIABLE_TYPE_KINDS) and (next_token.kind in st.DECLARED_KINDS):
+                variableDecl = VariableDecl(cursor)
+                self.tokenPositionProcessed = variableDecl.tokenPositionProcessed
+                self.variableDecls.append(variableDecl)
+            
+            else:
+                stmt = st.Stmt(cursor)
+                self.tokenPositionProcessed = stmt.tokenPositionProcessed
+                self.stmts.append(stmt)
+
+    def write_tree(self, out, indent = 0, label = ""):
         line = self.tokens[self.tokenPosition].line
 
         # header
-        print(f"{line} \t" + "\t" * indent + label + "StmtBlock:") # label can be (body)
+        out.write(line, indent, label + "StmtBlock:") # label can be (body)
 
         # variable declarations 
         for variableDecl in self.variableDecls:
-            variableDecl.print_tree(indent + 1)
+            variableDecl.write_tree(out, indent + 1)
 
         # statements
         for stmt in self.stmts:
-            stmt.print_tree(indent + 1)
+            stmt.write_tree(out, indent + 1)
@@ -0,0 +1,121 @@
+from collections import ChainMap
+from Parser import ProgramNode
+from FunctionDecl import FunctionDecl
+from StmtBlock import StmtBlock
+from ExpressionSubnodes import CallNode, FieldAccessNode
+from Walker import Walker
+
+# Name resolution: resolve(program_node) binds every identifier use (FieldAccessNode, CallNode) to the declaration
+# it names and returns a SymbolTable.
+#
+# Scopes are dicts chained with ChainMap: the globals, then the formals of a function, then one scope per nested
+# StmtBlock, innermost first, so a lookup walks out from the innermost scope. The globals (variables and
+# functions) are all declared before any body is walked, so a function can call one declared after it; inside a
+# block the grammar puts the declarations before the statements, so a block's scope is complete when it is
+# entered. Everything else is one walk of the tree (Walker.py).
+#
+# Errors are (error type, token) pairs, like the parser's (Recovery.ErrorLog), to report with Parser.print_error:
+# uses of undeclared names, and names declared twice in one scope. A duplicate keeps the first declaration in the
+# scope; uses resolve to that one
+
+# kinds of declarations
+FUNCTION, GLOBAL, FORMAL, LOCAL = "function", "global", "formal", "local"
+
+# kinds of uses: a CallNode's identifier, a FieldAccessNode's
+CALL, ACCESS = "call", "access"
+
+class Declaration:
+    __slots__ = ("name", "kind", "type", "token", "node", "uses")
+
+    def __init__(self, name, kind, type, token, node):
+        self.name = name
+        self.kind = kind
+        self.type = type # type name; the return type of a function
+        self.token = token # the identifier token of the declaration
+        self.node = node # VariableDecl, FunctionDecl or the Variable of a formal
+        self.uses = [] # identifier tokens resolved to it, in source order
+
+class SymbolTable:
+    def __init__(self):
+        self.globals = {} # name -> Declaration
+        self.declarations = [] # in source order, duplicates included
+        self.positions = {} # (line, column) of a declaring or using identifier token -> Declaration
+        self.references = [] # (identifier token, kind of use, Declaration or None if undeclared) in source order
+        self.errors = [] # (error type, token)
+
+    # the declaration that the identifier starting at line, column declares or uses; None if there is none or the
+    # name is undeclared
+    def declaration_at(self, line, column):
+        return self.positions.get((line, column))
+
+    def declare(self, scope, name, kind, type, token, node):
+        declaration = Declaration(name, kind, type, token, node)
+        self.declarations.append(declaration)
+        self.positions[(token.line, token.start_col)] = declaration
+        if name in scope:
+            self.errors.append((f"duplicate declaration of '{name}'", token))
+        else:
+            scope[name] = declaration
+
+    # the declaration that scope gives the identifier token, recorded as a use of it
+    def use(self, scope, token, kind):
+        name = token.value
+        for names in scope.maps:
+            if name in names:
+                declaration = names[name]
+                declaration.uses.append(token)
+                self.positions[(token.line, token.start_col)] = declaration
+                self.references.append((token, kind, declaration))
+                return
+        self.references.append((token, kind, None))
+        self.errors.append((f"undeclared identifier '{name}'", token))
+
+def _declare_variables(table, scope, variable_decls, kind):
+    for variable_decl in variable_decls:
+        variable = variable_decl.variable
+        table.declare(scope, variable.identifier, kind, variable.type.value,
+                      variable.tokens[variable.tokenPosition + 1], variable_decl)
+
+def _callbacks(table):
+    # the globals, before any body
+    def program(node, role, scope):
+        for decl in node.decls:
+            if decl.isVariableDecl:
+                _declare_variables(table, scope.maps[0], (decl.variableDecl,), GLOBAL)
+            else:
+                function_decl = decl.functionDecl
+                table.declare(scope.maps[0], function_decl.identifier, FUNCTION, function_decl.type,
+                              function_decl.tokens[function_decl.tokenPosition + 1], function_decl)
+        return scope
+
+    def function_decl(node, role, scope):
+        formals = scope.new_child()
+        for formal in node.formals:
+            table.declare(formals.maps[0], formal.identifier, FORMAL, formal.type.value,
+                          formal.tokens[formal.tokenPosition + 1], formal)
+        return formals
+
+    def stmt_block(node, role, scope):
+        block = scope.new_child()
+        _declare_variables(table, block.maps[0], node.variableDecls, LOCAL)
+        return block
+
+    def field_access(node, role, scope):
+        table.use(scope, node.variable, ACCESS)
+
+    def call(node, role, scope):
+        table.use(scope, node.identifier, CALL)
+        return scope
+
+    return {
+        ProgramNode: program,
+        FunctionDecl: function_decl,
+        StmtBlock: stmt_block,
+        FieldAccessNode: field_access,
+        CallNode: call,
+    }
+
+def resolve(program_node):
+    table = SymbolTable()
+    Walker(_callbacks(table)).walk(program_node, ChainMap(table.globals))
+    return table
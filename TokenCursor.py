@@ -0,0 +1,59 @@
+from Basic import SyntaxErr
+from Scanner import Token
+from TokenKind import EOF
+
+# The parser classes read their tokens through a TokenCursor: position is the next token to read, peek(k) looks
+# k tokens ahead, advance() reads a token and expect(kind) reads one that must be of that kind. tokens is a list,
+# a TokenTable or a TokenStream, shared by every node parsed from it.
+# Past the last token every read gives the same EOF sentinel token, so input that ends too early is a syntax
+# error on the sentinel like any other, reported just after the last token. The reads need no bounds check: the
+# sentinel is only made when indexing past the end raises. Any other IndexError, like a token a TokenStream has
+# already released, is not an end of input and propagates
+class TokenCursor:
+    __slots__ = ("tokens", "position", "_eof")
+
+    def __init__(self, tokens, position = 0):
+        self.tokens = tokens
+        self.position = position
+        self._eof = None
+
+    def peek(self, k = 0):
+        try:
+            return self.tokens[self.position + k]
+        except IndexError:
+            if self.position + k < len(self.tokens):
+                raise
+            return self.eof()
+
+    def advance(self):
+        position = self.position
+        self.position = position + 1
+        try:
+            return self.tokens[position]
+        except IndexError:
+            if position < len(self.tokens):
+                raise
+            return self.eof()
+
+    def expect(self, kind):
+        token = self.peek()
+        if token.kind != kind:
+            raise Exception(SyntaxErr, token)
+        self.position += 1
+        return token
+
+    # whether every token has been read; the top level asks this before each declaration
+    def at_end(self):
+        return self.position >= len(self.tokens)
+
+    def eof(self):
+        if self._eof is None:
+            self._eof = eof_token(self.tokens)
+        return self._eof
+
+# the sentinel of a token sequence: an empty token just after the last one
+def eof_token(tokens):
+    if len(tokens) == 0:
+        return Token("", 1, 1, 1, "T_EOF", kind = EOF)
+    last = tokens[len(tokens) - 1]
+    return Token("", last.line, last.end_col + 1, last.end_col + 1, "T_EOF", kind = EOF)
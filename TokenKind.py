@@ -0,0 +1,104 @@
+from enum import IntEnum
+
+# token tables shared by the Scanner and the parser classes
+OPERATORS = {
+    '{': 'T_LCB',
+    '}': 'T_RCB', 
+    '[': 'T_LSB',
+    ']': 'T_RSB',
+    ',': 'T_COMMA',
+    ';': 'T_SEMICOLON',
+    '(': 'T_LPAREN',
+    ')': 'T_RPAREN',
+    '=': 'T_ASSIGN',
+    '-': 'T_MINUS',
+    '!': 'T_NOT',
+    '+': 'T_PLUS',
+    '*': 'T_MULT',
+    '/': 'T_DIV',
+    '<<': 'T_LEFTSHIFT',
+    '>>': 'T_RIGHTSHIFT',
+    '<': 'T_LT',
+    '>': 'T_GT',
+    '<=': 'T_LessEqual', #instead of 'T_LEQ', as per spec, to match expected output
+    '>=': 'T_GEQ',
+    '==': 'T_EQ',
+    '!=': 'T_NEQ',
+    '&&': 'T_logicaland', # should be 'T_AND' as per the DECAF20 spec but changed to match expected output
+    '||': 'T_OR',
+    '.': 'T_DOT'
+}
+#some of these keywords had to deviate from the all-caps format specified to match the expected output
+KEYWORDS = {
+    'bool': 'T_Identifier', # spec says this should be 'T_BOOLTYPE' but expected output shows 'T_IDENTIFIER'
+    'break': 'T_Break',
+    'continue': 'T_Continue',
+    'else': 'T_Else',
+    'extern': 'T_Extern',
+    'false': 'T_BoolConstant',
+    'for': 'T_For',
+    'func': 'T_Func',
+    'if': 'T_If',
+    'int': 'T_Int',
+    'null': 'T_Null',
+    'package': 'T_Package',
+    'return': 'T_Return',
+    'string': 'T_String', # this is 'T_STRINGTYPE' in the spec but had to change it to 'T_String' to match expected output
+    'true': 'T_BoolConstant',
+    'var': 'T_Var',
+    'void': 'T_Void',
+    'while': 'T_While',
+    'Print': 'T_Print'
+}
+
+# Small integer kind for every token, so the parser can dispatch on an int instead of comparing lexeme or type
+# strings. Every operator and keyword gets its own kind (named after its type or lexeme), which keeps 'bool'
+# apart from identifiers even though both print as T_Identifier. 'double' is not a keyword, but the parser
+# accepts it as a type name, so identifiers spelled "double" get a kind of their own as well. EOF is the kind of
+# the parser's end of input sentinel (TokenCursor.py), which the scanner never produces
+TokenKind = IntEnum("TokenKind",
+                    ["IDENTIFIER", "DOUBLE", "INTCONSTANT", "STRINGCONSTANT", "CHARCONSTANT"]
+                    + [type[2:].upper() for type in OPERATORS.values()]
+                    + [keyword.upper() for keyword in KEYWORDS]
+                    + ["EOF"])
+
+# module-level aliases (TokenKind.SEMICOLON is also importable as SEMICOLON): looking a member up on the
+# enum class is several times slower than reading a global, and the parser compares kinds on every token
+globals().update(TokenKind.__members__)
+
+# lexeme -> kind for every token whose kind follows from its spelling
+LEXEME_KINDS = {lexeme: TokenKind[type[2:].upper()] for lexeme, type in OPERATORS.items()}
+LEXEME_KINDS.update({keyword: TokenKind[keyword.upper()] for keyword in KEYWORDS})
+LEXEME_KINDS["double"] = TokenKind.DOUBLE
+
+# token type -> kind for identifiers and literals
+TYPE_KINDS = {
+    'T_Identifier': TokenKind.IDENTIFIER,
+    'T_IntConstant': TokenKind.INTCONSTANT,
+    'T_StringConstant': TokenKind.STRINGCONSTANT,
+    'T_CharConstant': TokenKind.CHARCONSTANT,
+}
+
+# kind -> token type, as printed by print_token
+KIND_TYPES = {kind: type for type, kind in TYPE_KINDS.items()}
+KIND_TYPES[TokenKind.DOUBLE] = 'T_Identifier'
+KIND_TYPES.update({LEXEME_KINDS[lexeme]: type for lexeme, type in OPERATORS.items()})
+KIND_TYPES.update({LEXEME_KINDS[keyword]: type for keyword, type in KEYWORDS.items()})
+
+OPERATOR_KINDS = frozenset(LEXEME_KINDS[lexeme] for lexeme in OPERATORS)
+CONSTANT_KINDS = frozenset({TokenKind.INTCONSTANT, TokenKind.STRINGCONSTANT, TokenKind.CHARCONSTANT, TokenKind.TRUE, TokenKind.FALSE})
+
+# kinds whose type is T_Identifier
+IDENTIFIER_KINDS = frozenset({TokenKind.IDENTIFIER, TokenKind.BOOL, TokenKind.DOUBLE})
+
+# type names accepted by Type; void only where FunctionDecl allows it
+TYPE_NAME_KINDS = frozenset({TokenKind.INT, TokenKind.DOUBLE, TokenKind.STRING, TokenKind.BOOL, TokenKind.VOID})
+VARIABLE_TYPE_KINDS = TYPE_NAME_KINDS - {TokenKind.VOID}
+
+RELATIONAL_KINDS = frozenset({TokenKind.LT, TokenKind.GT, TokenKind.LESSEQUAL, TokenKind.GEQ})
+
+def kind_of(value, type):
+    kind = LEXEME_KINDS.get(value)
+    if kind is None:
+        kind = TYPE_KINDS[type]
+    return kind
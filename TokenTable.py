@@ -0,0 +1,109 @@
+from array import array
+from Scanner import Token
+from TokenKind import TokenKind, KIND_TYPES, OPERATOR_KINDS, CONSTANT_KINDS
+
+# Compact token storage for large inputs: one typed array per token field (struct of arrays) instead of one
+# Token object per lexeme. Lexemes are interned in a pool; type, is_operator and is_constant all follow from
+# the TokenKind, so only the kind is stored. Indexing returns a TokenView, which reads like a Token to the parser
+class TokenTable:
+    def __init__(self, tokens = ()):
+        self.kinds = array('B')       # TokenKind
+        self.lines = array('I')
+        self.start_cols = array('I')
+        self.end_cols = array('I')
+        self.lexemes = array('I')     # index into self.pool
+        self.pool = []
+        self._pool_index = {}
+        self.extend(tokens)
+
+    def add(self, value, line, start_col, end_col, kind):
+        lexeme = self._pool_index.get(value)
+        if lexeme is None:
+            lexeme = self._pool_index[value] = len(self.pool)
+            self.pool.append(value)
+        self.kinds.append(kind)
+        self.lines.append(line)
+        self.start_cols.append(start_col)
+        self.end_cols.append(end_col)
+        self.lexemes.append(lexeme)
+
+    def append(self, token):
+        self.add(token.value, token.line, token.start_col, token.end_col, token.kind)
+
+    def extend(self, tokens):
+        for token in tokens:
+            self.append(token)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield TokenView(self, index)
+
+    # pickled without the lexeme index, which follows from the pool
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_pool_index"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool_index = {value: index for index, value in enumerate(self.pool)}
+
+    # approximate bytes held by the table itself (arrays and pool, not the interned strings)
+    def nbytes(self):
+        columns = (self.kinds, self.lines, self.start_cols, self.end_cols, self.lexemes)
+        return sum(column.itemsize * len(column) for column in columns) + 8 * len(self.pool)
+
+_kinds = {kind.value: kind for kind in TokenKind}
+
+# read-only Token stand-in for one row of a TokenTable
+class TokenView:
+    __slots__ = ("table", "index")
+
+    # a table never stores const_value; the scanner never sets it either
+    const_value = None
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def value(self):
+        return self.table.pool[self.table.lexemes[self.index]]
+
+    @property
+    def line(self):
+        return self.table.lines[self.index]
+
+    @property
+    def start_col(self):
+        return self.table.start_cols[self.index]
+
+    @property
+    def end_col(self):
+        return self.table.end_cols[self.index]
+
+    @property
+    def kind(self):
+        return _kinds[self.table.kinds[self.index]]
+
+    @property
+    def type(self):
+        return KIND_TYPES[self.table.kinds[self.index]]
+
+    @property
+    def is_operator(self):
+        return self.table.kinds[self.index] in OPERATOR_KINDS
+
+    @property
+    def is_constant(self):
+        return self.table.kinds[self.index] in CONSTANT_KINDS
+
+    print_token = Token.print_token
@@ -0,0 +1,58 @@
+import sys
+
+# buffered output for the parse tree. Every tree line starts with "<line number> \t" and one tab per indent level;
+# those prefixes are cached, finished lines are collected in a list and written to the sink in large chunks
+# instead of one print() per line
+class TreeWriter:
+    def __init__(self, sink = None, buffer_lines = 8192):
+        self.sink = sink if sink is not None else sys.stdout
+        self.buffer_lines = buffer_lines
+        self.lines = []
+        self.prefixes = {} # (line, indent) -> prefix
+        self.printer = None # the Walker that prints trees into this writer, made by Walker.write_tree when first used
+
+    # one tree line for source line `line`
+    def write(self, line, indent, text):
+        prefix = self.prefixes.get((line, indent))
+        if prefix is None:
+            prefix = self.prefixes[(line, indent)] = f"{line} \t" + "\t" * indent
+        self.lines.append(prefix + text)
+        if len(self.lines) >= self.buffer_lines:
+            self.flush()
+
+    # a line without the line number prefix ("Program:")
+    def write_line(self, text):
+        self.lines.append(text)
+
+    def flush(self):
+        if self.lines:
+            self.lines.append("")
+            self.sink.write("\n".join(self.lines))
+            # cleared in place: the printer appends to this list
+            self.lines.clear()
+            # line numbers only grow while a tree is written, so older prefixes are not needed again
+            self.prefixes.clear()
+
+# sink that drops the text, to time or measure printing on its own
+class NullSink:
+    def write(self, text):
+        pass
+
+# print_tree for anything with a write_tree(out, ...) method: same arguments, output goes to stdout through a TreeWriter
+class TreePrinter:
+    # "walker" prints with Walker.write_tree, "recursive" with the write_tree methods of the node classes
+    engine = "walker"
+
+    def print_tree(self, *args, **kwargs):
+        out = TreeWriter()
+        write_node(self, out, *args, **kwargs)
+        out.flush()
+
+# writes the tree of node to a TreeWriter with the engine chosen; nodes the walker does not know (arena views)
+# write themselves
+def write_node(node, out, *args, **kwargs):
+    if TreePrinter.engine == "walker":
+        import Walker # imports the node classes, which import this module
+        if type(node) in Walker.CHILDREN:
+            return Walker.write_tree(node, out, *args, **kwargs)
+    node.write_tree(out, *args, **kwargs)
@@ -1,4 +1,5 @@
 from Basic import SyntaxErr
+from TokenKind import VOID, TYPE_NAME_KINDS
 # verifies that the type of a variable is valid
 class Type:
     def __init__(self, token, isvoidallowed = False):
@@ -7,7 +8,7 @@ class Type:
         # only FunctionDecl passes true as third parameter to indicate 'void' type is allowed as a type
         self.isvoidallowed = isvoidallowed
         self.value = token.value 
-        if self.value not in {"int", "string", "bool", "void", "double"}:
+        if token.kind not in TYPE_NAME_KINDS:
             raise Exception(SyntaxErr, self.token)
-        if isvoidallowed == False and self.value == "void":
+        if isvoidallowed == False and token.kind == VOID:
             raise Exception(SyntaxErr, self.token)
@@ -1,13 +1,15 @@
 from Basic import Basic
 from Type import Type
 from Basic import SyntaxErr
+from TokenKind import IDENTIFIER_KINDS
 
 class Variable(Basic, object):
-    def __init__(self, tokens, tokenPosition, isvoidallowed = False):
-        super(Variable, self).__init__(tokens, tokenPosition)
-        self.type = Type(tokens[tokenPosition], isvoidallowed)
-        if tokens[tokenPosition + 1].type == "T_Identifier":
-            self.identifier = tokens[tokenPosition + 1].value
+    def __init__(self, cursor, isvoidallowed = False):
+        super(Variable, self).__init__(cursor)
+        self.type = Type(cursor.advance(), isvoidallowed)
+        token = cursor.advance()
+        if token.kind in IDENTIFIER_KINDS:
+            self.identifier = token.value
         else:
-            raise Exception(SyntaxErr, tokens[tokenPosition + 1])
+            raise Exception(SyntaxErr, token)
 
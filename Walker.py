@@ -0,0 +1,301 @@
+from operator import attrgetter
+from Scanner import Token
+from TokenTable import TokenView
+from Parser import ProgramNode
+from Decl import Decl
+from VariableDecl import VariableDecl
+from FunctionDecl import FunctionDecl
+from Variable import Variable
+from StmtBlock import StmtBlock
+from Stmt import Stmt
+from IfStmt import IfStmt
+from WhileStmt import WhileStmt
+from ForStmt import ForStmt
+from BreakStmt import BreakStmt
+from ReturnStmt import ReturnStmt
+from PrintStmt import PrintStmt
+from Expressions import Expressions
+from ExpressionSubnodes import AssignNode, BinaryExprNode, UnaryExprNode, CallNode, ConstantNode, FieldAccessNode
+
+# Generic traversal of the parse tree with an explicit stack instead of recursion, so that trees of any depth can
+# be walked, and with one table of child accessors (CHILDREN) instead of traversal code in every class.
+#
+# children(node) gives the children of a node in source order as (child, role) pairs; role is the label the tree
+# printer puts in front of the child ("(test) ", "(body) ", ...) or "". The operator token of an assignment,
+# binary or unary expression is a child too, between or before the operands. Tokens and the other leaves have no
+# children. The wrappers (Decl, Stmt, Expressions) are nodes with one child.
+#
+# walk(root, enter, leave, state) visits the tree in preorder. enter and leave map classes to callbacks:
+# enter(node, role, state) runs before the children of node and returns the state they get, leave(node, state)
+# runs after them. Nodes of a class without an enter callback pass their own state on. A wrapper without callbacks
+# is skipped: the node it stands for takes its place and its role.
+#
+# print_tree is built on it: write_tree(node, out, indent, label) writes the same tree as the write_tree methods
+# of the classes, which are kept as the recursive printer (TreePrinter.engine, main.py --printer). Those recurse
+# once per level and fail on deeply nested programs that the iterative parsers accept. Walker(enter, leave,
+# children) can replace the accessors of some classes, which the printer uses for its fast path
+
+# labels of the children that print with one
+TEST, INIT, STEP, BODY, ARGS, ACTUALS = "(test) ", "(init) ", "(step) ", "(body) ", "(args) ", "(actuals) "
+
+# Stmt.stmtType -> attribute holding the statement
+STATEMENT_ATTRIBUTES = {"block": "stmtblock", "if": "ifStmt", "while": "wStmt", "for": "fStmt", "break": "bStmt",
+                        "return": "rStmt", "print": "pStmt", "exp": "exp"}
+
+def _for_children(node):
+    children = [node.stmt]
+    if node.hasLastExp:
+        children.append((node.lastexp, STEP))
+    children.append((node.middleexp, TEST))
+    if node.hasFirstExp:
+        children.append((node.firstexp, INIT))
+    return children
+
+# class -> accessor returning the children of a node last to first, which is the order they go on a stack: a child
+# whose role is "" as it is, any other as a (child, role) pair. Leaves map to None. The accessors of the
+# expression nodes are attrgetters, so that the most common nodes are expanded without running Python code
+CHILDREN = {
+    ProgramNode: lambda node: node.decls[::-1],
+    Decl: lambda node: (node.variableDecl if node.isVariableDecl else node.functionDecl,),
+    VariableDecl: None,
+    FunctionDecl: lambda node: [(node.stmtBlock, BODY), *node.formals[::-1]],
+    Variable: None,
+    StmtBlock: lambda node: node.stmts[::-1] + node.variableDecls[::-1],
+    Stmt: lambda node: (getattr(node, STATEMENT_ATTRIBUTES[node.stmtType]),),
+    IfStmt: lambda node: ((node.elseStmt, node.thenStmt, (node.condition, TEST)) if node.withElse
+                          else (node.thenStmt, (node.condition, TEST))),
+    WhileStmt: lambda node: (node.body, (node.condition, TEST)),
+    ForStmt: _for_children,
+    BreakStmt: None,
+    ReturnStmt: lambda node: ((node.expression, ARGS),) if node.withExpression else (),
+    PrintStmt: lambda node: [(expression, ARGS) for expression in reversed(node.expressions)],
+    Expressions: lambda node: (node.expression_root,),
+    AssignNode: attrgetter("rhs", "operator", "lhs"),
+    BinaryExprNode: attrgetter("rhs", "operator", "lhs"),
+    UnaryExprNode: attrgetter("operand", "operator"),
+    CallNode: lambda node: [(argument, ACTUALS) for argument in reversed(node.arguments)],
+    ConstantNode: None,
+    FieldAccessNode: None,
+}
+
+# the children of a node in source order as (child, role) pairs; role is the label the tree printer puts in front
+# of the child ("(test) ", "(body) ", ...) or "". Operator tokens are children of their expressions
+def children(node):
+    accessor = CHILDREN.get(type(node))
+    if accessor is None:
+        return []
+    return [entry if type(entry) is tuple else (entry, "") for entry in reversed(accessor(node))]
+
+# the node a wrapper stands for
+WRAPPED = {
+    Decl: lambda node: node.variableDecl if node.isVariableDecl else node.functionDecl,
+    Stmt: lambda node: getattr(node, STATEMENT_ATTRIBUTES[node.stmtType]),
+    Expressions: attrgetter("expression_root"),
+}
+
+# roles of the stack entries that are not nodes to enter: the end of the children of a node, and a node to leave
+_END = object()
+_LEAVE = object()
+
+# a walk with fixed callbacks, to run on many trees
+# children maps classes to accessors used instead of the ones in CHILDREN, for a pass whose enter callback handles
+# some of the children itself
+class Walker:
+    def __init__(self, enter, leave = None, children = None):
+        self.leave = leave if leave is not None else {}
+        accessors = {**CHILDREN, **children} if children is not None else CHILDREN
+        # class -> (enter callback, leave callback, child accessor, unwrap) in one lookup per node. A wrapper
+        # without callbacks is passed through without a stack entry of its own: unwrap gives the node it stands for
+        self.dispatch = {}
+        for node_class in {**accessors, **enter, **self.leave}:
+            unwrap = WRAPPED.get(node_class) if node_class not in enter and node_class not in self.leave else None
+            self.dispatch[node_class] = (enter.get(node_class), self.leave.get(node_class), accessors.get(node_class), unwrap)
+
+    def walk(self, root, state = None, role = ""):
+        dispatch = self.dispatch
+        passive = (None, None, None, None)
+        # state is the state of the node being entered; below the children of a node, an _END entry holds the
+        # state to go back to
+        stack = [(root, role)]
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        while stack:
+            node = pop()
+            if type(node) is tuple:
+                node, role = node
+                if type(role) is not str:
+                    if role is _END:
+                        state = node
+                    else:
+                        dispatch[type(node)][1](node, state)
+                    continue
+            else:
+                role = ""
+            entered, left, accessor, unwrap = dispatch.get(type(node), passive)
+            while unwrap is not None:
+                node = unwrap(node)
+                entered, left, accessor, unwrap = dispatch.get(type(node), passive)
+            if left is not None:
+                push((node, _LEAVE))
+            if entered is not None:
+                child_state = entered(node, role, state)
+                if accessor is not None:
+                    nodes = accessor(node)
+                    if nodes:
+                        push((state, _END))
+                        state = child_state
+                        extend(nodes)
+            elif accessor is not None:
+                extend(accessor(node))
+
+def walk(root, enter, leave = None, state = None, role = ""):
+    Walker(enter, leave).walk(root, state, role)
+
+# every node below root (root included) with its depth, in preorder; tokens are skipped
+def iter_nodes(root):
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+        stack.extend((child, depth + 1) for child, _ in reversed(children(node)) if type(child) in CHILDREN)
+
+# The tree printer, driven by walk's enter callbacks; its state is the indent. The wrappers have no callbacks, so
+# the node a wrapper stands for gets the wrapper's role, and with it the label the wrapper was printed with by the
+# recursive printer. The callbacks append finished lines to the TreeWriter's buffer themselves and hand full
+# buffers to the sink at statements
+def _printer(out):
+    lines = out.lines
+    append = lines.append
+    buffer_lines = out.buffer_lines
+    prefixes = out.prefixes
+    get = prefixes.get
+
+    # the prefix of a tree line, made on the first use: "get(key) or prefix(...)" is a dict lookup once it is cached
+    def prefix(line, indent):
+        text = prefixes[(line, indent)] = f"{line} \t" + "\t" * indent
+        return text
+
+    def program(node, role, indent):
+        append("Program:")
+        return indent
+
+    def variable_decl(node, role, indent):
+        line = node.tokens[node.tokenPosition].line
+        variable = node.variable
+        append((get((line, indent)) or prefix(line, indent)) + role + "VarDecl:")
+        inner = get((line, indent + 1)) or prefix(line, indent + 1)
+        append(inner + "Type: " + variable.type.value)
+        append(inner + "Identifier: " + variable.identifier)
+
+    def function_decl(node, role, indent):
+        line = node.tokens[node.tokenPosition].line
+        inner = get((line, indent + 1)) or prefix(line, indent + 1)
+        append((get((line, indent)) or prefix(line, indent)) + "FnDecl:")
+        append(inner + "(return type) Type: " + node.type)
+        append(inner + "Identifier: " + node.identifier)
+        # formals print with the function's line, so they are written here rather than when they are entered
+        if node.formals:
+            formal_prefix = get((line, indent + 2)) or prefix(line, indent + 2)
+            for formal in node.formals:
+                append(inner + "(formals) VarDecl:")
+                append(formal_prefix + "Type: " + formal.type.value)
+                append(formal_prefix + "Identifier: " + formal.identifier)
+        return indent + 1
+
+    def header(text, labelled):
+        def statement(node, role, indent):
+            if len(lines) >= buffer_lines:
+                out.flush()
+            line = node.tokens[node.tokenPosition].line
+            append((get((line, indent)) or prefix(line, indent)) + (role + text if labelled else text))
+            return indent + 1
+        return statement
+
+    def operator(token, role, indent):
+        line = token.line
+        append((get((line, indent)) or prefix(line, indent)) + "Operator: " + token.value)
+
+    # fast path for the most common case: a variable or constant on the left is written with the header of the
+    # binary expression or assignment, followed by the operator and, when it is a leaf too, the right operand.
+    # rest() below gives the walker the children left to walk
+    def operands(text):
+        def expression(node, role, indent):
+            operator = node.operator
+            line = operator.line
+            append((get((line, indent)) or prefix(line, indent)) + role + (text or node.expr_type) + ":")
+            lhs = node.lhs
+            leaf = leaves.get(type(lhs))
+            if leaf is not None:
+                inner = get((line, indent + 1)) or prefix(line, indent + 1)
+                leaf(lhs, "", indent + 1)
+                append(inner + "Operator: " + operator.value)
+                rhs = node.rhs
+                leaf = leaves.get(type(rhs))
+                if leaf is not None:
+                    leaf(rhs, "", indent + 1)
+            return indent + 1
+        return expression
+
+    def unary(node, role, indent):
+        line = node.operator.line
+        append((get((line, indent)) or prefix(line, indent)) + role + node.expr_type + ":")
+        return indent + 1
+
+    def call(node, role, indent):
+        token = node.identifier
+        line = token.line
+        append((get((line, indent)) or prefix(line, indent)) + role + "Call:")
+        append((get((line, indent + 1)) or prefix(line, indent + 1)) + "Identifier: " + token.value)
+        return indent + 1
+
+    def constant(node, role, indent):
+        token = node.token
+        line = token.line
+        append((get((line, indent)) or prefix(line, indent)) + role + token.type[2:] + ": " + token.value)
+
+    def field_access(node, role, indent):
+        token = node.variable
+        line = token.line
+        append((get((line, indent)) or prefix(line, indent)) + role + "FieldAccess:")
+        append((get((line, indent + 1)) or prefix(line, indent + 1)) + "Identifier: " + token.value)
+
+    leaves = {ConstantNode: constant, FieldAccessNode: field_access}
+
+    enter = {
+        ProgramNode: program,
+        VariableDecl: variable_decl,
+        FunctionDecl: function_decl,
+        StmtBlock: header("StmtBlock:", True),
+        IfStmt: header("IfStmt:", False),
+        WhileStmt: header("WhileStmt:", False),
+        ForStmt: header("ForStmt:", True),
+        BreakStmt: header("BreakStmt:", False),
+        ReturnStmt: header("ReturnStmt:", False),
+        PrintStmt: header("PrintStmt:", False),
+        AssignNode: operands("AssignExpr"),
+        BinaryExprNode: operands(""),
+        UnaryExprNode: unary,
+        CallNode: call,
+        ConstantNode: constant,
+        FieldAccessNode: field_access,
+        Token: operator,
+        TokenView: operator,
+    }
+
+    # the children of a binary expression or assignment not written by the fast path
+    binary_children = CHILDREN[BinaryExprNode]
+    def rest(node):
+        if type(node.lhs) not in leaves:
+            return binary_children(node)
+        return () if type(node.rhs) in leaves else (node.rhs,)
+
+    return Walker(enter, children = {AssignNode: rest, BinaryExprNode: rest})
+
+# writes the tree of node the way its write_tree method does. The printer is made once per TreeWriter
+def write_tree(node, out, indent = 0, label = ""):
+    if out.printer is None:
+        out.printer = _printer(out)
+    out.printer.walk(node, indent, label)
+    if len(out.lines) >= out.buffer_lines:
+        out.flush()
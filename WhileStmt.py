@@ -1,24 +1,35 @@
 from Basic import Basic
-from Basic import SyntaxErr
+from TokenKind import LPAREN, RPAREN
 from Expressions import Expressions
 import Stmt as st
 
 class WhileStmt(Basic, object):
-    def __init__(self, tokens, tokenPosition):
-        super(WhileStmt, self).__init__(tokens, tokenPosition)
+    def __init__(self, cursor):
+        super(WhileStmt, self).__init__(cursor)
+        
+        # body of the while statement
+        self.parse_condition(cursor)
+        self.body = st.Stmt(cursor)
+        self.tokenPositionProcessed = self.body.tokenPositionProcessed
+
+    # "(" condition ")" after the while keyword; leaves the cursor at the body
+    def parse_condition(self, cursor):
         # first token is "while", next checking for a '('
-        if tokens[tokenPosition + 1].value != "(":
-            raise Exception(SyntaxErr, tokens[tokenPosition + 1])
+        cursor.advance()
+        cursor.expect(LPAREN)
         
         # condition expression
-        self.condition = Expressions(tokens, tokenPosition + 2)
+        self.condition = Expressions(cursor)
         
         # ) 
-        next_token_position = self.condition.tokenPositionProcessed + 1
-        if tokens[next_token_position].value != ")":
-            raise Exception(SyntaxErr, tokens[next_token_position])
-        
-        # body of the while statement
-        self.body = st.Stmt(tokens, next_token_position + 1)
-        self.tokenPositionProcessed = self.body.tokenPositionProcessed
+        cursor.expect(RPAREN)
+
+    def write_tree(self, out, indent = 0):
+        line = self.tokens[self.tokenPosition].line
+        out.write(line, indent, "WhileStmt:")
+
+        # condition
+        self.condition.write_tree(out, indent + 1, label = "(test) ")
 
+        # body
+        self.body.write_tree(out, indent + 1)
@@ -0,0 +1,71 @@
+import sys
+import pickle
+import argparse
+from Arena import Arena
+from benchmarks.Common import scan, parse, best, retained
+from benchmarks.Generator import SHAPES, generate
+
+# Memory and pickling of the class tree against the arena (Arena.py) for the generated programs. Memory is the
+# traced memory the tree keeps alive, without the scanner's token list, per arena row (the class tree has extra
+# wrapper objects for the same rows); the arena's own token table is included. Pickles are of the whole program
+# and of its first declaration alone, where the class tree drags the whole token list along.
+# python -m benchmarks.AstSize
+
+# (size in bytes, dumps seconds, loads seconds) of pickling value, or None if it is too deep for pickle
+def _pickled(value, repeat):
+    try:
+        dumps_s, data = best(pickle.dumps, value, pickle.HIGHEST_PROTOCOL, repeat = repeat)
+    except RecursionError:
+        return None
+    loads_s, _ = best(pickle.loads, data, repeat = repeat)
+    return len(data), dumps_s, loads_s
+
+def measure(text, repeat = 3):
+    tokens = scan(text)
+    tree_bytes, program_node = retained(parse, tokens)
+    arena_bytes, arena = retained(Arena.from_program, program_node, tokens)
+    convert_s, _ = best(Arena.from_program, program_node, tokens, repeat = repeat)
+    first = arena.root.children[0]
+    return {
+        "rows": len(arena),
+        "tree_bytes_per_node": tree_bytes / len(arena),
+        "arena_bytes_per_node": arena_bytes / len(arena),
+        "convert_s": convert_s,
+        "tree_pickle": _pickled(program_node, repeat),
+        "arena_pickle": _pickled(arena, repeat),
+        "tree_decl_pickle": _pickled(program_node.decls[0], repeat),
+        "arena_decl_pickle": _pickled(arena.subtree(first), repeat),
+    }
+
+def _pickle_text(result):
+    if result is None:
+        return f"{'too deep':>28}"
+    size, dumps_s, loads_s = result
+    return f"{size / 1024:8.0f} KiB {dumps_s * 1000:6.1f}/{loads_s * 1000:6.1f} ms"
+
+def _report(shape, result):
+    print(f"{shape:12} {result['rows']:>7} nodes  memory/node: tree {result['tree_bytes_per_node']:6.0f} B, "
+          f"arena {result['arena_bytes_per_node']:5.0f} B  (convert {result['convert_s'] * 1000:.0f} ms)")
+    print(f"{'':12} pickle dumps/loads  program: tree {_pickle_text(result['tree_pickle'])}  "
+          f"arena {_pickle_text(result['arena_pickle'])}")
+    print(f"{'':12} {'':18} one decl: tree {_pickle_text(result['tree_decl_pickle'])}  "
+          f"arena {_pickle_text(result['arena_decl_pickle'])}", flush = True)
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.AstSize",
+                                         description = "Memory per node and pickling of the class tree against the arena.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--scale", type = float, default = 1.0, help = "multiplies the size of every program")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+    for shape in shapes:
+        size = max(1, round(SHAPES[shape][1] * args.scale))
+        _report(shape, measure(generate(shape, size), args.repeat))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
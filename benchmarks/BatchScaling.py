@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from benchmarks.Generator import SHAPES, generate
+
+# Scaling of batch mode (Batch.py) with the number of workers: a corpus of generated files is parsed by one
+# python main.py run per --jobs value, wall clock including interpreter start, next to one interpreter per file
+# for a sample of the corpus. Every run must print the same output, or the exit status is 1. Workers can only add
+# speed up to the number of CPUs, which is printed first: on one CPU the runs only show the cost of the pool.
+# python -m benchmarks.BatchScaling
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+# files of every shape in turn, each a tenth of the shape's default size with a seed of its own
+def write_corpus(directory, files):
+    shapes = list(SHAPES)
+    for index in range(files):
+        shape = shapes[index % len(shapes)]
+        with open(os.path.join(directory, f"{index:05}.decaf"), "w") as file:
+            file.write(generate(shape, max(1, SHAPES[shape][1] // 10), seed = index))
+
+# (wall-clock seconds, output) of python main.py --no-cache with arguments
+def _run(*arguments):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, MAIN, "--no-cache", *arguments], stdout = subprocess.PIPE, check = False)
+    return time.perf_counter() - start, result.stdout
+
+def main(argv = None):
+    cpus = os.cpu_count() or 1
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.BatchScaling", description = "Times batch mode with 1 to N workers.")
+    arg_parser.add_argument("--files", type = int, default = 200, help = "files in the generated corpus (default: 200)")
+    arg_parser.add_argument("--jobs", type = int, nargs = "+", default = [1, 2, 4, 8], help = "worker counts to time (default: 1 2 4 8)")
+    arg_parser.add_argument("--per-file", type = int, default = 20, help = "files run with an interpreter each, 0 to skip (default: 20)")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    print(f"{cpus} CPU{'s' if cpus != 1 else ''}{', workers beyond one cannot add speed' if cpus == 1 else ''}", flush = True)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(directory, args.files)
+        size = sum(os.path.getsize(entry.path) for entry in os.scandir(directory))
+        print(f"{args.files} files, {size / 1024 / 1024:.1f} MiB", flush = True)
+        if args.per_file:
+            paths = sorted(entry.path for entry in os.scandir(directory))[:args.per_file]
+            seconds = sum(_run(path)[0] for path in paths)
+            print(f"one interpreter per file  {seconds / len(paths) * args.files:7.2f} s (extrapolated from {len(paths)} files)", flush = True)
+        expected = None
+        single = None
+        for jobs in args.jobs:
+            runs = [_run("--jobs", str(jobs), directory) for _ in range(args.repeat)]
+            seconds = min(elapsed for elapsed, _ in runs)
+            single = seconds if single is None else single
+            expected = runs[0][1] if expected is None else expected
+            same = all(output == expected for _, output in runs)
+            failed |= not same
+            print(f"batch --jobs {jobs:<3}          {seconds:7.2f} s  speedup over --jobs {args.jobs[0]} {single / seconds:4.2f}x"
+                  f"{'' if same else '  DIFFERENT OUTPUT'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
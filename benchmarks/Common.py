@@ -0,0 +1,87 @@
+import gc
+import io
+import re
+import time
+import tracemalloc
+from Scanner import Scanner
+from Parser import iterDecls, ProgramNode
+from TreeWriter import TreeWriter
+from Walker import write_tree
+
+# Helpers shared by the benchmarks and the tests: scanning and parsing a program the way main.py does, the text
+# of its tree, best-of timings, retained memory and random edits. Timings are in process CPU time with a
+# collection before each run, so that other load on the machine and garbage left by earlier runs do not count
+
+def scan(text):
+    scanner = Scanner(text)
+    scanner.tokenize()
+    return scanner.tokens
+
+def parse(tokens):
+    program_node = ProgramNode()
+    program_node.decls.extend(iterDecls(tokens))
+    return program_node
+
+# the tree of every declaration, printed with the walker
+def tree_text(decls):
+    sink = io.StringIO()
+    out = TreeWriter(sink)
+    for decl in decls:
+        write_tree(decl, out)
+    out.flush()
+    return sink.getvalue()
+
+# (best time, result) of repeat calls of function(*arguments)
+def best(function, *arguments, repeat = 3):
+    best_s = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.process_time()
+        result = function(*arguments)
+        elapsed = time.process_time() - start
+        best_s = elapsed if best_s is None else min(best_s, elapsed)
+    return best_s, result
+
+# name -> best time of every function of functions (a dict) on the same arguments, interleaved so that a slow
+# stretch of the machine hits all of them alike
+def best_of(functions, *arguments, repeat = 3):
+    best_s = dict.fromkeys(functions)
+    for _ in range(repeat):
+        for name, function in functions.items():
+            gc.collect()
+            start = time.process_time()
+            function(*arguments)
+            elapsed = time.process_time() - start
+            best_s[name] = elapsed if best_s[name] is None else min(best_s[name], elapsed)
+    return best_s
+
+# a decimal literal, not part of a hex or double constant or of a name
+NUMBER = re.compile(r"(?<![\w.])\d+\b(?!\.)")
+
+# count (start, end, replacement) edits of text within one line, drawn from rng and applied in turn; returns
+# them and the edited text. Most change the last digit of a number, the others insert an empty line, which moves
+# every later line; neither makes a valid program invalid
+def line_edits(text, count, rng):
+    edits = []
+    for _ in range(count):
+        number = NUMBER.search(text, rng.randrange(len(text))) if rng.randrange(4) else None
+        if number is not None:
+            edit = (number.end() - 1, number.end(), rng.choice("123456789"))
+        else:
+            start = text.find("\n", rng.randrange(len(text))) + 1
+            edit = (start, start, "\n")
+        edits.append(edit)
+        text = text[:edit[0]] + edit[2] + text[edit[1]:]
+    return edits, text
+
+# (traced memory still held after function(*arguments) returns, its result)
+def retained(function, *arguments):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function(*arguments)
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,83 @@
+import sys
+import argparse
+from TokenKind import EOF
+from TokenCursor import TokenCursor
+from Parser import iterDecls
+from StmtBlock import StmtBlock
+from Expressions import Expressions
+from benchmarks.Common import scan, best_of
+from benchmarks.Generator import SHAPES, generate
+
+# Reading tokens through TokenCursor.py. First the cost of one read over every token of the generated programs:
+# indexing guarded by a length check, as the parser classes did before the cursor, the cursor's peek and
+# advance, and the unchecked reads of the expression loop, which leave the end of the tokens to an IndexError.
+# Then the parse time of the shapes with every engine. tests/test_cursor.py parses truncated inputs.
+# python -m benchmarks.Cursor
+
+ENGINES = {"iterative/precedence": ("iterative", "precedence"), "recursive/recursive": ("recursive", "recursive")}
+
+def _guarded(tokens):
+    position = 0
+    while (tokens[position] if position < len(tokens) else None) is not None:
+        position += 1
+
+def _peek(tokens):
+    cursor = TokenCursor(tokens)
+    peek = cursor.peek
+    while peek().kind != EOF:
+        cursor.position += 1
+
+def _advance(tokens):
+    advance = TokenCursor(tokens).advance
+    while advance().kind != EOF:
+        pass
+
+def _unchecked(tokens):
+    position = 0
+    try:
+        while True:
+            tokens[position]
+            position += 1
+    except IndexError:
+        pass
+
+READS = {"guarded index": _guarded, "peek": _peek, "advance": _advance, "unchecked index": _unchecked}
+
+def _parse(tokens):
+    for _ in iterDecls(tokens):
+        pass
+
+def _set_engines(stmt_engine, expr_engine):
+    StmtBlock.engine = stmt_engine
+    Expressions.engine = expr_engine
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Cursor", description = "Times token reads through the cursor and parsing with every engine.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--repeat", type = int, default = 5, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+
+    for shape in shapes:
+        tokens = scan(generate(shape))
+        best = best_of(READS, tokens, repeat = args.repeat)
+        print(f"{shape:12} reads " + "  ".join(f"{name} {seconds / len(tokens) * 1e9:5.1f} ns" for name, seconds in best.items()), flush = True)
+    for shape in shapes:
+        tokens = scan(generate(shape))
+        times = []
+        for name, engine in ENGINES.items():
+            _set_engines(*engine)
+            try:
+                times.append(f"{name} {best_of({name: _parse}, tokens, repeat = args.repeat)[name] * 1000:7.1f} ms")
+            except RecursionError:
+                times.append(f"{name} RecursionError")
+        _set_engines(*ENGINES["iterative/precedence"])
+        print(f"{shape:12} parse " + "  ".join(times), flush = True)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
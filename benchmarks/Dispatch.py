@@ -0,0 +1,71 @@
+import sys
+import argparse
+from Stmt import Stmt, STATEMENTS
+from Walker import iter_nodes
+from benchmarks.Common import scan, parse, best_of
+from benchmarks.Generator import SHAPES, generate
+
+# Statement dispatch: the STATEMENTS table of Stmt.py, one dict lookup on the integer TokenKind, against the chain
+# of lowercased type comparisons Stmt used before, on the first token of every statement of the generated
+# programs. Both must pick the same statement for every token, which is checked; a difference makes the exit
+# status 1. Times are per call, the call itself included.
+# python -m benchmarks.Dispatch
+
+# the dispatch as it was: stmtType of the statement starting with token
+def if_chain(token):
+    if token.value == "{":
+        return "block"
+    elif token.type.lower() == "T_If".lower():
+        return "if"
+    elif token.type.lower() == "T_While".lower():
+        return "while"
+    elif token.type.lower() == "T_For".lower():
+        return "for"
+    elif token.type.lower() == "T_Break".lower():
+        return "break"
+    elif token.type.lower() == "T_Return".lower():
+        return "return"
+    elif token.type.lower() == "T_Print".lower():
+        return "print"
+    elif token.type.lower() == "T_Else".lower():
+        return "else"
+    return "exp"
+
+EXP_ENTRY = (None, "exp", None)
+
+# the dispatch of Stmt; a statement never starts with 'else' in a valid program
+def table(token):
+    return STATEMENTS.get(token.kind, EXP_ENTRY)[1]
+
+def _dispatch_all(dispatch, tokens):
+    for token in tokens:
+        dispatch(token)
+
+RUNS = {"if chain": lambda tokens: _dispatch_all(if_chain, tokens), "table": lambda tokens: _dispatch_all(table, tokens)}
+
+# the first token of every statement of the program
+def statement_tokens(program_node):
+    return [node.tokens[node.tokenPosition] for node, _ in iter_nodes(program_node) if type(node) is Stmt]
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Dispatch", description = "Times statement dispatch on the token kind against the old if chain.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--repeat", type = int, default = 5, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+    failed = False
+    for shape in shapes:
+        tokens = statement_tokens(parse(scan(generate(shape))))
+        same = [if_chain(token) for token in tokens] == [table(token) for token in tokens]
+        failed |= not same
+        best = best_of(RUNS, tokens, repeat = args.repeat)
+        print(f"{shape:12} {len(tokens):>7} statements  " + "  ".join(f"{name} {seconds / len(tokens) * 1e9:5.0f} ns"
+                                                                     for name, seconds in best.items())
+              + ("" if same else "  DIFFERENT STATEMENTS"), flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
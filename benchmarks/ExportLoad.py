@@ -0,0 +1,56 @@
+import io
+import os
+import sys
+import argparse
+import tempfile
+import Export
+from benchmarks.Common import scan, parse, tree_text, best
+from benchmarks.Generator import SHAPES, generate
+
+# Size and speed of the AST exports (Export.py) on the generated programs: the bytes of the text tree, the jsonl
+# and the binary export, the time to write each export, and the time to load each back with Export.load against
+# reparsing the source. Every loaded tree must print like the parsed one, or the exit status is 1.
+# python -m benchmarks.ExportLoad
+
+def _export(program_node, format):
+    sink = io.StringIO() if format == "jsonl" else io.BytesIO()
+    Export.export(program_node, sink, format)
+    value = sink.getvalue()
+    return value.encode() if format == "jsonl" else value
+
+def _reparse(text):
+    return parse(scan(text))
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.ExportLoad", description = "Compares the size and load time of the AST exports with reparsing.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in shapes:
+            text = generate(shape)
+            program_node = parse(scan(text))
+            expected = tree_text(program_node.decls)
+            reparse_s, _ = best(_reparse, text, repeat = args.repeat)
+            print(f"{shape:12} source {len(text) / 1024:7.0f} KiB  tree {len(expected.encode()) / 1024:7.0f} KiB"
+                  f"  reparse {reparse_s * 1000:7.1f} ms", flush = True)
+            for format in Export.WRITERS:
+                export_s, data = best(_export, program_node, format, repeat = args.repeat)
+                path = os.path.join(directory, f"{shape}.{format}")
+                with open(path, 'wb') as file:
+                    file.write(data)
+                load_s, loaded = best(Export.load, path, repeat = args.repeat)
+                same = tree_text(loaded.decls) == expected
+                failed |= not same
+                print(f"  {format:10} {len(data) / 1024:7.0f} KiB  export {export_s * 1000:7.1f} ms  load {load_s * 1000:7.1f} ms"
+                      f"  speedup over reparsing {reparse_s / load_s:4.1f}x  {'same tree' if same else 'DIFFERENT TREE'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
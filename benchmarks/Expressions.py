@@ -0,0 +1,60 @@
+import sys
+import argparse
+from Parser import iterDecls
+from Expressions import Expressions
+from benchmarks.Common import scan, tree_text, best_of
+from benchmarks.Generator import SHAPES, generate, operator_chain
+
+# Compares the expression engines of Expressions.py, the precedence engine against the recursive descent
+# methods, with the statement engine left as it is. On every generated shape both must print the same tree, and
+# their parse times are compared; then a single operator chain of --terms terms is parsed, which the precedence
+# engine must manage where the recursive one runs out of recursion. Any failure makes the exit status 1.
+# tests/test_expressions.py checks the same trees on random expressions.
+# python -m benchmarks.Expressions
+
+ENGINES = ("precedence", "recursive")
+
+def _parse(tokens, engine):
+    Expressions.engine = engine
+    try:
+        return list(iterDecls(tokens))
+    finally:
+        Expressions.engine = "precedence"
+
+# engine -> parse with it, to time
+RUNS = {engine: (lambda tokens, engine = engine: _parse(tokens, engine)) for engine in ENGINES}
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Expressions", description = "Compares the precedence and recursive expression engines.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--terms", type = int, default = 100000, help = "terms of the long operator chain (default: 100000)")
+    arg_parser.add_argument("--repeat", type = int, default = 5, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+
+    failed = False
+    for shape in shapes:
+        tokens = scan(generate(shape))
+        same = tree_text(_parse(tokens, "precedence")) == tree_text(_parse(tokens, "recursive"))
+        failed |= not same
+        best = best_of(RUNS, tokens, repeat = args.repeat)
+        print(f"{shape:12} precedence {best['precedence'] * 1000:7.1f} ms  recursive {best['recursive'] * 1000:7.1f} ms"
+              f"  ({best['recursive'] / best['precedence']:4.2f}x)  {'same tree' if same else 'DIFFERENT TREES'}", flush = True)
+
+    tokens = scan(operator_chain(args.terms))
+    results = []
+    for engine in ENGINES:
+        try:
+            _parse(tokens, engine)
+            results.append(f"{engine} parses")
+        except RecursionError:
+            results.append(f"{engine} RecursionError")
+            failed |= engine == "precedence"
+    print(f"{args.terms} term chain: " + "  ".join(results), flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
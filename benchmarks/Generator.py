@@ -0,0 +1,122 @@
+import random
+
+# Synthetic Decaf programs for the benchmarks. Every shape is valid Decaf that the parser accepts and leans on
+# one part of it; size scales a program about linearly and seed makes it reproducible
+
+# the parser has no unary minus and no '!=', so neither is generated
+BINARY_OPERATORS = ["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "&&", "||"]
+
+def _function(name, body, out):
+    out.append(f"int {name}(int a, bool b) {{\n  int x;\n  int y;\n  string s;\n")
+    out.extend(body)
+    out.append("  return x;\n}\n")
+
+def _operand(rng):
+    choice = rng.randrange(5)
+    if choice == 0:
+        return str(rng.randrange(1000))
+    if choice == 1:
+        return f"0x{rng.randrange(4096):X}"
+    if choice == 2:
+        return rng.choice(["a", "x", "y"])
+    if choice == 3:
+        return "!b" if rng.random() < .5 else "!(x < a)"
+    return f"(a + {rng.randrange(100)})"
+
+# many small functions mixing every statement kind
+def functions(size, rng):
+    out = ["int g;\n"]
+    for index in range(size):
+        body = []
+        for _ in range(4):
+            body.append(f"  x = a + {rng.randrange(1000)} * (x - 0x{rng.randrange(256):X}) / 3;\n")
+            body.append(f"  if (x <= a && b) {{ Print(\"x is\", x, s); }} else x = f{index}(x, !b);\n")
+            body.append("  for (y = 0; y < 10; y = y + 1) s = \"abc\";\n")
+            body.append("  while (x > a) { x = x - 1; if (x == 3) break; }\n")
+        _function(f"f{index}", body, out)
+    return "".join(out)
+
+# long binary operator chains
+def expressions(size, rng, length = 200):
+    out = []
+    for index in range(0, size, 10):
+        body = []
+        for _ in range(min(10, size - index)):
+            operands = [_operand(rng) for _ in range(length)]
+            chain = operands[0]
+            for operand in operands[1:]:
+                chain += f" {rng.choice(BINARY_OPERATORS)} {operand}"
+            body.append(f"  x = {chain};\n")
+        _function(f"e{index}", body, out)
+    return "".join(out)
+
+# deeply nested statements and parentheses
+def nesting(size, rng, depth = 60, parentheses = 8):
+    out = []
+    for index in range(size):
+        body = []
+        for level in range(depth):
+            indent = "  " * (level + 1)
+            body.append(indent + rng.choice(["if (x < a) {\n", "while (b) {\n", "for (y = 0; y < a; y = y + 1) {\n", "{\n"]))
+            nested = level % parentheses
+            body.append(f"{indent}  x = {'(' * nested}x + {level}{')' * nested};\n")
+        for level in reversed(range(depth)):
+            body.append("  " * (level + 1) + "}\n")
+        _function(f"n{index}", body, out)
+    return "".join(out)
+
+# long string literals
+def strings(size, rng, length = 2000):
+    out = []
+    letters = "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    for index in range(0, size, 10):
+        body = []
+        for _ in range(min(10, size - index)):
+            text = "".join(rng.choice(letters) for _ in range(length))
+            body.append(f"  s = \"{text}\\n\";\n")
+        _function(f"s{index}", body, out)
+    return "".join(out)
+
+# Print with wide argument lists
+def prints(size, rng, width = 100):
+    out = []
+    for index in range(0, size, 10):
+        body = []
+        for _ in range(min(10, size - index)):
+            arguments = ", ".join(rng.choice(["x", "a", "s", "\"-\"", str(rng.randrange(100)), "x + 1"]) for _ in range(width))
+            body.append(f"  Print({arguments});\n")
+        _function(f"p{index}", body, out)
+    return "".join(out)
+
+# shape -> (generator, default size); the defaults give programs of roughly 50k tokens, long strings excepted
+SHAPES = {
+    "functions": (functions, 140),
+    "expressions": (expressions, 75),
+    "nesting": (nesting, 40),
+    "strings": (strings, 1000),
+    "prints": (prints, 210),
+}
+
+def generate(shape, size = None, seed = 0):
+    generator, default_size = SHAPES[shape]
+    return generator(default_size if size is None else size, random.Random(seed))
+
+# Programs nested deeper than the recursion limit, for the iterative engines: depth levels of the same statement
+# or operator, with no randomness
+
+def nested_blocks(depth):
+    return "void main() {\n" + "{\n" * depth + "Print(1);\n" + "}\n" * depth + "}\n"
+
+def else_if_ladder(depth):
+    return "void main() {\nint x;\n" + "".join(f"if (x == {index}) Print({index});\nelse " for index in range(depth)) + "Print(0);\n}\n"
+
+# if, while and for nested in turn
+def mixed_nesting(depth):
+    heads = ["if (x < 3) {\n", "while (x > 0) {\n", "for (x = 0; x < 2; x = x + 1) {\n"]
+    return "void main() {\nint x;\n" + "".join(heads[index % 3] for index in range(depth)) + "x = x - 1;\n" + "}\n" * depth + "}\n"
+
+def operator_chain(terms):
+    return "int x;\nvoid main() {\nx = " + " + ".join(["1"] * terms) + ";\nPrint(x);\n}\n"
+
+# name -> generator of the deep programs
+DEEP = {"nested blocks": nested_blocks, "else-if ladder": else_if_ladder, "mixed if/while/for": mixed_nesting}
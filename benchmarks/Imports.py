@@ -0,0 +1,69 @@
+import os
+import re
+import sys
+import argparse
+import tempfile
+import subprocess
+from benchmarks.Generator import generate
+
+# Import time of a cold run, measured with python -X importtime and checked against a budget. A --tokens run and a
+# full parse are measured separately; the exit status is 1 if either goes over the budget or if the --tokens run
+# loads any of the parser modules, which main.py only imports when it parses. The time is the sum of the
+# cumulative times of the top-level imports, interpreter startup included, the lowest of several runs.
+# python -m benchmarks.Imports
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# milliseconds; about twice what a run takes on a slow machine, so that only a real regression trips it
+DEFAULT_BUDGET_MS = 100
+
+PARSER_MODULES = {"Parser", "Decl", "VariableDecl", "FunctionDecl", "Variable", "Type", "StmtBlock", "Stmt", "IfStmt",
+                  "WhileStmt", "ForStmt", "BreakStmt", "ReturnStmt", "PrintStmt", "Expressions", "ExpressionSubnodes",
+                  "Recovery", "Export", "Walker", "Symbols", "Compiler",
+                  "Optimizer", "TokenCursor"}
+
+# "import time: self [us] | cumulative | imported package", nested imports are indented
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+# (total import time in microseconds, names of the modules imported) of one run
+def import_time(options, path):
+    run = subprocess.run([sys.executable, "-X", "importtime", MAIN, "--no-cache", *options, path],
+                         stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, text = True)
+    total = 0
+    imported = set()
+    for line in run.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imported.add(match.group(4))
+            if not match.group(3):
+                total += int(match.group(2))
+    return total, imported
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Imports",
+                                         description = "Checks the import time of cold runs against a budget.")
+    arg_parser.add_argument("--budget", type = float, default = DEFAULT_BUDGET_MS,
+                            help = f"import time allowed per run in milliseconds (default: {DEFAULT_BUDGET_MS})")
+    arg_parser.add_argument("--repeat", type = int, default = 5, help = "runs of each kind; the fastest one counts")
+    args = arg_parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "functions.decaf")
+        with open(path, "w") as file:
+            file.write(generate("functions", 1))
+        for name, options in (("tokens", ["--tokens"]), ("parse", [])):
+            runs = [import_time(options, path) for _ in range(args.repeat)]
+            total = min(total for total, _ in runs) / 1000
+            over = total > args.budget
+            print(f"{name:<8} imports {total:6.1f} ms  budget {args.budget:.0f} ms{'  OVER BUDGET' if over else ''}")
+            failed |= over
+            if name == "tokens":
+                parser_modules = sorted(PARSER_MODULES & runs[0][1])
+                if parser_modules:
+                    print(f"the --tokens run imports parser modules: {', '.join(parser_modules)}")
+                    failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import Index
+from benchmarks.Generator import generate
+
+# The cross-file index (Index.py) on a generated corpus of small files: a full build, a rebuild with nothing
+# changed, a rebuild after editing a few files, and the time of defs and refs queries against the finished index.
+# Every file declares f0, f1, ... and the global g, so most queries return rows from every file; the edited files
+# declare added as well.
+# python -m benchmarks.Indexing
+
+def write_corpus(directory, files, size):
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"file{index}.decaf")
+        with open(path, "w") as file:
+            file.write(generate("functions", size, seed = index))
+        paths.append(path)
+    return paths
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+# best time of a query, repeated
+def _query(function, repeat, *args):
+    best = None
+    for _ in range(repeat):
+        elapsed, rows = _timed(function, *args)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(rows)
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Indexing", description = "Times building and querying the cross-file index.")
+    arg_parser.add_argument("--files", type = int, default = 10000, help = "files in the corpus (default: 10000)")
+    arg_parser.add_argument("--size", type = int, default = 1, help = "functions per file (default: 1)")
+    arg_parser.add_argument("--edits", type = int, default = 100, help = "files changed before the incremental rebuild")
+    arg_parser.add_argument("--jobs", type = int, default = os.cpu_count() or 1, help = "worker processes of the builds")
+    arg_parser.add_argument("--repeat", type = int, default = 20, help = "runs of each query; the best one counts")
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, "corpus")
+        os.mkdir(corpus)
+        paths = write_corpus(corpus, args.files, args.size)
+        database = os.path.join(directory, "index.sqlite")
+        connection = Index.connect(database)
+        try:
+            for name in ("full build", "no changes"):
+                elapsed, counts = _timed(Index.build, connection, [corpus], args.jobs)
+                print(f"{name:<16} {elapsed:8.2f} s  {counts[0]} indexed, {counts[1]} unchanged", flush = True)
+            for path in paths[:args.edits]:
+                with open(path, "a") as file:
+                    file.write("int added;\n")
+            elapsed, counts = _timed(Index.build, connection, [corpus], args.jobs)
+            print(f"{f'{args.edits} edited':<16} {elapsed:8.2f} s  {counts[0]} indexed, {counts[1]} unchanged")
+            print(f"index size       {os.path.getsize(database) / (1 << 20):8.1f} MiB")
+            for name, function, query in (("defs g", Index.definitions, ("g",)), ("defs added", Index.definitions, ("added",)),
+                                          ("refs f0", Index.references, ("f0",)),
+                                          ("refs --calls f0", Index.references, ("f0", True)),
+                                          ("refs missing", Index.references, ("missing",))):
+                best, rows = _query(function, args.repeat, connection, *query)
+                print(f"{name:<16} {best * 1000:8.2f} ms  {rows} rows")
+        finally:
+            connection.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
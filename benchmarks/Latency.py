@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+from Server import Client
+from benchmarks.Generator import generate
+
+# Latency of one parse request: a cold run of python main.py per file, which pays interpreter startup and the
+# imports every time, against a request to a warm parse server (main.py --serve) started once. Both parse the same
+# generated program with the cache off and print the same tree; wall time is measured, so run it on a quiet
+# machine. python -m benchmarks.Latency
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+def _cold(path, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN, "--no-cache", path], stdout = subprocess.DEVNULL, check = True)
+        times.append(time.perf_counter() - start)
+    return times
+
+def _warm(path, runs, text):
+    times = []
+    with Client.spawn(["--no-cache", "--jobs", "1"], MAIN) as client:
+        client.ping() # the server is up and has imported everything
+        for _ in range(runs):
+            start = time.perf_counter()
+            if text:
+                response = client.parse_text(open(path).read())
+            else:
+                response = client.parse_path(path)
+            times.append(time.perf_counter() - start)
+            if response["status"] != "ok":
+                raise RuntimeError(f"the parse server answered {response}")
+        client.shutdown()
+    return times
+
+def _percentile(times, fraction):
+    ordered = sorted(times)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _report(name, times):
+    print(f"{name:<12} median {median(times) * 1000:8.1f} ms  p90 {_percentile(times, 0.9) * 1000:8.1f} ms"
+          f"  min {min(times) * 1000:8.1f} ms  ({len(times)} runs)")
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Latency",
+                                         description = "Latency of cold command line runs against warm parse server requests.")
+    arg_parser.add_argument("--shape", default = "functions", help = "shape of the generated program (default: functions)")
+    arg_parser.add_argument("--size", type = int, default = 5, help = "size of the generated program; small by default, as for an editor")
+    arg_parser.add_argument("--runs", type = int, default = 20, help = "requests of each kind")
+    arg_parser.add_argument("--text", action = "store_true", help = "send the source text in the requests instead of the path")
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"{args.shape}.decaf")
+        with open(path, "w") as file:
+            file.write(generate(args.shape, args.size))
+        cold = _cold(path, args.runs)
+        warm = _warm(path, args.runs, args.text)
+    _report("cold cli", cold)
+    _report("warm server", warm)
+    print(f"speedup {median(cold) / median(warm):.1f}x (medians)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
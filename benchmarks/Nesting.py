@@ -0,0 +1,65 @@
+import sys
+import time
+import argparse
+from Parser import iterDecls
+from StmtBlock import StmtBlock
+from Walker import iter_nodes
+from benchmarks.Common import scan, tree_text, best_of
+from benchmarks.Generator import DEEP
+
+# Stress test of the statement parsers (parse_block in Stmt.py against the recursive StmtBlock/Stmt methods) on
+# deeply nested statements: nested blocks, an else-if ladder and if/while/for nested in turn. At --depth (10000
+# by default) the iterative engine must parse every program and give a tree that deep, where the recursive one
+# runs out of recursion. At --compare-depth, which the recursive engine manages, both must print the same tree,
+# and their parse times are compared. Any failure makes the exit status 1.
+# python -m benchmarks.Nesting
+
+ENGINES = ("iterative", "recursive")
+
+def _parse(tokens, engine):
+    StmtBlock.engine = engine
+    try:
+        return list(iterDecls(tokens))
+    finally:
+        StmtBlock.engine = "iterative"
+
+# engine -> parse with it, to time
+RUNS = {engine: (lambda tokens, engine = engine: _parse(tokens, engine)) for engine in ENGINES}
+
+def _depth(decls):
+    return max(depth for decl in decls for _, depth in iter_nodes(decl))
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Nesting", description = "Parses deeply nested statements with both statement engines.")
+    arg_parser.add_argument("--depth", type = int, default = 10000, help = "nesting of the stress programs (default: 10000)")
+    arg_parser.add_argument("--compare-depth", type = int, default = 100, help = "nesting at which both engines are timed (default: 100)")
+    arg_parser.add_argument("--repeat", type = int, default = 5, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    failed = False
+    for name, program in DEEP.items():
+        tokens = scan(program(args.depth))
+        start = time.perf_counter()
+        decls = _parse(tokens, "iterative")
+        elapsed = time.perf_counter() - start
+        depth = _depth(decls)
+        # every level adds at least one node
+        ok = depth >= args.depth
+        failed |= not ok
+        try:
+            _parse(tokens, "recursive")
+            recursive = "parses"
+        except RecursionError:
+            recursive = "RecursionError"
+        print(f"{name:18} depth {args.depth}: iterative {elapsed * 1000:8.1f} ms, tree depth {depth}{'' if ok else ' FAILED'}"
+              f"  recursive {recursive}", flush = True)
+
+        tokens = scan(program(args.compare_depth))
+        same = tree_text(_parse(tokens, "iterative")) == tree_text(_parse(tokens, "recursive"))
+        failed |= not same
+        best = best_of(RUNS, tokens, repeat = args.repeat)
+        print(f"{name:18} depth {args.compare_depth}: iterative {best['iterative'] * 1000:8.2f} ms  recursive {best['recursive'] * 1000:8.2f} ms"
+              f"  {'same tree' if same else 'DIFFERENT TREES'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
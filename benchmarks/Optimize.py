@@ -0,0 +1,67 @@
+import gc
+import sys
+import time
+import argparse
+from Expressions import Expressions
+from TreeWriter import TreeWriter, NullSink
+from Optimizer import optimize
+from benchmarks.Common import scan, parse, best_of
+from benchmarks.Generator import SHAPES, generate
+
+# Constant folding and dead-branch elimination (Optimizer.py) on the generated programs: the nodes the pass
+# eliminates, the time it takes, and the time of printing the tree before and after it. The shapes only have
+# constants where they happen to meet, so last comes a program like the generated code the pass is meant for,
+# with constant guards around its statements and constant arguments in its calls.
+# python -m benchmarks.Optimize
+
+def guards(size):
+    out = ["int f(int n, bool b) {\n  if (b && n > 0x10) return n * (60 * 60);\n  return n;\n}\n\nvoid main() {\n  int x;\n"]
+    for index in range(size):
+        out.append(f"  if (true) x = f({index} + 1, true && false);\n")
+        out.append(f"  if ({index % 3} == 0 || false) {{ x = x + 2 * 0x20; }} else {{ Print(\"skipped\", x); }}\n")
+        out.append(f"  while (false) x = f(x, !true);\n")
+        out.append(f"  Print(\"step\", {index} * 4 / 3, !(x < 24 * 60));\n")
+    out.append("}\n")
+    return "".join(out)
+
+def _print(program_node):
+    out = TreeWriter(NullSink())
+    program_node.write_tree(out)
+    out.flush()
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Optimize", description = "Measures what constant folding and dead-branch elimination save.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--guards", type = int, default = 1000, help = "statement groups of the guarded program (default: 1000)")
+    arg_parser.add_argument("--repeat", type = int, default = 5, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+    # programs are parsed the way --optimize requires
+    Expressions.left_associative = True
+    programs = [(shape, lambda shape = shape: generate(shape)) for shape in shapes]
+    programs.append(("guards", lambda: guards(args.guards)))
+    for name, source in programs:
+        text = source()
+        # every timed pass needs a tree of its own
+        trees = [parse(scan(text)) for _ in range(args.repeat)]
+        counts = []
+        optimize_s = None
+        for tree in trees:
+            gc.collect()
+            start = time.process_time()
+            counts.append(optimize(tree))
+            elapsed = time.process_time() - start
+            optimize_s = elapsed if optimize_s is None else min(optimize_s, elapsed)
+        original = parse(scan(text))
+        print_times = best_of({"before": lambda: _print(original), "after": lambda: _print(trees[0])}, repeat = args.repeat)
+        print_before, print_after = print_times["before"], print_times["after"]
+        before, after = counts[0]
+        print(f"{name:<12} nodes {before:7} -> {after:7} ({(before - after) / before:6.1%} fewer)  optimize {optimize_s * 1000:7.1f} ms"
+              f"  print {print_before * 1000:7.1f} -> {print_after * 1000:7.1f} ms", flush = True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import gc
+import io
+import os
+import sys
+import time
+import argparse
+import subprocess
+from TreeWriter import TreeWriter
+from Walker import iter_nodes, write_tree
+from benchmarks.Common import scan, parse
+from benchmarks.Generator import SHAPES, generate
+
+# Wall-clock time of printing the tree of the generated programs, scaled to over 100k nodes by default, to
+# /dev/null and to a pipe read by another process, the two places a CI run sends it. Compared: one print() per
+# tree line with its prefix rebuilt every time, as every print_tree did before TreeWriter, the TreeWriter with
+# the recursive write_tree methods, and the TreeWriter with the walker, the default. All three must print the
+# same text, or the exit status is 1.
+# python -m benchmarks.Output
+
+# the old output path: print() per line, the "<line> \t" + tabs prefix built for every line
+class PrintWriter(TreeWriter):
+    def write(self, line, indent, text):
+        print(f"{line} \t" + "\t" * indent + text, file = self.sink)
+
+    def write_line(self, text):
+        print(text, file = self.sink)
+
+def _print_per_line(program_node, sink):
+    program_node.write_tree(PrintWriter(sink))
+
+def _recursive(program_node, sink):
+    out = TreeWriter(sink)
+    program_node.write_tree(out)
+    out.flush()
+
+def _walker(program_node, sink):
+    out = TreeWriter(sink)
+    write_tree(program_node, out)
+    out.flush()
+
+PRINTERS = {"print() per line": _print_per_line, "TreeWriter recursive": _recursive, "TreeWriter walker": _walker}
+
+# (open text sink, closes it)
+def _devnull():
+    sink = open(os.devnull, "w")
+    return sink, sink.close
+
+def _pipe():
+    reader = subprocess.Popen(["cat"], stdin = subprocess.PIPE, stdout = subprocess.DEVNULL, text = True)
+    def close():
+        reader.stdin.close()
+        reader.wait()
+    return reader.stdin, close
+
+SINKS = {"/dev/null": _devnull, "pipe": _pipe}
+
+# best wall-clock time of printer over repeat runs, each into a fresh sink
+def _best_wall(printer, program_node, open_sink, repeat):
+    best_s = None
+    for _ in range(repeat):
+        sink, close = open_sink()
+        try:
+            gc.collect()
+            start = time.perf_counter()
+            printer(program_node, sink)
+            sink.flush()
+            elapsed = time.perf_counter() - start
+        finally:
+            close()
+        best_s = elapsed if best_s is None else min(best_s, elapsed)
+    return best_s
+
+def _text(printer, program_node):
+    sink = io.StringIO()
+    printer(program_node, sink)
+    return sink.getvalue()
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Output", description = "Times printing the tree per line with print() and through TreeWriter.")
+    arg_parser.add_argument("--shapes", default = "functions,expressions,prints", help = f"comma separated shapes (default: functions,expressions,prints; any of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--scale", type = float, default = 2.5, help = "size of the generated programs, times their default size (default: 2.5)")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+
+    failed = False
+    for shape in shapes:
+        program_node = parse(scan(generate(shape, max(1, int(SHAPES[shape][1] * args.scale)))))
+        nodes = sum(1 for _ in iter_nodes(program_node))
+        texts = [_text(printer, program_node) for printer in PRINTERS.values()]
+        same = len(set(texts)) == 1
+        failed |= not same
+        print(f"{shape}: {nodes} nodes, {len(texts[0]) / 1024 / 1024:.1f} MiB of tree{'' if same else '  DIFFERENT OUTPUT'}", flush = True)
+        for sink, open_sink in SINKS.items():
+            times = {name: _best_wall(printer, program_node, open_sink, args.repeat) for name, printer in PRINTERS.items()}
+            baseline = times["print() per line"]
+            print(f"  {sink:10} " + "  ".join(f"{name} {seconds * 1000:7.1f} ms ({baseline / seconds:4.1f}x)" for name, seconds in times.items()), flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
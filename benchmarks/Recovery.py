@@ -0,0 +1,60 @@
+import io
+import sys
+import argparse
+import contextlib
+from Parser import parseTokens, recoverDecls
+from benchmarks.Common import scan, best
+from benchmarks.Generator import generate
+
+# Times finding every syntax error of a program in one recovering run (Parser.recoverDecls) against the edit and
+# rerun loop without recovery: N runs of parseTokens, each on the program with one more of its N errors fixed,
+# each stopping at the next error. The errors are spread evenly over a generated program of the functions shape.
+# The recovering run has to find all N errors, or the exit status is 1.
+# python -m benchmarks.Recovery
+
+# the generated assignments 'x = a + n * (x - ...)' with the '*' doubled are syntax errors
+ASSIGNMENT = " * (x - "
+BROKEN = " * * (x - "
+
+# the program with the assignments at positions broken, the others left as generated
+def with_errors(text, positions):
+    parts = text.split(ASSIGNMENT)
+    out = [parts[0]]
+    for index, part in enumerate(parts[1:]):
+        out.append(BROKEN if index in positions else ASSIGNMENT)
+        out.append(part)
+    return "".join(out)
+
+def sequential(texts):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text in texts:
+            parseTokens(scan(text), text)
+
+def recovering(text):
+    return recoverDecls(scan(text))[1]
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Recovery", description = "Times one recovering run against one run per error.")
+    arg_parser.add_argument("--size", type = int, default = 140, help = "size of the generated program (default: 140)")
+    arg_parser.add_argument("--errors", type = int, nargs = "+", default = [1, 4, 16, 64], help = "error counts to time")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    text = generate("functions", args.size)
+    assignments = text.count(ASSIGNMENT)
+    failed = False
+    print(f"{len(text)} characters, {assignments} assignments to break")
+    for count in args.errors:
+        count = min(count, assignments)
+        positions = sorted({index * assignments // count for index in range(count)})
+        # run i has the first i errors fixed
+        texts = [with_errors(text, set(positions[fixed:])) for fixed in range(len(positions))]
+        recovering_s, errors = best(recovering, texts[0], repeat = args.repeat)
+        sequential_s, _ = best(sequential, texts, repeat = args.repeat)
+        ok = len(errors) == len(positions)
+        failed |= not ok
+        print(f"{len(positions):4} errors: recovering {recovering_s * 1000:8.1f} ms  sequential {sequential_s * 1000:9.1f} ms"
+              f"  ({sequential_s / recovering_s:5.1f}x){'' if ok else f'  FAILED, {len(errors)} errors found'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
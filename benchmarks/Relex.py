@@ -0,0 +1,47 @@
+import sys
+import time
+import random
+import argparse
+from Scanner import IncrementalScanner
+from benchmarks.Common import scan, best, line_edits
+from benchmarks.Generator import SHAPES, generate
+
+# Times single-line edits with the IncrementalScanner (Scanner.py) against a full tokenize() of the edited text,
+# on large generated programs (Common.line_edits: most change a number, the others insert a line, which moves
+# every later token). A full scan costs about the same whatever the edit, so it is timed once on the edited
+# text. After the edits the tokens must be the ones a full scan gives, or the exit status is 1.
+# python -m benchmarks.Relex
+
+# (CPU time of the edits, the scanner after them)
+def incremental(text, edits):
+    scanner = IncrementalScanner(text)
+    start = time.process_time()
+    for edit in edits:
+        scanner.edit(*edit)
+    return time.process_time() - start, scanner
+
+def _fields(tokens):
+    return [(token.value, token.line, token.start_col, token.end_col, token.type) for token in tokens]
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Relex", description = "Times single-line edits with the incremental scanner against full scans.")
+    arg_parser.add_argument("--scale", type = float, default = 4.0, help = "size of the generated programs, times their default size (default: 4)")
+    arg_parser.add_argument("--edits", type = int, default = 200, help = "edits per program (default: 200)")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    failed = False
+    for shape in ("functions", "expressions", "prints"):
+        text = generate(shape, max(1, int(SHAPES[shape][1] * args.scale)))
+        edits, edited = line_edits(text, args.edits, random.Random(0))
+        incremental_s = min(incremental(text, edits)[0] for _ in range(args.repeat)) / len(edits)
+        full_s, tokens = best(scan, edited, repeat = args.repeat)
+        scanner = incremental(text, edits)[1]
+        same = _fields(scanner.tokens) == _fields(tokens)
+        failed |= not same
+        print(f"{shape:12} {len(text) / 1024:6.0f} KiB {len(tokens):8} tokens: incremental {incremental_s * 1000:7.3f} ms/edit"
+              f"  full scan {full_s * 1000:8.1f} ms  ({full_s / incremental_s:5.0f}x)"
+              f"  {scanner.full_scans - 1} fallbacks  {'same tokens' if same else 'DIFFERENT TOKENS'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
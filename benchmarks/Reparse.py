@@ -0,0 +1,50 @@
+import sys
+import time
+import random
+import argparse
+from Incremental import IncrementalParser
+from benchmarks.Common import scan, parse, tree_text, best, line_edits
+from benchmarks.Generator import generate
+
+# Times one-line edits with the IncrementalParser (Incremental.py) against a full scan and parse of the edited
+# text, on generated programs of functions of about 20 lines from --lines lines up. The edits are those of
+# Common.line_edits, which keep the program valid, so each should reparse only the function it falls in and cost
+# about the same whatever the size of the file; a full parse costs the same for every edit, so it is timed once on
+# the edited text. After the edits the tree must be the one a full parse gives, or the exit status is 1.
+# python -m benchmarks.Reparse
+
+LINES_PER_SIZE = 22 # lines of the functions shape per unit of size
+
+def _full(text):
+    return parse(scan(text))
+
+# (CPU time of the edits, the parser after them)
+def incremental(text, edits):
+    parser = IncrementalParser(text)
+    start = time.process_time()
+    for edit in edits:
+        parser.edit(*edit)
+    return time.process_time() - start, parser
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Reparse", description = "Times one-line edits with the incremental parser against full reparses.")
+    arg_parser.add_argument("--lines", type = int, nargs = "+", default = [5000, 50000], help = "sizes of the generated files in lines (default: 5000 50000)")
+    arg_parser.add_argument("--edits", type = int, default = 100, help = "edits per file (default: 100)")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    failed = False
+    for lines in args.lines:
+        text = generate("functions", max(1, lines // LINES_PER_SIZE))
+        edits, edited = line_edits(text, args.edits, random.Random(0))
+        incremental_s = min(incremental(text, edits)[0] for _ in range(args.repeat)) / len(edits)
+        full_s, program_node = best(_full, edited, repeat = args.repeat)
+        parser = incremental(text, edits)[1]
+        same = parser.error is None and tree_text(parser.program.decls) == tree_text(program_node.decls)
+        failed |= not same
+        print(f"{text.count(chr(10)):6} lines: incremental {incremental_s * 1000:7.2f} ms/edit  full reparse {full_s * 1000:8.1f} ms"
+              f"  ({full_s / incremental_s:5.0f}x)  {parser.full_parses - 1} full parses"
+              f"  {'same tree' if same else 'DIFFERENT TREE'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import sys
+import time
+import random
+import argparse
+from Symbols import resolve
+from benchmarks.Common import scan, parse, best
+from benchmarks.Generator import generate
+
+# Name resolution (Symbols.py) on generated programs of many small functions, 6 declarations each: the time of
+# the resolve pass per name declared or used, which stays flat as the program grows, and the time of a
+# declaration_at lookup for a sample of the uses.
+# python -m benchmarks.Resolve
+
+DEFAULT_SIZES = "1000,4000,10000"
+
+def measure(size, repeat = 3, lookups = 100000):
+    program_node = parse(scan(generate("functions", size)))
+    resolve_s, table = best(resolve, program_node, repeat = repeat)
+    positions = [(token.line, token.start_col) for declaration in table.declarations for token in declaration.uses]
+    rng = random.Random(0)
+    sample = [rng.choice(positions) for _ in range(lookups)]
+    declaration_at = table.declaration_at
+    start = time.process_time()
+    for line, column in sample:
+        declaration_at(line, column)
+    lookup_s = (time.process_time() - start) / lookups
+    return {"declarations": len(table.declarations), "uses": len(positions), "errors": len(table.errors),
+            "resolve_s": resolve_s, "lookup_s": lookup_s}
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Resolve", description = "Times name resolution.")
+    arg_parser.add_argument("--sizes", default = DEFAULT_SIZES, help = f"comma separated function counts (default: {DEFAULT_SIZES})")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    for size in args.sizes.split(","):
+        result = measure(int(size), args.repeat)
+        print(f"{result['declarations']:>7} declarations {result['uses']:>7} uses  resolve {result['resolve_s'] * 1000:7.1f} ms"
+              f"  ({result['resolve_s'] * 1e6 / (result['declarations'] + result['uses']):.2f} us per name)"
+              f"  lookup {result['lookup_s'] * 1e9:.0f} ns  errors {result['errors']}", flush = True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
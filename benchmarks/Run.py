@@ -0,0 +1,230 @@
+import io
+import sys
+import argparse
+import contextlib
+from Expressions import Expressions
+from Walker import WRAPPED
+import Compiler
+from Compiler import constant_value, format_value, wrap, divide, DEFAULTS
+from benchmarks.Common import scan, parse, best
+
+# The closure compiler (Compiler.py) against a naive interpreter that walks the parse tree on every run, looks
+# variables up by name in a chain of dicts and unwinds returns and breaks with exceptions. Both give the same
+# output, which is checked. Programs: nested loops, recursive calls, and t31.decaf's factorials.
+# python -m benchmarks.Run
+
+LOOPS = """
+void main() {
+  int i;
+  int j;
+  int sum;
+  sum = 0;
+  for (i = 0; i < %d; i = i + 1) {
+    j = 0;
+    while (true) {
+      if ((j / 2) * 2 == j) sum = sum + j; else sum = sum - 1;
+      j = j + 1;
+      if (j == 100) break;
+    }
+  }
+  Print("sum ", sum, "\\n");
+}
+"""
+
+CALLS = """
+int calls;
+
+int fib(int n) {
+  calls = calls + 1;
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+
+void main() {
+  Print("fib ", fib(%d), " in ", calls, " calls\\n");
+}
+"""
+
+FACTORIALS = """
+int factorial(int n)
+{
+  if (n <=1 ) return 1;
+  return n*factorial(n-1);
+}
+
+void main()
+{
+   int n;
+   int round;
+   for (round = 0; round < %d; round = round + 1)
+     for (n = 1; n <= 15; n = n + 1)
+        Print("Factorial(", n , ") = ", factorial(n), "\\n");
+}
+"""
+
+# program -> (source, default size)
+PROGRAMS = {"loops": (LOOPS, 2000), "calls": (CALLS, 20), "factorials": (FACTORIALS, 200)}
+
+class Break(Exception):
+    pass
+
+class Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+# Evaluates the tree directly: every run dispatches on node classes and operator lexemes again, and every
+# variable access searches the scopes by name
+class NaiveInterpreter:
+    def __init__(self, program_node, out):
+        self.functions = {}
+        self.globals = {}
+        self.out = out
+        for decl in program_node.decls:
+            if decl.isVariableDecl:
+                variable = decl.variableDecl.variable
+                self.globals[variable.identifier] = DEFAULTS.get(variable.type.value)
+            else:
+                self.functions[decl.functionDecl.identifier] = decl.functionDecl
+
+    def run(self):
+        self.call(self.functions["main"], [])
+
+    def call(self, function_decl, values):
+        scopes = [self.globals, {formal.identifier: value for formal, value in zip(function_decl.formals, values)}]
+        try:
+            self.execute(function_decl.stmtBlock, scopes)
+        except Return as result:
+            return result.value
+        return None
+
+    def lookup(self, name, scopes):
+        for scope in reversed(scopes):
+            if name in scope:
+                return scope
+        raise Exception("undeclared identifier", name)
+
+    def execute(self, node, scopes):
+        while type(node) in WRAPPED:
+            node = WRAPPED[type(node)](node)
+        name = type(node).__name__
+        if name == "StmtBlock":
+            scope = {decl.variable.identifier: DEFAULTS.get(decl.variable.type.value) for decl in node.variableDecls}
+            scopes.append(scope)
+            try:
+                for stmt in node.stmts:
+                    self.execute(stmt, scopes)
+            finally:
+                scopes.pop()
+        elif name == "IfStmt":
+            if self.evaluate(node.condition.expression_root, scopes):
+                self.execute(node.thenStmt, scopes)
+            elif node.withElse:
+                self.execute(node.elseStmt, scopes)
+        elif name == "WhileStmt":
+            try:
+                while self.evaluate(node.condition.expression_root, scopes):
+                    self.execute(node.body, scopes)
+            except Break:
+                pass
+        elif name == "ForStmt":
+            if node.hasFirstExp:
+                self.evaluate(node.firstexp.expression_root, scopes)
+            try:
+                while self.evaluate(node.middleexp.expression_root, scopes):
+                    self.execute(node.stmt, scopes)
+                    if node.hasLastExp:
+                        self.evaluate(node.lastexp.expression_root, scopes)
+            except Break:
+                pass
+        elif name == "BreakStmt":
+            raise Break()
+        elif name == "ReturnStmt":
+            raise Return(self.evaluate(node.expression.expression_root, scopes) if node.withExpression else None)
+        elif name == "PrintStmt":
+            self.out.write("".join(format_value(self.evaluate(expression.expression_root, scopes))
+                                   for expression in node.expressions))
+        else:
+            self.evaluate(node, scopes)
+
+    def evaluate(self, node, scopes):
+        name = type(node).__name__
+        if name == "ConstantNode":
+            return constant_value(node.token)
+        if name == "FieldAccessNode":
+            return self.lookup(node.variable.value, scopes)[node.variable.value]
+        if name == "AssignNode":
+            value = self.evaluate(node.rhs, scopes)
+            self.lookup(node.lhs.variable.value, scopes)[node.lhs.variable.value] = value
+            return value
+        if name == "CallNode":
+            values = [self.evaluate(argument, scopes) for argument in node.arguments]
+            return self.call(self.functions[node.identifier.value], values)
+        if name == "UnaryExprNode":
+            return not self.evaluate(node.operand, scopes)
+        operator = node.operator.value
+        lhs = self.evaluate(node.lhs, scopes)
+        if operator == "&&":
+            return lhs and self.evaluate(node.rhs, scopes)
+        if operator == "||":
+            return lhs or self.evaluate(node.rhs, scopes)
+        rhs = self.evaluate(node.rhs, scopes)
+        if operator == "+":
+            return wrap(lhs + rhs)
+        if operator == "-":
+            return wrap(lhs - rhs)
+        if operator == "*":
+            return wrap(lhs * rhs)
+        if operator == "/":
+            return divide(lhs, rhs)
+        if operator == "<":
+            return lhs < rhs
+        if operator == ">":
+            return lhs > rhs
+        if operator == "<=":
+            return lhs <= rhs
+        if operator == ">=":
+            return lhs >= rhs
+        return lhs == rhs
+
+def _naive(program_node):
+    out = io.StringIO()
+    NaiveInterpreter(program_node, out).run()
+    return out.getvalue()
+
+def _compiled(program):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        program.run()
+    return out.getvalue()
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Run", description = "Times the closure compiler against a naive interpreter.")
+    arg_parser.add_argument("--programs", default = ",".join(PROGRAMS), help = f"comma separated programs (default: all of {', '.join(PROGRAMS)})")
+    arg_parser.add_argument("--scale", type = float, default = 1.0, help = "multiplies the loop counts; fib's argument grows by log2 of it")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    names = args.programs.split(",")
+    for name in names:
+        if name not in PROGRAMS:
+            arg_parser.error(f"unknown program '{name}'")
+    # programs are parsed the way --run parses them
+    Expressions.left_associative = True
+    failed = False
+    for name in names:
+        source, size = PROGRAMS[name]
+        if name == "calls":
+            size = max(1, size + round(args.scale).bit_length() - 1)
+        else:
+            size = max(1, round(size * args.scale))
+        program_node = parse(scan(source % size))
+        compile_s, program = best(Compiler.compile, program_node, repeat = args.repeat)
+        compiled_s, compiled_output = best(_compiled, program, repeat = args.repeat)
+        naive_s, naive_output = best(_naive, program_node, repeat = args.repeat)
+        same = compiled_output == naive_output
+        failed |= not same
+        print(f"{name:<11} naive {naive_s * 1000:8.1f} ms  compiled {compiled_s * 1000:8.1f} ms (compile {compile_s * 1000:.2f} ms)"
+              f"  {naive_s / compiled_s:4.1f}x{'' if same else '  OUTPUT DIFFERS'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import sys
+import argparse
+from Scanner import Scanner
+from benchmarks.Common import best_of
+from benchmarks.Generator import SHAPES, generate
+
+# Scanner throughput: the single-pass regex engine against the legacy character-by-character scanner on the
+# generated programs, in tokens per second. Both must give the same tokens, which is checked; a difference makes
+# the exit status 1. The strings shape is where the legacy scanner is slowest, one step per character of a
+# literal.
+# python -m benchmarks.Scan
+
+ENGINES = ("legacy", "regex")
+
+def _scan(text, engine):
+    scanner = Scanner(text, engine)
+    scanner.tokenize()
+    return scanner.tokens
+
+def _fields(tokens):
+    return [(token.value, token.line, token.start_col, token.end_col, token.type) for token in tokens]
+
+# engine -> scan with it, to time
+RUNS = {engine: (lambda text, engine = engine: _scan(text, engine)) for engine in ENGINES}
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Scan", description = "Scanner throughput of the regex and legacy engines.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--scale", type = float, default = 1.0, help = "multiplies the size of every program")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+    failed = False
+    for shape in shapes:
+        text = generate(shape, max(1, round(SHAPES[shape][1] * args.scale)))
+        tokens = _scan(text, "regex")
+        same = _fields(tokens) == _fields(_scan(text, "legacy"))
+        failed |= not same
+        best = best_of(RUNS, text, repeat = args.repeat)
+        print(f"{shape:12} {len(tokens):>8} tokens  " + "  ".join(f"{engine} {len(tokens) / best[engine] / 1000:6.0f}k tok/s"
+                                                                for engine in ENGINES)
+              + f"  {best['legacy'] / best['regex']:5.1f}x{'' if same else '  TOKENS DIFFER'}", flush = True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import gc
+import sys
+import json
+import argparse
+import platform
+import tracemalloc
+from TreeWriter import TreeWriter, NullSink, write_node
+from Stats import node_counts
+from benchmarks.Common import scan, parse, best
+from benchmarks.Generator import SHAPES, generate
+
+# Times scanning, parsing and tree printing of the generated programs separately, and optionally compares the
+# results with a saved JSON baseline. Timings are the best of several runs (Common.best); peak memory is measured
+# in a separate traced run, since tracing slows everything down
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+# metrics compared against the baseline, all lower is better
+COMPARED = ("scan_s", "parse_s", "print_s", "peak_kib")
+
+def _print(program_node):
+    out = TreeWriter(NullSink()) # timed without the cost of a terminal or a growing buffer
+    write_node(program_node, out)
+    out.flush()
+
+# results for one program: sizes, best times per phase, rates and the peak traced memory of scan and parse
+def measure(text, repeat = 3):
+    scan_s, tokens = best(scan, text, repeat = repeat)
+    parse_s, program_node = best(parse, tokens, repeat = repeat)
+    print_s, _ = best(_print, program_node, repeat = repeat)
+    token_count = len(tokens)
+    nodes = sum(node_counts(program_node)[0].values())
+    del tokens, program_node
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        parse(scan(text))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "bytes": len(text),
+        "tokens": token_count,
+        "nodes": nodes,
+        "scan_s": scan_s,
+        "parse_s": parse_s,
+        "print_s": print_s,
+        "tokens_per_s": token_count / scan_s,
+        "nodes_per_s": nodes / parse_s,
+        "peak_kib": peak >> 10,
+    }
+
+def run(shapes, scale = 1.0, repeat = 3, seed = 0, report = None):
+    results = {}
+    for shape in shapes:
+        size = max(1, round(SHAPES[shape][1] * scale))
+        results[shape] = measure(generate(shape, size, seed), repeat)
+        if report is not None:
+            report(shape, results[shape])
+    return results
+
+# (shape, metric, baseline value, current value, ratio) for every metric that got worse by more than threshold
+def compare(results, baseline, threshold):
+    regressions = []
+    for shape, current in results.items():
+        before = baseline.get(shape)
+        if before is None:
+            continue
+        for metric in COMPARED:
+            if before[metric] > 0:
+                ratio = current[metric] / before[metric]
+                if ratio > 1 + threshold:
+                    regressions.append((shape, metric, before[metric], current[metric], ratio))
+    return regressions
+
+def _report(shape, result):
+    print(f"{shape:12} {result['tokens']:>8} tokens {result['nodes']:>8} nodes  "
+          f"scan {result['scan_s'] * 1000:8.1f} ms ({result['tokens_per_s'] / 1000:6.0f}k tok/s)  "
+          f"parse {result['parse_s'] * 1000:8.1f} ms ({result['nodes_per_s'] / 1000:6.0f}k nodes/s)  "
+          f"print {result['print_s'] * 1000:8.1f} ms  peak {result['peak_kib'] / 1024:6.1f} MiB", flush = True)
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks",
+                                         description = "time scanning, parsing and printing of generated Decaf programs")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--scale", type = float, default = 1.0, help = "multiplies the size of every program")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs per phase; the best one counts")
+    arg_parser.add_argument("--seed", type = int, default = 0)
+    arg_parser.add_argument("--baseline", default = DEFAULT_BASELINE, help = f"baseline JSON file (default: {DEFAULT_BASELINE})")
+    arg_parser.add_argument("--save", action = "store_true", help = "write the results as the new baseline instead of comparing")
+    arg_parser.add_argument("--threshold", type = float, default = 0.15,
+                            help = "relative slowdown or memory growth reported as a regression (default: 0.15)")
+    arg_parser.add_argument("--json", action = "store_true", help = "print the results as JSON")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape {shape!r}")
+
+    settings = {"scale": args.scale, "seed": args.seed, "python": platform.python_version()}
+    results = run(shapes, args.scale, args.repeat, args.seed, None if args.json else _report)
+    if args.json:
+        print(json.dumps({"settings": settings, "results": results}, indent = 2))
+
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump({"settings": settings, "results": results}, file, indent = 2)
+            file.write("\n")
+        print(f"baseline written to {args.baseline}", file = sys.stderr)
+        return 0
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"no baseline at {args.baseline}; --save records one", file = sys.stderr)
+        return 0
+    if (baseline["settings"]["scale"], baseline["settings"]["seed"]) != (args.scale, args.seed):
+        print(f"baseline was recorded with scale {baseline['settings']['scale']} and seed {baseline['settings']['seed']}; "
+              "not comparing", file = sys.stderr)
+        return 2
+    regressions = compare(results, baseline["results"], args.threshold)
+    for shape, metric, before, current, ratio in regressions:
+        print(f"REGRESSION {shape} {metric}: {before:.4g} -> {current:.4g} ({ratio:.2f}x)", file = sys.stderr)
+    if not regressions:
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}", file = sys.stderr)
+    return 1 if regressions else 0
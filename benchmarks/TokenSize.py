@@ -0,0 +1,66 @@
+import sys
+import argparse
+from Scanner import Token
+from TokenTable import TokenTable
+from benchmarks.Common import scan, parse, best_of, retained
+from benchmarks.Generator import SHAPES, generate
+
+# Memory per token of the token storages for the generated programs: Token objects as they were before __slots__
+# (with a __dict__), Token objects with __slots__, and a TokenTable (TokenTable.py, --token-storage table).
+# Memory is the traced memory the list of tokens or the table keeps alive; every storage is filled from the same
+# scanned tokens, so lexeme strings are shared and not counted. Then the parse time from a list against a table,
+# which is what the table's compactness costs.
+# python -m benchmarks.TokenSize
+
+# a token with a per-instance __dict__, the way Token was before it declared __slots__
+class DictToken:
+    def __init__(self, token):
+        self.value = token.value
+        self.line = token.line
+        self.start_col = token.start_col
+        self.end_col = token.end_col
+        self.type = token.type
+        self.is_operator = token.is_operator
+        self.is_constant = token.is_constant
+        self.const_value = token.const_value
+        self.kind = token.kind
+
+def _dict_tokens(tokens):
+    return [DictToken(token) for token in tokens]
+
+def _slots_tokens(tokens):
+    return [Token(token.value, token.line, token.start_col, token.end_col, token.type, token.is_operator,
+                  token.is_constant, token.const_value, token.kind) for token in tokens]
+
+# storage -> builds it from scanned tokens
+STORAGES = {"dict Token": _dict_tokens, "__slots__ Token": _slots_tokens, "TokenTable": TokenTable}
+
+def measure(text, repeat = 3):
+    tokens = scan(text)
+    bytes_per_token = {}
+    for name, build in STORAGES.items():
+        size, _ = retained(build, tokens)
+        bytes_per_token[name] = size / len(tokens)
+    table = TokenTable(tokens)
+    parse_s = best_of({"list": lambda: parse(tokens), "table": lambda: parse(table)}, repeat = repeat)
+    return {"tokens": len(tokens), "bytes_per_token": bytes_per_token, "parse_s": parse_s}
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.TokenSize", description = "Memory per token of the token storages.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--scale", type = float, default = 1.0, help = "multiplies the size of every program")
+    arg_parser.add_argument("--repeat", type = int, default = 3, help = "timed runs; the best one counts")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+    for shape in shapes:
+        result = measure(generate(shape, max(1, round(SHAPES[shape][1] * args.scale))), args.repeat)
+        print(f"{shape:12} {result['tokens']:>8} tokens  "
+              + "  ".join(f"{name} {size:5.0f} B" for name, size in result["bytes_per_token"].items())
+              + f"  parse list {result['parse_s']['list'] * 1000:6.1f} ms, table {result['parse_s']['table'] * 1000:6.1f} ms", flush = True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
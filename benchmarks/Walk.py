@@ -0,0 +1,66 @@
+import sys
+import argparse
+from TreeWriter import TreeWriter, NullSink
+from Walker import Walker, iter_nodes, write_tree
+from benchmarks.Common import scan, parse, best_of
+from benchmarks.Generator import SHAPES, generate, nested_blocks, operator_chain
+
+# Full walks of the generated programs: printing with the recursive write_tree methods against printing with the
+# walker (Walker.py), and the walk on its own, without callbacks and through iter_nodes. After the shapes, two
+# programs nested deeper than the recursion limit, a block nesting and one long chain of +, are printed with both.
+# python -m benchmarks.Walk
+
+def _recursive(program_node):
+    out = TreeWriter(NullSink())
+    program_node.write_tree(out)
+    out.flush()
+
+def _walker(program_node):
+    out = TreeWriter(NullSink())
+    write_tree(program_node, out)
+    out.flush()
+
+def _bare(program_node):
+    Walker({}).walk(program_node)
+
+def _iter_nodes(program_node):
+    for _ in iter_nodes(program_node):
+        pass
+
+RUNS = {"recursive": _recursive, "walker": _walker, "bare walk": _bare, "iter_nodes": _iter_nodes}
+
+# programs the iterative parsers accept that are deeper than the recursion limit
+def deep_programs(depth):
+    return {"nested blocks": nested_blocks(depth), "long chain": operator_chain(depth)}
+
+def _prints(run, program_node):
+    try:
+        run(program_node)
+        return "prints"
+    except RecursionError:
+        return "RecursionError"
+
+def main(argv = None):
+    arg_parser = argparse.ArgumentParser(prog = "python -m benchmarks.Walk",
+                                         description = "Recursive against iterative printing and walking of the tree.")
+    arg_parser.add_argument("--shapes", default = ",".join(SHAPES), help = f"comma separated shapes (default: all of {', '.join(SHAPES)})")
+    arg_parser.add_argument("--scale", type = float, default = 1.0, help = "multiplies the size of every program")
+    arg_parser.add_argument("--repeat", type = int, default = 5, help = "timed runs; the best one counts")
+    arg_parser.add_argument("--depth", type = int, default = 5000, help = "nesting of the deep programs (default: 5000)")
+    args = arg_parser.parse_args(argv)
+    shapes = args.shapes.split(",")
+    for shape in shapes:
+        if shape not in SHAPES:
+            arg_parser.error(f"unknown shape '{shape}'")
+    for shape in shapes:
+        size = max(1, round(SHAPES[shape][1] * args.scale))
+        best = best_of(RUNS, parse(scan(generate(shape, size))), repeat = args.repeat)
+        print(f"{shape:12} " + "  ".join(f"{name} {seconds * 1000:7.1f} ms" for name, seconds in best.items()), flush = True)
+    for name, text in deep_programs(args.depth).items():
+        program_node = parse(scan(text))
+        print(f"{name} ({args.depth}): recursive {_prints(_recursive, program_node)}, "
+              f"walker {_prints(_walker, program_node)}", flush = True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+# Benchmark suite: python -m benchmarks (run from the repository root). Generator.py writes synthetic Decaf
+# programs, Suite.py times and compares them. Common.py has the scanning, parsing, tree text, best-of timing and
+# retained memory helpers the benchmarks and tests share.
+# Scan.py (python -m benchmarks.Scan) compares the throughput of the regex and legacy scanners
+# TokenSize.py (python -m benchmarks.TokenSize) compares the memory per token of the token storages
+# Dispatch.py (python -m benchmarks.Dispatch) times statement dispatch on the token kind against the old if chain
+# Latency.py (python -m benchmarks.Latency) compares cold command line runs with warm parse server requests
+# Imports.py (python -m benchmarks.Imports) checks the import time of cold runs against a budget
+# AstSize.py (python -m benchmarks.AstSize) compares the memory and pickling of the class tree and the arena
+# Walk.py (python -m benchmarks.Walk) compares printing and walking the tree recursively and with the walker
+# Resolve.py (python -m benchmarks.Resolve) times name resolution on programs with tens of thousands of declarations
+# Run.py (python -m benchmarks.Run) times the closure compiler against a naive tree-walking interpreter
+# Indexing.py (python -m benchmarks.Indexing) builds and queries the cross-file index of a generated 10k-file corpus
+# Optimize.py (python -m benchmarks.Optimize) measures the nodes and print time constant folding saves
+# Cursor.py (python -m benchmarks.Cursor) times token reads through the cursor and parsing with every engine
+# Nesting.py (python -m benchmarks.Nesting) parses statements nested 10k deep with the iterative and recursive engines
+# Recovery.py (python -m benchmarks.Recovery) times one recovering run against a run per error without recovery
+# Relex.py (python -m benchmarks.Relex) times single-line edits with the incremental scanner against full scans
+# Expressions.py (python -m benchmarks.Expressions) compares the precedence and recursive expression engines
+# Output.py (python -m benchmarks.Output) times printing the tree with print() per line and through TreeWriter
+# ExportLoad.py (python -m benchmarks.ExportLoad) compares the size and load time of the AST exports with reparsing
+# BatchScaling.py (python -m benchmarks.BatchScaling) times batch mode over a generated corpus with 1 to 8 workers
+# Reparse.py (python -m benchmarks.Reparse) times one-line edits with the incremental parser against full reparses
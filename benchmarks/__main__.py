@@ -0,0 +1,4 @@
+import sys
+from benchmarks.Suite import main
+
+sys.exit(main())
@@ -1,262 +1,357 @@
+import io
+import os
 import sys
-from Parser import parseTokens
-
-class Token:
-    def __init__(self, identifier, line, start_col, end_col, type, is_operator = False, is_constant = False, const_value = None):
-        self.value = identifier
-        self.line = line
-        self.start_col = start_col
-        self.end_col = end_col
-        self.type = type
-        self.is_operator = is_operator
-        self.is_constant = is_constant
-        if self.is_constant:
-            self.is_constant = type == 'T_CharConstant' or type == 'T_IntConstant' or type == 'T_StringConstant' or type == 'T_BoolConstant'
-        self.const_value = const_value
-    
-    def print_token(self):
-        if self.is_operator:
-            # 2-character operators like <=, &&, show the token type instead of the indentifier after 'is' in the expected output
-            if len(self.value) > 1:
-                print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is {self.type}")
-            else:
-                print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is '{self.value}'")
-        elif self.is_constant: 
-            # the expected output shows that constant types repeat the value after the type (e.g. T_IntConstant (value= 1))
-            print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is {self.type} (value= {self.value})")
-        else: 
-            print(f"{self.value} \t line {self.line} Cols {self.start_col} - {self.end_col} is {self.type}")
-
-class Scanner:
-    def __init__(self, input):
-        self.input = input
-        self.tokens = []
-        self.col = 1
-        self.line = 1
-        self.index = 0
-        self.operators = {
-            '{': 'T_LCB',
-            '}': 'T_RCB', 
-            '[': 'T_LSB',
-            ']': 'T_RSB',
-            ',': 'T_COMMA',
-            ';': 'T_SEMICOLON',
-            '(': 'T_LPAREN',
-            ')': 'T_RPAREN',
-            '=': 'T_ASSIGN',
-            '-': 'T_MINUS',
-            '!': 'T_NOT',
-            '+': 'T_PLUS',
-            '*': 'T_MULT',
-            '/': 'T_DIV',
-            '<<': 'T_LEFTSHIFT',
-            '>>': 'T_RIGHTSHIFT',
-            '<': 'T_LT',
-            '>': 'T_GT',
-            '<=': 'T_LessEqual', #instead of 'T_LEQ', as per spec, to match expected output
-            '>=': 'T_GEQ',
-            '==': 'T_EQ',
-            '!=': 'T_NEQ',
-            '&&': 'T_logicaland', # should be 'T_AND' as per the DECAF20 spec but changed to match expected output
-            '||': 'T_OR',
-            '.': 'T_DOT'
-        }
-        #some of these keywords had to deviate from the all-caps format specified to match the expected output
-        self.keywords = {
-            'bool': 'T_Identifier', # spec says this should be 'T_BOOLTYPE' but expected output shows 'T_IDENTIFIER'
-            'break': 'T_Break',
-            'continue': 'T_Continue',
-            'else': 'T_Else',
-            'extern': 'T_Extern',
-            'false': 'T_BoolConstant',
-            'for': 'T_For',
-            'func': 'T_Func',
-            'if': 'T_If',
-            'int': 'T_Int',
-            'null': 'T_Null',
-            'package': 'T_Package',
-            'return': 'T_Return',
-            'string': 'T_String', # this is 'T_STRINGTYPE' in the spec but had to change it to 'T_String' to match expected output
-            'true': 'T_BoolConstant',
-            'var': 'T_Var',
-            'void': 'T_Void',
-            'while': 'T_While',
-            'Print': 'T_Print'
-        }
-        
-    
-    # letter => "A" ... "Z" | "a" ... "z" | "_"
-    def _is_letter(self):
-        return self.input[self.index].isalpha() or self.input[self.index] == "_"
-
-    # hex_lit     => "0" ( "x" | "X" ) { hex_digit }
-    def _is_start_of_hex(self):
-        return (self.index + 1 < len(self.input)
-                    and (self.input[self.index] == '0' and 
-                    (self.input[self.index + 1] == 'x' or self.input[self.index + 1] == "X"))) # is 0x or 0X
-
-    # escaped_char => "\" ( "n" | "r" | "t" | "v" | "f" | "a" | "b" | `\` | "'" | `"` )
-    def _is_escaped_char(self):
-        return (self.index + 1 < len(self.input) and 
-                self.input[self.index] == '\\' and 
-                self.input[self.index + 1] in ['n', 'r', 't', 'v', 'f', 'a', 'b', '\\', "'", '"'])
-    
-    # char => all ASCII characters from 7 ... 13 and 32 ... 126 except char 10 "\n", char 92 "\" and char 34: "
-    def _is_char(self):
-        char_ordinal = ord(self.input[self.index])
-        return ((7 <= char_ordinal <= 13) or (32 <= char_ordinal <= 126)) and char_ordinal not in [10, 92, 34]
-    
-    # char_lit_chars => all ASCII characters from 7 ... 13 and 32 ... 126 except char 39 "'" and char 92 "\"
-    def _is_char_lit_chars(self):
-        char_ordinal = ord(self.input[self.index])
-        return ((7 <= char_ordinal <= 13) or (32 <= char_ordinal <= 126)) and char_ordinal not in [39, 92]
-    
-    #consume char and advance pointers
-    def _advance(self):
-        temp_char = self.input[self.index]
-        self.index += 1
-        self.col += 1
-        return temp_char
-       
-    # primary method intented for public use to convert input file to a set of tokens, dispatches to helper functions
-    def tokenize(self):
-        while self.index < len(self.input):
-            if (self.input[self.index] == "'" 
-                    or self.input[self.index] == '"'
-                    or self.input[self.index].isdigit()):
-                self._scan_literal()
-            elif self._is_letter():
-                self._scan_alphanum()
-            elif self.input[self.index] in self.operators or self.input[self.index] == '&' or self.input[self.index] == '|':
-                self._scan_operator()
-            elif self.input[self.index].isspace():
-                if self.input[self.index] == '\n':
-                    self.line += 1
-                    self.col = 1
-                else:
-                    self.col += 1
-                self.index += 1
-            else:
-                print(f"Error: Unexpected character: '{self.input[self.index]}' at line {self.line}, column {self.col}")
-                return
-
-     
-    # Integer Literals:
-    # _______________________________________________________
-    # int_lit     => decimal_lit | hex_lit .
-    # decimal_lit => { decimal_digit }+ .
-    # hex_lit     => "0" ( "x" | "X" ) { hex_digit }
-    #
-    # Character Literals:
-    # _______________________________________________________
-    # char_lit     => "'" ( char_lit_chars | escaped_char ) "'" .
-    # escaped_char => "\" ( "n" | "r" | "t" | "v" | "f" | "a" | "b" | `\` | "'" | `"` )
-    # 
-    # String Literals:
-    # _______________________________________________________
-    # string_lit   => `"` { char | escaped_char } `"` .
-    #
-    def _scan_literal(self):
-        initial_col = self.col
-        identifier = ''
-
-        #hexadecimal literals
-        if self._is_start_of_hex(): 
-            identifier += self._advance() + self._advance()  # consume ('0' and ('x' or 'X'))
-            while self.index < len(self.input) and self.input[self.index].isxdigit():
-                identifier += self._advance()
-            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, 'T_IntConstant', is_constant = True))
-
-        #decimal literals
-        elif self.input[self.index].isdigit():
-            while self.index < len(self.input) and self.input[self.index].isdigit():
-                identifier += self._advance()
-            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, 'T_IntConstant', is_constant = True))
-        
-        #string literals
-        elif self.input[self.index] == '"':
-            identifier += self._advance()
-            while self.index < len(self.input) and self.input[self.index] != '"':
-                if self._is_escaped_char():
-                    identifier += self._advance() + self._advance() #consume / and the subsequent escaped_char
-                elif self._is_char(): 
-                    identifier += self._advance() # consume normal char
-            identifier += self._advance() # consume the end double quote
-            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, "T_StringConstant", is_constant = True))
-        
-        #character literals
-        else: # starts with a "'"
-            identifier +=  self._advance()
-            if self._is_escaped_char():
-                identifier += self._advance() + self._advance()
-            elif self._is_char_lit_chars():
-                identifier += self._advance()
-            identifier += self._advance() # consume ending single quote
-            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, "T_CharConstant", is_constant = True))
-
-
-    # this function generates tokens for identifiers and keywords
-    # identifier => letter { letter | digit }
-    def _scan_alphanum(self):
-        initial_col = self.col
-        identifier = ''
-        while self.index < len(self.input) and (self._is_letter() or self.input[self.index].isdigit()):
-            identifier += self._advance()
-
-        # keywords    
-        if identifier in self.keywords: 
-            if identifier == 'true' or identifier == 'false': #booleans are the only constant type that can be encountered in a keyword match
-                self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, self.keywords[identifier], is_constant = True))
-            else:
-                self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, self.keywords[identifier]))
-        
-        # identifiers
-        else:
-            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, 'T_Identifier')) #DECAF20 spec specifies this type label as 'T_ID' but changing it to 'T_Identifier' to match expected output
-
-    def _scan_operator(self):
-        initial_col = self.col
-        identifier = ''
-
-        # 2-character operators
-        if self.index + 1 < len(self.input) and ((self.input[self.index] + self.input[self.index + 1]) in self.operators):
-            identifier += self._advance() + self._advance()
-
-        # single character operators
-        else:
-            identifier += self._advance()
-        
-        if identifier in self.operators:
-            self.tokens.append(Token(identifier, self.line, initial_col, self.col - 1, self.operators[identifier], is_operator = True))
-        # catch the case where a | or an & appear alone, since the dispaching tokenize() method calls this method if a single one is encountered
-        else:
-            print(f"Error: Unexpected character: '{identifier}' at line {self.line}, column {initial_col}")
-            return
-    
-    def print_tokens(self):
-        for token in self.tokens:
+import argparse
+import contextlib
+from Scanner import Scanner, TokenStream
+import Batch
+from Cache import ParseCache
+
+# Every run pays for the imports at startup, so only what all runs need is imported here. The parser, the export
+# formats, the stats, the token table and the server are imported by the functions that use them: a --tokens run
+# never loads the parser modules (python -m benchmarks.Imports checks this and the import time)
+
+def parse_args(argv):
+    arg_parser = argparse.ArgumentParser(prog = "main.py", usage = "python main.py [options] <input_file> ... | --serve [options]")
+    arg_parser.add_argument("input_files", nargs = "*", metavar = "input_file",
+                            help = "a .decaf file; several files, directories or glob patterns run in batch mode")
+    arg_parser.add_argument("--jobs", type = int, default = os.cpu_count() or 1,
+                            help = "worker processes in batch mode (default: one per CPU)")
+    arg_parser.add_argument("--scanner", choices = ["regex", "legacy"], default = "regex",
+                            help = "scanning engine; 'legacy' is the original per-character scanner, kept for diffing")
+    arg_parser.add_argument("--tokens", action = "store_true", help = "print the token stream instead of the parse tree")
+    arg_parser.add_argument("--token-storage", choices = ["objects", "table"], default = "objects",
+                            help = "'table' keeps tokens in compact typed arrays instead of one Token object per lexeme")
+    arg_parser.add_argument("--expr-engine", choices = ["precedence", "recursive"], default = "precedence",
+                            help = "expression parser; 'recursive' is the original recursive descent, kept for comparison")
+    arg_parser.add_argument("--stmt-engine", choices = ["iterative", "recursive"], default = "iterative",
+                            help = "statement parser; 'recursive' is the original recursive descent, kept for comparison")
+    arg_parser.add_argument("--printer", choices = ["walker", "recursive"], default = "walker",
+                            help = "tree printer; 'recursive' is the original one, which fails on deeply nested programs")
+    arg_parser.add_argument("--left-assoc", action = "store_true",
+                            help = "parse binary operators left associative as the spec requires (precedence engine only)")
+    arg_parser.add_argument("--format", choices = ["tree", "jsonl", "binary"], default = "tree",
+                            help = "output of the parse: the text tree, JSON Lines (one declaration per line) or the binary AST export")
+    arg_parser.add_argument("--stream", action = "store_true",
+                            help = "scan, parse and print one top-level declaration at a time instead of holding the whole program")
+    arg_parser.add_argument("--recover", action = "store_true",
+                            help = "report every syntax error in one pass, skipping past each one, instead of stopping at the first")
+    arg_parser.add_argument("--check", action = "store_true",
+                            help = "resolve every identifier to its declaration and report undeclared and duplicate names (see Symbols.py)")
+    arg_parser.add_argument("--run", action = "store_true",
+                            help = "run the program's main() instead of printing the tree (see Compiler.py)")
+    arg_parser.add_argument("--optimize", action = "store_true",
+                            help = "fold constant expressions and drop dead branches before printing or running (see Optimizer.py)")
+    arg_parser.add_argument("--max-errors", type = int, default = 100, help = "with --recover, stop after this many syntax errors (default: 100)")
+    arg_parser.add_argument("--stats", action = "store_true",
+                            help = "report time per phase, token counts by type and node counts by class on stderr")
+    arg_parser.add_argument("--stats-memory", action = "store_true",
+                            help = "like --stats, with the peak traced memory of every phase (slows the run down)")
+    arg_parser.add_argument("--serve", action = "store_true",
+                            help = "run as a parse server answering JSON requests on stdin, or on --socket (see Server.py)")
+    arg_parser.add_argument("--socket", default = None, metavar = "PATH", help = "with --serve, listen on this Unix socket")
+    arg_parser.add_argument("--no-cache", action = "store_true", help = "always parse, without reading or writing the parse cache")
+    arg_parser.add_argument("--cache-dir", default = None,
+                            help = "directory of the parse cache (default: $XDG_CACHE_HOME/decaf-parser or ~/.cache/decaf-parser)")
+    arg_parser.add_argument("--cache-size", type = int, default = 256,
+                            help = "size bound of the parse cache in megabytes; least recently used entries are evicted")
+    arg_parser.add_argument("--cache-stats", action = "store_true", help = "report cache hits and misses on stderr")
+    args = arg_parser.parse_args(argv)
+    if args.serve:
+        if args.input_files:
+            arg_parser.error("--serve takes its input files in requests")
+        if args.stream or args.stats or args.format == "binary":
+            arg_parser.error("--serve does not combine with --stream, --stats or --format binary")
+    elif args.socket is not None:
+        arg_parser.error("--socket requires --serve")
+    elif not args.input_files:
+        arg_parser.error("the following arguments are required: input_file")
+    if args.left_assoc and args.expr_engine == "recursive":
+        arg_parser.error("--left-assoc requires the precedence expression engine")
+    if args.run or args.optimize:
+        # running and folding compute values, which only binary operators left associative as in the spec give
+        if args.expr_engine == "recursive":
+            arg_parser.error(f"--{'run' if args.run else 'optimize'} parses left associative and requires the precedence expression engine")
+        args.left_assoc = True
+    if args.jobs < 1:
+        arg_parser.error("--jobs must be at least 1")
+    if args.max_errors < 1:
+        arg_parser.error("--max-errors must be at least 1")
+    args.stats = args.stats or args.stats_memory
+    if args.stats and args.stream:
+        arg_parser.error("--stats times whole phases; it does not combine with --stream")
+    if args.recover and args.stream:
+        arg_parser.error("--recover reads the whole file; it does not combine with --stream")
+    if args.check and (args.stream or args.tokens):
+        arg_parser.error("--check resolves the whole program; it does not combine with --stream or --tokens")
+    if args.run and (args.stream or args.tokens or args.serve or args.format != "tree"):
+        arg_parser.error("--run does not combine with --stream, --tokens, --serve or --format")
+    if args.optimize and (args.stream or args.tokens or args.serve or args.format != "tree"):
+        arg_parser.error("--optimize does not combine with --stream, --tokens, --serve or --format")
+    if args.format == "binary" and Batch.is_batch(args.input_files):
+        arg_parser.error("--format binary takes a single input file")
+    return args
+
+# parser settings are class attributes; batch workers call this too. A token-only run has nothing to configure
+def configure(args):
+    if args.tokens and not args.serve:
+        return
+    from Expressions import Expressions
+    from StmtBlock import StmtBlock
+    Expressions.engine = args.expr_engine
+    Expressions.left_associative = args.left_assoc
+    StmtBlock.engine = args.stmt_engine
+    from TreeWriter import TreePrinter
+    TreePrinter.engine = args.printer
+
+# streaming mode: the file is read in blocks, tokens are generated on demand and every declaration is printed
+# and released as soon as it is parsed. A syntax error is reported after the declarations that preceded it
+def stream(file, args):
+    from Parser import printDeclStream
+    from SourceFile import SourceFile
+    scanner = Scanner(file, args.scanner)
+    if args.tokens:
+        for token in scanner.iter_tokens():
             token.print_token()
+        return file_status(scanner, False)
+
+    def read_lines():
+        with open(file.name, 'r') as source:
+            return SourceFile(source.read())
+
+    if args.format == "tree":
+        has_error = printDeclStream(TokenStream(scanner.iter_tokens()), read_lines)
+        return file_status(scanner, has_error)
+    import Export
+    writer = Export.WRITERS[args.format](export_sink(args.format))
+    with contextlib.redirect_stdout(sys.stderr):
+        has_error = printDeclStream(TokenStream(scanner.iter_tokens()), read_lines, writer)
+    return file_status(scanner, has_error)
+
+# outcome of one input file for the batch summary; failure is what went wrong after a successful parse, if anything
+def file_status(scanner, has_error, failure = None):
+    if scanner.errors:
+        return "scan error"
+    if has_error:
+        return "syntax error"
+    return failure or "ok"
+
+# jsonl and binary exports own stdout; scanner and syntax errors are reported on stderr instead
+def export_sink(format):
+    return sys.stdout if format == "jsonl" else sys.stdout.buffer
 
 def main():
-    if len(sys.argv) != 2: 
+    if len(sys.argv) < 2:
         print("Expected input: python main.py <input_file>")
         return
-    
-    input_file = sys.argv[1]
 
+    if sys.argv[1] == "index":
+        import Index
+        return Index.main(sys.argv[2:])
+
+    args = parse_args(sys.argv[1:])
+    configure(args)
+
+    if args.serve:
+        import Server
+        exit_code = Server.serve(args, run_file, run_text, configure)
+        written = True
+    elif Batch.is_batch(args.input_files):
+        exit_code, written = Batch.run_batch(Batch.expand_inputs(args.input_files), run_file, args, configure)
+    else:
+        status, cached = run_file(args.input_files[0], args)
+        if args.cache_stats and cached is not None:
+            print(f"cache: {int(cached)} hits, {int(not cached)} misses", file = sys.stderr)
+        written = cached is False
+        # 1 for a file that did not parse, check or run, like a batch with a failed file
+        exit_code = 0 if status == "ok" else 1
+    # only a run that wrote entries can have grown the cache, once at the end; a run of hits skips the directory scan
+    if written and uses_cache(args):
+        parse_cache(args).prune()
+    return exit_code
+
+def parse_cache(args):
+    return ParseCache(args.cache_dir, args.cache_size << 20)
+
+# the cache holds printed text; streaming and binary output bypass it, --stats has to see the real run and --run
+# runs the program every time
+def uses_cache(args):
+    return not (args.no_cache or args.stream or args.format == "binary" or args.stats or args.run)
+
+# everything besides the file contents that changes what a run prints
+def cache_settings(args):
+    return (f"{args.scanner} {args.token_storage} {args.expr_engine} {args.stmt_engine} {args.printer} {args.left_assoc} {args.format} {args.tokens}"
+            f" {args.recover} {args.max_errors} {args.check} {args.optimize}")
+
+# one file through the parse cache: returns (status, cached) where cached is True on a hit, False on a miss
+# and None when the cache is not used or cannot be written. On a hit the stored output is replayed without scanning or parsing
+def run_file(input_file, args):
+    if not uses_cache(args):
+        return parse_file(input_file, args), None
+    try:
+        with open(input_file, 'rb') as file:
+            contents = file.read()
+    except FileNotFoundError:
+        print(f"{input_file} not found")
+        return "not found", None
+
+    cache = parse_cache(args)
+    key = cache.key(contents, cache_settings(args))
+    entry = cache.get(key)
+    if entry is not None:
+        status, output, errors = entry
+        sys.stdout.write(output)
+        sys.stderr.write(errors)
+        return status, True
+
+    output = io.StringIO()
+    errors = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+            status = parse_file(input_file, args)
+    finally:
+        sys.stdout.write(output.getvalue())
+        sys.stderr.write(errors.getvalue())
+    if not cache.put(key, (status, output.getvalue(), errors.getvalue())):
+        # the cache directory cannot be written: the file was parsed as without the cache
+        return status, None
+    return status, False
+
+# parseTokens, or parseTokensRecovering with --recover
+def parse(tokens, contents, args):
+    from Parser import parseTokens, parseTokensRecovering
+    if args.recover:
+        return parseTokensRecovering(tokens, contents, args.max_errors)
+    return parseTokens(tokens, contents)
+
+# scans, parses and prints one file; returns its status ("ok", "scan error", "syntax error" or "not found")
+def parse_file(input_file, args):
     try:
         with open(input_file, 'r') as file:
+            if args.stream:
+                return stream(file, args)
+
             contents = file.read()
-            scanner = Scanner(contents)
-            scanner.tokenize()
-            
-            program_node, has_error = parseTokens(scanner.tokens, contents)
-            
-            if not has_error and program_node:
-                program_node.print_tree()
-                
     except FileNotFoundError:
         print(f"{input_file} not found")
+        return "not found"
+
+    if args.stats:
+        from Stats import Stats
+    stats = Stats(args.stats_memory) if args.stats else None
+    try:
+        return scan_and_parse(contents, args, stats)
+    finally:
+        if stats is not None:
+            sys.stdout.flush()
+            stats.report(sys.stderr)
+
+# scans, parses and prints source text given directly, for the parse server
+def run_text(contents, args):
+    return scan_and_parse(contents, args, None)
+
+# stands in for Stats.phase without --stats
+def no_phase(name):
+    return contextlib.nullcontext()
+
+def scan_and_parse(contents, args, stats):
+    if args.token_storage == "table":
+        from TokenTable import TokenTable
+    scanner = Scanner(contents, args.scanner, TokenTable() if args.token_storage == "table" else None, args.recover)
+    phase = stats.phase if stats is not None else no_phase
+
+    # jsonl and binary exports own stdout, scanner errors go to stderr as well
+    messages = contextlib.redirect_stdout(sys.stderr) if args.format != "tree" and not args.tokens else contextlib.nullcontext()
+    with messages, phase("scan"):
+        scanner.tokenize()
+    if stats is not None:
+        stats.count_tokens(scanner.tokens)
+
+    if args.tokens:
+        with phase("print"):
+            scanner.print_tokens()
+        return file_status(scanner, False)
+
+    failure = None
+    if args.format == "tree":
+        with phase("parse"):
+            program_node, has_error = parse(scanner.tokens, contents, args)
+        if (args.check or args.run) and not has_error and program_node:
+            with phase("resolve"):
+                table = check_names(program_node, contents)
+            failure = "name error" if table is None else None
+        if args.optimize and not has_error and failure is None and program_node:
+            from Optimizer import optimize
+            with phase("optimize"):
+                before, after = optimize(program_node)
+            print(f"optimize: {before - after} of {before} nodes eliminated", file = sys.stderr)
+        if not has_error and failure is None and program_node:
+            if args.run:
+                with phase("run"):
+                    failure = run_program(program_node, table, contents)
+            else:
+                with phase("print"):
+                    program_node.print_tree()
+    else:
+        import Export
+        sink = export_sink(args.format)
+        with contextlib.redirect_stdout(sys.stderr):
+            with phase("parse"):
+                program_node, has_error = parse(scanner.tokens, contents, args)
+            if args.check and not has_error and program_node:
+                with phase("resolve"):
+                    failure = "name error" if check_names(program_node, contents) is None else None
+        if not has_error and failure is None and program_node:
+            with phase("export"):
+                Export.export(program_node, sink, args.format)
+    if stats is not None and program_node:
+        stats.count_nodes(program_node)
+    return file_status(scanner, has_error, failure)
+
+# --check: resolves the names of a parsed program and reports its errors like syntax errors; returns the symbol
+# table, or None if there were errors
+def check_names(program_node, contents):
+    from Symbols import resolve
+    from Parser import print_error
+    from SourceFile import SourceFile
+    table = resolve(program_node)
+    if not table.errors:
+        return table
+    lines = SourceFile(contents)
+    for error_type, token in table.errors:
+        print_error(token, lines, error_type)
+    return None
+
+# --run: compiles the program and runs its main(); returns "compile error" or "runtime error" after reporting
+# what stopped it, None if it ran to the end
+def run_program(program_node, table, contents):
+    import Compiler
+    try:
+        program = Compiler.compile(program_node, table)
+    except Exception as error:
+        if len(error.args) != 2:
+            raise
+        return report_run_error(Compiler.CompileErr, *error.args, contents)
+    try:
+        program.run()
+        return None
+    except RecursionError:
+        error_type, token = "call stack too deep", None
+    except Exception as error:
+        if len(error.args) != 2:
+            raise
+        error_type, token = error.args
+    return report_run_error(Compiler.RuntimeErr, error_type, token, contents)
+
+# reports an error of --run; returns status, the kind of error
+def report_run_error(status, error_type, token, contents):
+    from Parser import print_error
+    from SourceFile import SourceFile
+    if token is None:
+        print(f"*** {status}: {error_type}")
+    else:
+        print_error(token, SourceFile(contents), error_type)
+    return status
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1 @@
+# Tests: python -m unittest (run from the repository root)
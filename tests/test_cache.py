@@ -0,0 +1,79 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+import main
+import Cache
+from Cache import ParseCache, source_hash
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "t11.decaf")
+
+class SourceHashTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for name, text in (("Parser.py", "a = 1\n"), ("Build.py", "b = 1\n"), ("notes.txt", "c\n")):
+            with open(os.path.join(self.root, name), "w") as file:
+                file.write(text)
+
+    def rewrite(self, name, text):
+        with open(os.path.join(self.root, name), "w") as file:
+            file.write(text)
+
+    # a change to any module that can change the output changes the key, without a version to bump
+    def test_source_change(self):
+        before = source_hash(self.root)
+        self.rewrite("Parser.py", "a = 2\n")
+        self.assertNotEqual(source_hash(self.root), before)
+        self.rewrite("Parser.py", "a = 1\n")
+        self.assertEqual(source_hash(self.root), before)
+        self.rewrite("Printer.py", "")
+        self.assertNotEqual(source_hash(self.root), before)
+
+    def test_ignored(self):
+        before = source_hash(self.root)
+        self.rewrite("Build.py", "b = 2\n")
+        self.rewrite("notes.txt", "d\n")
+        self.assertEqual(source_hash(self.root), before)
+
+    def test_key(self):
+        cache = ParseCache(self.root)
+        key = cache.key(b"class A {}", "settings")
+        with mock.patch.object(Cache, "_parser_version", "other"):
+            self.assertNotEqual(cache.key(b"class A {}", "settings"), key)
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    # a hit on a cache whose entries cannot be touched is still a hit
+    def test_read_only_hit(self):
+        cache = ParseCache(self.directory)
+        self.assertTrue(cache.put("key", ("ok", "out", "")))
+        with mock.patch("Cache.os.utime", side_effect = PermissionError):
+            self.assertEqual(cache.get("key"), ("ok", "out", ""))
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def run_main(self, *arguments):
+        with mock.patch.object(sys, "argv", ["main.py", "--cache-dir", self.directory, *arguments]), \
+             contextlib.redirect_stdout(io.StringIO()):
+            main.main()
+
+    # the cache directory is only scanned after a run that wrote to it
+    def test_prune_after_put(self):
+        with mock.patch.object(ParseCache, "prune") as prune:
+            self.run_main(SAMPLE)
+            self.assertEqual(prune.call_count, 1)
+            self.run_main(SAMPLE)
+            self.run_main(SAMPLE, SAMPLE)
+            self.assertEqual(prune.call_count, 1)
+            self.run_main("--max-errors", "3", "--recover", SAMPLE, SAMPLE)
+            self.assertEqual(prune.call_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
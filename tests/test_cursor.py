@@ -0,0 +1,93 @@
+import io
+import unittest
+import contextlib
+from Basic import SyntaxErr
+from Scanner import TokenStream
+from TokenKind import EOF
+from TokenTable import TokenTable
+from TokenCursor import TokenCursor, eof_token
+from StmtBlock import StmtBlock
+from Expressions import Expressions
+from SourceFile import SourceFile
+from Parser import iterDecls, parseTokens, parseTokensRecovering, printDeclStream, print_error
+from benchmarks.Common import scan
+from benchmarks.Generator import SHAPES, generate
+
+# Reads through TokenCursor: only reading past the last token gives the EOF sentinel, any other IndexError is
+# not an end of input and propagates. The truncation fuzz cuts small programs of every shape after each of their
+# tokens and parses the prefix with every engine, from a list, a TokenTable and a TokenStream, and with error
+# recovery: a cut inside a declaration must be reported by print_error on the EOF sentinel, never as a traceback
+
+class CursorTest(unittest.TestCase):
+    def test_end_of_input(self):
+        cursor = TokenCursor(scan("x = 1"))
+        self.assertEqual(cursor.peek(3).kind, EOF)
+        cursor.position = 3
+        self.assertEqual(cursor.advance().kind, EOF)
+        with self.assertRaises(Exception) as caught:
+            Expressions(TokenCursor(scan("x = f(1,")))
+        self.assertEqual(caught.exception.args[0], SyntaxErr)
+        self.assertEqual(caught.exception.args[1].kind, EOF)
+
+    def test_released_token(self):
+        stream = TokenStream(scan("x = 1; y = 2;"))
+        stream[4]
+        stream.release(3)
+        cursor = TokenCursor(stream)
+        with self.assertRaisesRegex(IndexError, "released"):
+            cursor.peek()
+        with self.assertRaisesRegex(IndexError, "released"):
+            cursor.advance()
+        with self.assertRaisesRegex(IndexError, "released"):
+            Expressions(TokenCursor(stream))
+
+ENGINES = (("iterative", "precedence"), ("recursive", "recursive"))
+
+def set_engines(stmt_engine, expr_engine):
+    StmtBlock.engine = stmt_engine
+    Expressions.engine = expr_engine
+
+# the runs of main.py on tokens of text: the parse on its own, the streaming pipeline (which prints the
+# declarations before the error first) and the parse with recovery
+PARSES = {
+    "list": lambda tokens, text: parseTokens(tokens, text),
+    "table": lambda tokens, text: parseTokens(TokenTable(tokens), text),
+    "stream": lambda tokens, text: printDeclStream(TokenStream(tokens), lambda: SourceFile(text)),
+    "recover": lambda tokens, text: parseTokensRecovering(tokens, text),
+}
+
+def printed(function, *args):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        function(*args)
+    return out.getvalue()
+
+class TruncationTest(unittest.TestCase):
+    def tearDown(self):
+        set_engines(*ENGINES[0])
+
+    def test_truncated_programs(self):
+        for shape in SHAPES:
+            text = generate(shape, 1)
+            lines = SourceFile(text)
+            tokens = scan(text)
+            # the positions where a declaration ends
+            boundaries = {decl.tokenPositionProcessed + 1 for decl in iterDecls(tokens)}
+            for engine in ENGINES:
+                set_engines(*engine)
+                for cut in range(1, len(tokens)):
+                    prefix = tokens[:cut]
+                    report = printed(print_error, eof_token(prefix), lines, SyntaxErr)
+                    for name, parse in PARSES.items():
+                        with self.subTest(shape = shape, engine = engine, storage = name, cut = cut):
+                            output = printed(parse, prefix, text)
+                            if cut in boundaries:
+                                self.assertNotIn("*** Error", output)
+                            elif name == "stream":
+                                self.assertTrue(output.endswith(report), output[-300:])
+                                self.assertEqual(output.count("*** Error"), 1)
+                            else:
+                                self.assertEqual(output, report)
+
+if __name__ == "__main__":
+    unittest.main()
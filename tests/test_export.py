@@ -0,0 +1,41 @@
+import io
+import unittest
+import Export
+from benchmarks.Common import scan, parse, tree_text
+from benchmarks.Generator import nested_blocks, else_if_ladder, mixed_nesting, operator_chain
+
+# Export round trips of programs nested deeper than the recursion limit: both formats must write them and load
+# them back into trees that print like the parsed ones
+
+DEPTH = 10000
+
+class DeepExportTest(unittest.TestCase):
+    def round_trip(self, text):
+        program_node = parse(scan(text))
+        expected = tree_text(program_node.decls)
+        sink = io.StringIO()
+        Export.export(program_node, sink, "jsonl")
+        self.assertEqual(tree_text(Export.iter_jsonl(sink.getvalue().splitlines())), expected)
+        sink = io.BytesIO()
+        Export.export(program_node, sink, "binary")
+        self.assertEqual(tree_text(Export.iter_binary(sink.getvalue())), expected)
+
+    def test_nested_blocks(self):
+        self.round_trip(nested_blocks(DEPTH))
+
+    def test_else_if_ladder(self):
+        self.round_trip(else_if_ladder(DEPTH))
+
+    def test_mixed_nesting(self):
+        self.round_trip(mixed_nesting(DEPTH))
+
+    def test_operator_chain(self):
+        self.round_trip(operator_chain(3000))
+
+    def test_samples(self):
+        for path in ("t11.decaf", "t31.decaf", "t41.decaf"):
+            with open(path, 'r') as file:
+                self.round_trip(file.read())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import random
+import unittest
+import contextlib
+from Scanner import Scanner
+from Parser import iterDecls
+from Expressions import Expressions
+from benchmarks.Common import tree_text
+
+# Differential fuzz of the expression engines: random expressions, valid ones and ones with a token dropped,
+# doubled or swapped, are parsed with the precedence engine and the recursive descent methods, which must give
+# the same tree or fail on the same token with the same error
+
+SEED = 5
+CASES = 3000
+
+OPERATORS = ["=", "||", "&&", "==", "<", ">", "<=", ">=", "+", "-", "*", "/"]
+JUNK = ["(", ")", ",", "!", "+", "=", "f", "1", ";", "}", "else"]
+
+def expression(rng, depth = 0):
+    choice = rng.randrange(9 if depth < 4 else 3)
+    if choice == 0:
+        return [str(rng.randrange(100))]
+    if choice == 1:
+        return [rng.choice(["a", "b", "x", "true", "null", "\"s\"", "1.5"])]
+    if choice == 2:
+        # a call without arguments
+        return [rng.choice(["f", "g"]), "(", ")"]
+    if choice == 3:
+        arguments = [expression(rng, depth + 1) for _ in range(rng.randrange(1, 4))]
+        tokens = [rng.choice(["f", "g"]), "("]
+        for index, argument in enumerate(arguments):
+            tokens.extend(([","] if index else []) + argument)
+        return tokens + [")"]
+    if choice == 4:
+        return ["("] + expression(rng, depth + 1) + [")"]
+    if choice == 5:
+        return ["!"] + expression(rng, depth + 1)
+    tokens = expression(rng, depth + 1)
+    for _ in range(rng.randrange(1, 4)):
+        tokens += [rng.choice(OPERATORS)] + expression(rng, depth + 1)
+    return tokens
+
+# an expression, broken at one token half of the time
+def case(rng):
+    tokens = expression(rng)
+    if rng.randrange(2):
+        position = rng.randrange(len(tokens) + 1)
+        mutation = rng.randrange(3)
+        if mutation == 0 and position < len(tokens):
+            del tokens[position]
+        elif mutation == 1 and position < len(tokens):
+            tokens.insert(position, tokens[position])
+        else:
+            tokens.insert(position, rng.choice(JUNK))
+    return " ".join(tokens)
+
+# the tree of the program with text as the value of a statement, or the error it fails with
+def outcome(text, engine):
+    scanner = Scanner("void main() {\n  x = " + text + ";\n  Print(" + text + ");\n}\n")
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner.tokenize()
+    Expressions.engine = engine
+    try:
+        return ("tree", tree_text(list(iterDecls(scanner.tokens))))
+    except Exception as error:
+        if len(error.args) != 2:
+            raise
+        error_type, token = error.args
+        return ("error", error_type, token.line, token.start_col)
+    finally:
+        Expressions.engine = "precedence"
+
+class ExpressionEngineTest(unittest.TestCase):
+    def test_random_expressions(self):
+        rng = random.Random(SEED)
+        trees = 0
+        for _ in range(CASES):
+            text = case(rng)
+            expected = outcome(text, "recursive")
+            self.assertEqual(outcome(text, "precedence"), expected, text)
+            trees += expected[0] == "tree"
+        # both kinds of outcome must be well represented, or the check proves little
+        self.assertGreater(trees, CASES // 4)
+        self.assertLess(trees, CASES * 3 // 4)
+
+    def test_calls_without_arguments(self):
+        for text in ("f()", "f() + g()", "f(g())", "f(g(), h())", "!f()", "(f())", "a = f()", "f(()", "f())", "f(,)"):
+            with self.subTest(text):
+                self.assertEqual(outcome(text, "precedence"), outcome(text, "recursive"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from benchmarks.Generator import generate
+from benchmarks.Imports import import_time, DEFAULT_BUDGET_MS, PARSER_MODULES
+
+# Cold start: python -X importtime main.py in a subprocess. A --tokens run and a full parse must stay within the
+# import time budget of benchmarks/Imports.py, and the --tokens run must not load any of the parser modules
+
+REPEAT = 3 # runs of each kind; the fastest one counts
+
+class ImportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "functions.decaf")
+        with open(cls.path, "w") as file:
+            file.write(generate("functions", 1))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    # (fastest total import time in milliseconds, modules imported) of runs with options
+    def runs(self, options):
+        runs = [import_time(options, self.path) for _ in range(REPEAT)]
+        return min(total for total, _ in runs) / 1000, runs[0][1]
+
+    def test_tokens(self):
+        total, imported = self.runs(["--tokens"])
+        self.assertIn("Scanner", imported)
+        self.assertEqual(PARSER_MODULES & imported, set())
+        self.assertLessEqual(total, DEFAULT_BUDGET_MS)
+
+    def test_parse(self):
+        total, imported = self.runs([])
+        self.assertIn("Parser", imported)
+        self.assertLessEqual(total, DEFAULT_BUDGET_MS)
+
+if __name__ == "__main__":
+    unittest.main()
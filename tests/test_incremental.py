@@ -0,0 +1,152 @@
+import io
+import random
+import unittest
+import contextlib
+import Walker
+from Scanner import Scanner, Token, IncrementalScanner
+from Parser import ProgramNode, iterDecls
+from Incremental import IncrementalParser
+from TreeWriter import TreeWriter
+
+# Differential check of incremental reparsing: random edits are replayed on the samples, and after every edit the
+# IncrementalParser must hold what a full parse of the new text gives, the same tree or the same error. The
+# IncrementalScanner is checked the same way against a full tokenize(), token by token
+
+SAMPLES = ("t11.decaf", "t31.decaf", "t41.decaf")
+SEED = 11
+SEQUENCES = 300 # edit sequences per sample, each starting from the sample's text
+EDITS = 8 # edits per sequence, fewer when one ends in an error
+
+# replacements of a random span, from the fuzz corpus of the incremental parser
+FRAGMENTS = ["", "}", "{", ";", "x = 1;", "(", "int y;", "if (x) {", "\n", " ", "a", "0"]
+
+def random_edit(rng, text):
+    choice = rng.randrange(4)
+    if choice == 0:
+        # a statement at the start of a line
+        lines = [index + 1 for index, char in enumerate(text) if char == "\n"]
+        start = rng.choice(lines) if lines else 0
+        return start, start, rng.choice(["x = 1;\n", "Print(\"a\");\n", "int z;\n", "return;\n"])
+    if choice == 1:
+        # a whole line removed
+        start = text.rfind("\n", 0, rng.randrange(len(text) + 1)) + 1
+        end = text.find("\n", start)
+        return start, len(text) if end < 0 else end + 1, ""
+    if choice == 2:
+        # a digit or letter changed in place, which keeps most programs valid
+        positions = [index for index, char in enumerate(text) if char.isalnum()]
+        if positions:
+            start = rng.choice(positions)
+            return start, start + 1, rng.choice("19ab")
+    start = rng.randrange(len(text) + 1)
+    return start, min(len(text), start + rng.randrange(12)), rng.choice(FRAGMENTS)
+
+def tree_text(decls):
+    sink = io.StringIO()
+    out = TreeWriter(sink)
+    for decl in decls:
+        Walker.write_tree(decl, out)
+    out.flush()
+    return sink.getvalue()
+
+# what a full parse of text gives: ("tree", printed tree) or ("error", error type, line, column)
+def full_parse(text):
+    scanner = Scanner(text)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner.tokenize()
+    if scanner.errors:
+        return ("error", "scan error")
+    if not scanner.tokens:
+        return ("error", "empty program")
+    try:
+        decls = list(iterDecls(scanner.tokens))
+    except Exception as error:
+        if len(error.args) != 2:
+            raise
+        error_type, token = error.args
+        return ("error", error_type, token.line, token.start_col)
+    return ("tree", tree_text(decls))
+
+def incremental_result(parser):
+    if parser.error is None:
+        return ("tree", tree_text(parser.program.decls))
+    error_type, token = parser.error
+    if error_type in ("scan error", "empty program"):
+        return ("error", error_type)
+    return ("error", error_type, token.line, token.start_col)
+
+class IncrementalDifferentialTest(unittest.TestCase):
+    def test_random_edits(self):
+        rng = random.Random(SEED)
+        edits = partial_parses = 0
+        for path in SAMPLES:
+            with open(path, 'r') as file:
+                sample = file.read()
+            for _ in range(SEQUENCES):
+                parser = IncrementalParser(sample)
+                for _ in range(EDITS):
+                    start, end, replacement = random_edit(rng, parser.text)
+                    parser.edit(start, end, replacement)
+                    edits += 1
+                    self.assertEqual(incremental_result(parser), full_parse(parser.text),
+                                     f"{path}: edit {start}:{end} -> {replacement!r}")
+                    if parser.error is not None:
+                        # every later edit would be a full parse
+                        break
+                partial_parses += parser.partial_parses
+        # a good part of the edits must have taken the incremental path, or the check proves little
+        self.assertGreater(partial_parses, edits // 3)
+
+# an edit within one line: a span of it replaced, at times by text that splits it, or the whole line removed
+def line_edit(rng, text):
+    start = text.rfind("\n", 0, rng.randrange(len(text) + 1)) + 1
+    end = text.find("\n", start)
+    end = len(text) if end < 0 else end
+    if rng.randrange(6) == 0:
+        return start, min(len(text), end + 1), ""
+    first = rng.randrange(start, end + 1)
+    last = rng.randrange(first, end + 1)
+    return first, last, rng.choice(FRAGMENTS + ["\"a b\"", "'c'", "//", "/* x */", "&&", "<=", "x\ny"])
+
+def token_fields(tokens):
+    return [tuple(getattr(token, field) for field in Token.__slots__) for token in tokens]
+
+def full_tokens(text):
+    scanner = Scanner(text)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner.tokenize()
+    return token_fields(scanner.tokens), scanner.errors
+
+class IncrementalScannerDifferentialTest(unittest.TestCase):
+    def test_random_line_edits(self):
+        rng = random.Random(SEED)
+        edits = full_scans = 0
+        for path in SAMPLES:
+            with open(path, 'r') as file:
+                sample = file.read()
+            for _ in range(SEQUENCES // 3):
+                scanner = IncrementalScanner(sample)
+                for _ in range(EDITS):
+                    start, end, replacement = line_edit(rng, scanner.text)
+                    before = token_fields(scanner.tokens)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        position, removed, added = scanner.edit(start, end, replacement)
+                    edits += 1
+                    expected, errors = full_tokens(scanner.text)
+                    message = f"{path}: edit {start}:{end} -> {replacement!r}"
+                    # every field, the line of the tokens after the edit included
+                    self.assertEqual(token_fields(scanner.tokens), expected, message)
+                    # only the reported slice changed, besides the lines of the tokens after it
+                    self.assertEqual(len(before) - removed + added, len(expected), message)
+                    self.assertEqual(before[:position], expected[:position], message)
+                    self.assertEqual([fields[2:] for fields in before[position + removed:]],
+                                     [fields[2:] for fields in expected[position + added:]], message)
+                    if errors:
+                        # every later edit would be a full scan
+                        break
+                full_scans += scanner.full_scans - 1
+        # most edits must have been rescanned line by line, or the check proves little
+        self.assertLess(full_scans, edits // 8)
+
+if __name__ == "__main__":
+    unittest.main()
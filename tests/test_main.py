@@ -0,0 +1,46 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+from unittest import mock
+import main
+
+# Exit status of a single-file run: 0 when the file parses (and runs, with --run), 1 on a scan, syntax or runtime
+# error, whether the file is parsed or its output replayed from the parse cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class ExitStatusTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_main(self, *arguments):
+        with mock.patch.object(sys, "argv", ["main.py", "--cache-dir", self.directory, *arguments]), \
+             contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return main.main()
+
+    def write(self, text):
+        path = os.path.join(self.directory, "program.decaf")
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def test_parse(self):
+        for name, status in (("t11.decaf", 0), ("errors/scan.decaf", 1), ("errors/statements.decaf", 1), ("missing.decaf", 1)):
+            path = os.path.join(ROOT, name)
+            with self.subTest(name):
+                self.assertEqual(self.run_main(path), status)
+                # the second run is a cache hit
+                self.assertEqual(self.run_main(path), status)
+                self.assertEqual(self.run_main("--no-cache", path), status)
+
+    def test_run(self):
+        self.assertEqual(self.run_main("--run", os.path.join(ROOT, "t11.decaf")), 0)
+        self.assertEqual(self.run_main("--run", self.write("void main() { Print(1 / 0); }\n")), 1)
+
+if __name__ == "__main__":
+    unittest.main()
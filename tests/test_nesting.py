@@ -0,0 +1,41 @@
+import unittest
+from Parser import iterDecls
+from StmtBlock import StmtBlock
+from Walker import iter_nodes
+from benchmarks.Common import scan, tree_text
+from benchmarks.Generator import nested_blocks, else_if_ladder, mixed_nesting
+
+# Statements nested deeper than the recursion limit: the iterative statement engine (parse_block in Stmt.py) must
+# parse and print them, and at a depth the recursive engine manages both engines must give the same tree
+
+DEPTH = 10000
+COMPARE_DEPTH = 100
+
+def parse(text, engine):
+    StmtBlock.engine = engine
+    try:
+        return list(iterDecls(scan(text)))
+    finally:
+        StmtBlock.engine = "iterative"
+
+class NestingTest(unittest.TestCase):
+    def check(self, program):
+        decls = parse(program(DEPTH), "iterative")
+        # every level adds at least one node
+        self.assertGreaterEqual(max(depth for decl in decls for _, depth in iter_nodes(decl)), DEPTH)
+        self.assertGreater(len(tree_text(decls).splitlines()), DEPTH)
+
+        text = program(COMPARE_DEPTH)
+        self.assertEqual(tree_text(parse(text, "iterative")), tree_text(parse(text, "recursive")))
+
+    def test_nested_blocks(self):
+        self.check(nested_blocks)
+
+    def test_else_if_ladder(self):
+        self.check(else_if_ladder)
+
+    def test_mixed_nesting(self):
+        self.check(mixed_nesting)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from Expressions import Expressions
+from Optimizer import optimize
+from benchmarks.Common import scan, parse, tree_text
+
+# Constant folding prints trees Decaf can scan: a negative result has no literal and is written 0 - n, which
+# folds on like any other constant
+
+def optimized(statement):
+    Expressions.left_associative = True
+    try:
+        program_node = parse(scan("void main() {\nint x;\n" + statement + "\n}\n"))
+    finally:
+        Expressions.left_associative = False
+    optimize(program_node)
+    return tree_text(program_node.decls)
+
+class NegativeConstantTest(unittest.TestCase):
+    def test_negative_result(self):
+        self.assertEqual(optimized("x = 1 - 4;"), optimized("x = 0 - 3;"))
+        self.assertNotIn("-3", optimized("x = 1 - 4;"))
+
+    def test_folds_on(self):
+        self.assertEqual(optimized("x = (1 - 4) * 2;"), optimized("x = 0 - 6;"))
+        self.assertEqual(optimized("x = (2 - 5) * (0 - 1);"), optimized("x = 3;"))
+        self.assertIn("BoolConstant: true", optimized("x = 1 - 4 < 0;"))
+
+    def test_smallest_int(self):
+        self.assertEqual(optimized("x = 0 - 2147483647 - 1;"), optimized("x = 0 - 2147483648;"))
+
+if __name__ == "__main__":
+    unittest.main()
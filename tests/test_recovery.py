@@ -0,0 +1,82 @@
+import io
+import os
+import unittest
+import contextlib
+from Scanner import Scanner
+from Parser import recoverDecls, parseTokensRecovering
+from benchmarks.Common import scan, parse, tree_text
+
+# Error recovery on the sample files in errors/: every error is found, in source order, --max-errors cuts the
+# report off only when there are more errors than that, and the declarations and statements without errors
+# make up the partial tree
+
+ERRORS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "errors")
+
+# file -> (line, column) of every error, all syntax errors
+EXPECTED = {
+    "declarations.decaf": [(1, 7), (2, 8), (4, 14), (7, 7)],
+    "nested.decaf": [(8, 17), (12, 16), (14, 16), (19, 31)],
+    "scan.decaf": [(4, 11), (6, 11)],
+    "statements.decaf": [(4, 3), (10, 8), (13, 15), (14, 4)],
+}
+
+def read(name):
+    with open(os.path.join(ERRORS, name)) as file:
+        return file.read()
+
+# tokens of text with the scanner recovering too, as with --recover
+def scan_recovering(text):
+    scanner = Scanner(text, recover = True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner.tokenize()
+    return scanner.tokens
+
+def name(decl):
+    return decl.variableDecl.variable.identifier if decl.isVariableDecl else decl.functionDecl.identifier
+
+# what parseTokensRecovering prints for the file
+def report(name, max_errors):
+    text = read(name)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        parseTokensRecovering(scan_recovering(text), text, max_errors)
+    return output.getvalue().splitlines()
+
+class RecoveryTest(unittest.TestCase):
+    def test_errors_in_order(self):
+        self.assertEqual(sorted(EXPECTED), sorted(os.listdir(ERRORS)))
+        for file_name, positions in EXPECTED.items():
+            with self.subTest(file_name):
+                _, errors = recoverDecls(scan_recovering(read(file_name)))
+                self.assertEqual([(token.line, token.start_col) for _, token in errors], positions)
+                self.assertEqual({error_type for error_type, _ in errors}, {"syntax error"})
+
+    def test_max_errors(self):
+        for file_name, positions in EXPECTED.items():
+            for max_errors in range(1, len(positions) + 2):
+                with self.subTest(file_name, max_errors = max_errors):
+                    _, errors = recoverDecls(scan_recovering(read(file_name)), max_errors)
+                    self.assertEqual([(token.line, token.start_col) for _, token in errors], positions[:max_errors])
+                    lines = report(file_name, max_errors)
+                    self.assertEqual(sum(line.startswith("*** Error line") for line in lines), min(max_errors, len(positions)))
+                    stopped = f"*** stopped after {max_errors} errors"
+                    if max_errors < len(positions):
+                        self.assertEqual(lines[-1], stopped)
+                    else:
+                        self.assertNotIn(stopped, lines)
+
+    def test_partial_declarations(self):
+        program_node, _ = recoverDecls(scan(read("declarations.decaf")))
+        self.assertEqual([name(decl) for decl in program_node.decls], ["y", "ok", "s", "g", "main"])
+
+    # the statements in error are dropped, the rest of each block is kept
+    def test_partial_statements(self):
+        text = read("statements.decaf")
+        program_node, _ = recoverDecls(scan(text))
+        lines = text.split("\n")
+        for line in (3, 4, 10, 13, 14):
+            lines[line - 1] = ""
+        self.assertEqual(tree_text(program_node.decls), tree_text(parse(scan("\n".join(lines))).decls))
+
+if __name__ == "__main__":
+    unittest.main()